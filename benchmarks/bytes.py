@@ -0,0 +1,91 @@
+"""Compares tokenizing undecoded bytes with decoding them first
+
+usage: python -m benchmarks.bytes [--sizes 100K,1M,10M] [--repeat 5]
+
+Every input is a synthetic design of the requested size, see
+benchmarks.corpus, encoded as UTF-8. It is tokenized without comments, as
+the parser does:
+
+- str: the decoded string, without the time to decode it
+- decode + str: decoding the bytes, then tokenizing the string
+- bytes: tokenize_buffer on the bytes
+- in place: tokenize_buffer on a memoryview, as for a memory-mapped file
+
+The ASCII input only has ASCII characters. The non-ASCII input has a comment
+with accented characters every 64 KB, the bytes path decodes no token value
+again unless it contains such characters.
+"""
+
+import argparse
+from benchmarks import corpus
+from benchmarks.run import size
+from benchmarks.scaling import build, timed
+from regex_fun import lexer
+
+
+def _str(data: bytes, text: str):
+    for _ in lexer.tokenize(text, comments=False):
+        pass
+
+
+def _decode(data: bytes, text: str):
+    for _ in lexer.tokenize(data.decode("utf-8"), comments=False):
+        pass
+
+
+def _bytes(data: bytes, text: str):
+    for _ in lexer.tokenize_buffer(data, comments=False):
+        pass
+
+
+def _in_place(data: bytes, text: str):
+    for _ in lexer.tokenize_buffer(memoryview(data), comments=False):
+        pass
+
+
+FUNCTIONS = {
+    "str": _str,
+    "decode + str": _decode,
+    "bytes": _bytes,
+    "in place": _in_place,
+}
+
+
+def inputs(nbytes: int) -> dict:
+    """Returns the ASCII and the non-ASCII input of a size"""
+    text = build(nbytes)[:nbytes]
+    unit = corpus.sized(corpus.design, 1 << 16, entities=4)
+    unit = unit.replace("\n", "\n-- r\xe9sum\xe9\n", 1)
+    accented = (unit * (nbytes // len(unit) + 1))[:nbytes]
+    return {"ascii": text, "non-ascii": accented}
+
+
+def best(func, data: bytes, text: str, repeat: int) -> float:
+    """Returns the best time of repeated calls"""
+    return min(timed(func, data, text) for _ in range(repeat))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100K,1M,10M")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    print(
+        "{:>10} {:<10} ".format("size", "input")
+        + " ".join("{:>13}".format(name) for name in FUNCTIONS)
+    )
+    for nbytes in (size(s) for s in args.sizes.split(",")):
+        for name, text in inputs(nbytes).items():
+            data = text.encode("utf-8")
+            seconds = [
+                best(func, data, text, args.repeat)
+                for func in FUNCTIONS.values()
+            ]
+            print(
+                "{:>10} {:<10} ".format(len(data), name)
+                + " ".join("{:>11.4f} s".format(s) for s in seconds)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Deterministic generator of synthetic vhdl source text
+
+Every function takes a seed, the same arguments always produce the same
+text. The generated code is syntactically plausible vhdl, it is not meant to
+be elaborated by a simulator.
+"""
+import random
+from typing import Callable, Dict
+
+TYPES = (
+    "std_logic",
+    "std_logic_vector(31 downto 0)",
+    "std_logic_vector(N-1 downto 0)",
+    "unsigned(7 downto 0)",
+    "integer range 0 to 255",
+    "natural",
+    "boolean",
+)
+DIRECTIONS = ("in", "in", "out", "inout", "buffer")
+VALUES = ("0", "42", "2**17", 'x"00000001"', "'1'", "true", "N-1")
+
+
+def _comment(rng: random.Random) -> str:
+    return "-- " + " ".join(
+        rng.choice(("note", "todo", "a--b", "fix", "x")) for _ in range(6)
+    )
+
+
+def entity(
+    name: str,
+    generics: int = 2,
+    ports: int = 8,
+    comments: float = 0.0,
+    seed: int = 0,
+) -> str:
+    """Returns an entity declaration
+
+    Args:
+        name (str): entity name
+        generics (int, optional): number of generics. Defaults to 2.
+        ports (int, optional): number of ports. Defaults to 8.
+        comments (float, optional): probability of a comment after every
+            line. Defaults to 0.0.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        str: vhdl source text
+    """
+    rng = random.Random(seed)
+
+    def line(text):
+        if rng.random() < comments:
+            return text + " " + _comment(rng) + "\n"
+        return text + "\n"
+
+    out = [line("entity {} is".format(name))]
+    if generics:
+        items = [
+            "    G{} : integer := {}".format(i, rng.randint(1, 64))
+            for i in range(generics)
+        ]
+        out.append("  generic (\n")
+        out.extend(line(item + ";") for item in items[:-1])
+        out.append(line(items[-1] + ");"))
+    if ports:
+        items = [
+            "    p{} : {} {}".format(
+                i, rng.choice(DIRECTIONS), rng.choice(TYPES)
+            )
+            for i in range(ports)
+        ]
+        out.append("  port (\n")
+        out.extend(line(item + ";") for item in items[:-1])
+        out.append(line(items[-1] + ");"))
+    out.append(line("end {};".format(name)))
+    return "".join(out)
+
+
+def architecture(
+    name: str,
+    of: str,
+    signals: int = 8,
+    processes: int = 4,
+    depth: int = 2,
+    comments: float = 0.0,
+    seed: int = 0,
+) -> str:
+    """Returns an architecture body with nested processes and instances
+
+    Args:
+        name (str): architecture name
+        of (str): entity name
+        signals (int, optional): number of signals. Defaults to 8.
+        processes (int, optional): number of processes. Defaults to 4.
+        depth (int, optional): nesting depth of if statements within every
+            process. Defaults to 2.
+        comments (float, optional): probability of a comment after every
+            line. Defaults to 0.0.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        str: vhdl source text
+    """
+    rng = random.Random(seed)
+
+    def line(indent, text):
+        if rng.random() < comments:
+            text += " " + _comment(rng)
+        return "  " * indent + text + "\n"
+
+    out = [line(0, "architecture {} of {} is".format(name, of))]
+    for i in range(signals):
+        text = "signal s{} : {} := {};".format(
+            i, rng.choice(TYPES), rng.choice(VALUES)
+        )
+        out.append(line(1, text))
+    out.append(line(0, "begin"))
+    for i in range(processes):
+        out.append(line(1, "proc{} : process(clk, reset)".format(i)))
+        out.append(line(1, "begin"))
+        for d in range(depth):
+            condition = "if s{} = '1' then".format(d % max(1, signals))
+            out.append(line(2 + d, condition))
+        out.append(line(2 + depth, "s0 <= not s0;"))
+        for d in reversed(range(depth)):
+            out.append(line(2 + d, "end if;"))
+        out.append(line(1, "end process proc{};".format(i)))
+    instance = "u0 : entity work.{} port map (clk => clk);".format(of)
+    out.append(line(1, instance))
+    out.append(line(0, "end {};".format(name)))
+    return "".join(out)
+
+
+def package(
+    name: str, constants: int = 16, comments: float = 0.0, seed: int = 0
+) -> str:
+    """Returns a package with constant declarations
+
+    Args:
+        name (str): package name
+        constants (int, optional): number of constants. Defaults to 16.
+        comments (float, optional): probability of a comment after every
+            line. Defaults to 0.0.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        str: vhdl source text
+    """
+    rng = random.Random(seed)
+    out = ["package {} is\n".format(name)]
+    for i in range(constants):
+        text = "  constant C{} : {} := {};".format(
+            i, rng.choice(TYPES), rng.choice(VALUES)
+        )
+        if rng.random() < comments:
+            text += " " + _comment(rng)
+        out.append(text + "\n")
+    out.append("end package;\n")
+    return "".join(out)
+
+
+def design(
+    entities: int = 1,
+    generics: int = 2,
+    ports: int = 8,
+    constants: int = 16,
+    depth: int = 2,
+    comments: float = 0.0,
+    seed: int = 0,
+) -> str:
+    """Returns a file with a package and entity/architecture pairs
+
+    Args:
+        entities (int, optional): number of entities. Defaults to 1.
+        generics (int, optional): generics per entity. Defaults to 2.
+        ports (int, optional): ports per entity. Defaults to 8.
+        constants (int, optional): constants in the package. Defaults to 16.
+        depth (int, optional): nesting depth within processes. Defaults to 2.
+        comments (float, optional): probability of a comment after every
+            line. Defaults to 0.0.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        str: vhdl source text
+    """
+    out = [
+        "library ieee;\nuse ieee.std_logic_1164.all;\n\n",
+        package("pkg{}".format(seed), constants, comments, seed),
+    ]
+    for i in range(entities):
+        name = "e{}_{}".format(seed, i)
+        out.append(entity(name, generics, ports, comments, seed + i))
+        out.append(
+            architecture(
+                "rtl", name, ports, ports // 2, depth, comments, seed + i
+            )
+        )
+    return "\n".join(out)
+
+
+def unterminated(size: int) -> str:
+    """Returns an entity that never ends. A backtracking pattern looking for
+    "end <name>;" retries from every position"""
+    return "entity e is port(" + "a : in bit; " * (size // 12)
+
+
+def unbalanced(size: int) -> str:
+    """Returns a generic clause whose parentheses never close"""
+    return "entity e is generic(" + "x : integer := ((((1 " * (size // 22)
+
+
+def dashes(size: int) -> str:
+    """Returns string literals that contain comment delimiters"""
+    return 'constant s : string := "a--b";\n' * (size // 32)
+
+
+# named inputs of the runner. every entry returns a text of about size bytes
+CASES = {
+    "design": lambda size: sized(design, size, entities=4),
+    "wide_ports": lambda size: sized(design, size, ports=256, generics=32),
+    "constants": lambda size: sized(design, size, entities=0, constants=512),
+    "deep": lambda size: sized(design, size, depth=32),
+    "comments": lambda size: sized(design, size, comments=0.9),
+    "unterminated": unterminated,
+    "unbalanced": unbalanced,
+    "dashes": dashes,
+}  # type: Dict[str, Callable[[int], str]]
+
+
+def sized(generator: Callable[..., str], size: int, **kwargs) -> str:
+    """Concatenates generated files with increasing seeds up to a size
+
+    Args:
+        generator (Callable[..., str]): generator function, e.g. design
+        size (int): minimum size in characters
+        **kwargs: passed to the generator
+
+    Returns:
+        str: vhdl source text
+    """
+    parts, total, seed = [], 0, 0
+    while total < size:
+        part = generator(seed=seed, **kwargs)
+        parts.append(part)
+        total += len(part)
+        seed += 1
+    return "\n".join(parts)
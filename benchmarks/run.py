@@ -0,0 +1,166 @@
+"""Times the vhdl parser on synthetic inputs and writes the results as JSON
+
+usage:
+    python -m benchmarks.run [--sizes 10K,100K,1M] [--cases design,deep]
+                             [--repeat 3] [--out results.json]
+    python -m benchmarks.run --compare old.json new.json [--threshold 1.2]
+
+Every get_* function and the full pipeline (parse_vhdl with all sections)
+is timed on every case and size. The best of --repeat runs is reported.
+Two result files can be compared, the exit code is 1 if any measurement got
+slower than the threshold.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import List
+from benchmarks import corpus
+from regex_fun import vhdl
+
+UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def _pipeline(text: str):
+    vhdl.parse_vhdl(text).as_dict()
+
+
+FUNCTIONS = {
+    "get_entity": vhdl.get_entity,
+    "get_generics": vhdl.get_generics,
+    "get_ports": vhdl.get_ports,
+    "get_architecture": vhdl.get_architecture,
+    "get_constants": vhdl.get_constants,
+    "pipeline": _pipeline,
+}
+
+
+def size(text: str) -> int:
+    """Parses a size such as 10K or 1.5M"""
+    text = text.strip().upper()
+    if text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def measure(func, text: str, repeat: int) -> float:
+    """Returns the best time of repeated calls, without memoized results"""
+    best = float("inf")
+    for _ in range(repeat):
+        vhdl.disable_cache()
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes: List[int], cases: List[str], repeat: int = 3) -> dict:
+    """Runs all benchmarks
+
+    Args:
+        sizes (List[int]): input sizes in characters
+        cases (List[str]): names of corpus.CASES
+        repeat (int, optional): runs per measurement. Defaults to 3.
+
+    Returns:
+        dict: environment and one result per case, size and function
+    """
+    results = []
+    for case in cases:
+        for nbytes in sizes:
+            text = corpus.CASES[case](nbytes)
+            for name, func in FUNCTIONS.items():
+                seconds = measure(func, text, repeat)
+                results.append(
+                    {
+                        "case": case,
+                        "size": len(text),
+                        "function": name,
+                        "seconds": seconds,
+                        "mb_per_second": len(text) / UNITS["M"] / seconds,
+                    }
+                )
+                print(
+                    "{:<14} {:>10} {:<18} {:>10.4f} s".format(
+                        case, len(text), name, seconds
+                    ),
+                    file=sys.stderr,
+                )
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict, threshold: float = 1.2) -> List[str]:
+    """Finds measurements that got slower
+
+    Measurements are matched by case, size and function. The size is the
+    length of the generated input, which only depends on the requested size.
+
+    Args:
+        old (dict): earlier result of run
+        new (dict): later result of run
+        threshold (float, optional): ratio of new to old time above which a
+            measurement is a regression. Defaults to 1.2.
+
+    Returns:
+        List[str]: one line per regression
+    """
+    before = {(r["case"], r["size"], r["function"]): r for r in old["results"]}
+    regressions = []
+    for r in new["results"]:
+        o = before.get((r["case"], r["size"], r["function"]))
+        if o is None:
+            continue
+        ratio = r["seconds"] / o["seconds"]
+        if ratio > threshold:
+            regressions.append(
+                "{} {} {}: {:.4f} s -> {:.4f} s ({:.2f}x)".format(
+                    r["case"],
+                    r["size"],
+                    r["function"],
+                    o["seconds"],
+                    r["seconds"],
+                    ratio,
+                )
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10K,100K,1M")
+    parser.add_argument("--cases", default=",".join(corpus.CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="result file, stdout if not given")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args(argv)
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        for line in regressions:
+            print(line)
+        return 1 if regressions else 0
+    results = run(
+        [size(s) for s in args.sizes.split(",")],
+        args.cases.split(","),
+        args.repeat,
+    )
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Shows that parse time grows linearly with the input size
+
+Every input is a synthetic design of the requested size, see
+benchmarks.corpus. For each size the time per megabyte is printed. It stays
+about constant for a linear parser and grows with the size for a quadratic
+one.
+
+usage: python -m benchmarks.scaling [--sizes 10K,1M,500M] [--parse-limit 50M]
+
+Inputs larger than the parse limit are only tokenized. Tokenizing streams
+over the input, a full parse keeps every token in memory.
+"""
+import argparse
+import time
+from benchmarks import corpus
+from benchmarks.run import UNITS, size
+from regex_fun import lexer, vhdl
+
+
+def build(nbytes: int) -> str:
+    # one generated chunk repeated, generating 500 MB would take longer than
+    # parsing it
+    unit = corpus.sized(corpus.design, min(nbytes, 1 << 20), entities=4)
+    return unit * (nbytes // len(unit) + 1)
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def count_tokens(text: str) -> int:
+    return sum(1 for _ in lexer.tokenize(text))
+
+
+def parse(text: str):
+    vhdl.disable_cache()  # do not measure the memoized result
+    vhdl.parse_vhdl(text).as_dict()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10K,100K,1M,10M")
+    parser.add_argument("--parse-limit", default="50M")
+    args = parser.parse_args(argv)
+    limit = size(args.parse_limit)
+    print("{:>10} {:>14} {:>14}".format("size", "tokenize s/MB", "parse s/MB"))
+    for nbytes in (size(s) for s in args.sizes.split(",")):
+        text = build(nbytes)
+        mb = len(text) / UNITS["M"]
+        tok = timed(count_tokens, text) / mb
+        par = "-" if len(text) > limit else "%.4f" % (timed(parse, text) / mb)
+        print("{:>10} {:>14.4f} {:>14}".format(len(text), tok, par))
+
+
+if __name__ == "__main__":
+    main()
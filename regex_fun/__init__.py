@@ -1,6 +1,25 @@
 from regex_fun.vhdl import (  # NOQA
+    ParseResult,
+    parse_vhdl,
+    enable_cache,
+    disable_cache,
     get_entity,
     get_generics,
     get_ports,
     get_architecture,
+    get_constants,
+    DesignUnit,
+    Entity,
+    iter_design_units,
+    split_units,
+    iter_entities,
+)
+from regex_fun.records import (  # NOQA
+    Generic,
+    Port,
+    Constant,
+    Signal,
+    Process,
+    Instantiation,
+    Table,
 )
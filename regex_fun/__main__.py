@@ -0,0 +1,4 @@
+import sys
+from regex_fun.cli import main
+
+sys.exit(main())
@@ -0,0 +1,301 @@
+from collections import namedtuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from regex_fun import vhdl
+from regex_fun.lexer import Token, render, IDENTIFIER, KEYWORD, DELIMITER
+from regex_fun.records import Instantiation, Process, Signal, intern
+
+Architecture = namedtuple(
+    "Architecture", "name entity signals processes instances"
+)
+Architecture.__doc__ = """Contents of an architecture body
+
+Attributes:
+    name (str): architecture name
+    entity (str): entity name
+    signals (List[Signal]): signal declarations, including those of blocks
+        and generate statements
+    processes (List[Process]): process statements
+    instances (List[Instantiation]): component, entity and configuration
+        instantiations
+"""
+
+
+def get_architecture_index(buffer: str) -> Optional[Architecture]:
+    """Parses the contents of the architecture out of an input string
+
+    The input is expected to be a string representing vhdl file content. The
+    tokens of the first architecture (see
+    :func:`regex_fun.vhdl.get_architecture`) are scanned once from left to
+    right, and signals, processes and instantiations are collected on the
+    way.
+
+    Args:
+        buffer (str): input string
+
+    Returns:
+        Optional[Architecture]: contents of the architecture, None if there
+            is no architecture
+    """
+    tokens = vhdl.parse_vhdl(buffer).tokens
+    unit = vhdl._find_unit(tokens, "architecture")
+    if unit is None:
+        return None
+    first, last, name = unit
+    return _index(tokens, first, last + 1, name, tokens[first + 3].value)
+
+
+def iter_architectures(text: str) -> Iterator[Architecture]:
+    """Parses the contents of every architecture in an input string
+
+    The input is processed with :func:`regex_fun.vhdl.iter_design_units`,
+    so every architecture is yielded as soon as its end is found.
+
+    Args:
+        text (str): input string
+
+    Yields:
+        Architecture: contents of every architecture
+    """
+    for unit in vhdl.iter_design_units(text):
+        if unit.kind == "architecture":
+            yield index_unit(unit)
+
+
+def index_unit(unit: vhdl.DesignUnit) -> Architecture:
+    """Parses the contents of one architecture unit
+
+    Args:
+        unit (vhdl.DesignUnit): architecture, e.g. of
+            :func:`regex_fun.vhdl.iter_design_units`
+
+    Raises:
+        ValueError: if the unit is not an architecture
+
+    Returns:
+        Architecture: contents of the architecture
+    """
+    if unit.kind != "architecture":
+        raise ValueError("not an architecture: {!r}".format(unit))
+    tokens = unit.tokens
+    return _index(tokens, 0, len(tokens), unit.name, unit.of)
+
+
+def _index(
+    tokens: Sequence[Token], i: int, stop: int, name: str, entity: str
+) -> Architecture:
+    """Collects signals, processes and instantiations in one scan"""
+    signals = []  # type: List[Signal]
+    processes = []  # type: List[Process]
+    instances = []  # type: List[Instantiation]
+    pairs = _parentheses(tokens, i, stop)
+    # the header "architecture <name> of <entity> is" declares nothing
+    i += 5
+    while i < stop:
+        t = tokens[i]
+        if t.kind == KEYWORD:
+            word = t.value.lower()
+            if word == "signal":
+                i = _signal(tokens, i + 1, signals)
+                continue
+            if word == "process" and not _is_end(tokens, i):
+                i = _process(tokens, i, stop, pairs, processes)
+                continue
+        elif (
+            t.kind == IDENTIFIER
+            and i + 2 < stop
+            and tokens[i + 1].value == ":"
+        ):
+            # <label> : ...
+            j = _instantiation(tokens, i, stop, pairs, instances)
+            if j > i:
+                i = j
+                continue
+        i += 1
+    return Architecture(name, entity, signals, processes, instances)
+
+
+def _parentheses(tokens: Sequence[Token], i: int, stop: int) -> Dict[int, int]:
+    """Matches all parentheses of a token range in one scan
+
+    Returns:
+        Dict[int, int]: index of the closing parenthesis by the index of the
+            opening one. Parentheses that are not closed are missing.
+    """
+    pairs = {}  # type: Dict[int, int]
+    opened = []  # type: List[int]
+    for j in range(i, stop):
+        t = tokens[j]
+        if t.kind == DELIMITER:
+            if t.value == "(":
+                opened.append(j)
+            elif t.value == ")" and opened:
+                pairs[opened.pop()] = j
+    return pairs
+
+
+def _signal(tokens: Sequence[Token], i: int, signals: List[Signal]) -> int:
+    """Parses one signal declaration, starting after "signal" """
+    entries = []  # type: list
+    j = vhdl._constant(tokens, i, entries)
+    signals.extend(Signal(*constant) for constant, _ in entries)
+    return max(j, i)
+
+
+def _is_end(tokens: Sequence[Token], i: int) -> bool:
+    """Checks for "end process" and "end postponed process" """
+    j = i - 1
+    if vhdl._is_keyword(tokens[j], "postponed"):
+        j -= 1
+    return vhdl._is_keyword(tokens[j], "end")
+
+
+def _process(
+    tokens: Sequence[Token],
+    i: int,
+    stop: int,
+    pairs: Dict[int, int],
+    processes: List[Process],
+) -> int:
+    """Parses the header of a process statement at "process"
+
+    The label is found by looking back over "postponed" and the colon.
+    """
+    j = i - 1
+    if j > 0 and vhdl._is_keyword(tokens[j], "postponed"):
+        j -= 1
+    label = None
+    if j > 0 and tokens[j].value == ":" and tokens[j - 1].kind == IDENTIFIER:
+        label = tokens[j - 1].value
+    sensitivity = None
+    i += 1
+    if i in pairs:
+        end = pairs[i]
+        sensitivity = [
+            render(tokens, first, last)
+            for first, last in _split(tokens, i + 1, end)
+        ]
+        i = end + 1
+    processes.append(Process(label, sensitivity))
+    return i
+
+
+def _instantiation(
+    tokens: Sequence[Token],
+    i: int,
+    stop: int,
+    pairs: Dict[int, int],
+    instances: List[Instantiation],
+) -> int:
+    """Parses an instantiation starting at its label, if there is one
+
+    Recognized are "<label> : entity <name> [(<arch>)]",
+    "<label> : configuration <name>", "<label> : component <name>" and
+    "<label> : <name> generic|port map", followed by the optional maps.
+
+    Returns:
+        int: index of the first token after the instantiation, i if there
+            is no instantiation
+    """
+    j = i + 2
+    t = tokens[j]
+    if t.kind == KEYWORD:
+        kind = t.value.lower()
+        if kind not in ("entity", "configuration", "component"):
+            return i
+        j += 1
+    elif t.kind == IDENTIFIER:
+        kind = "component"
+    else:
+        return i
+    first = j
+    j = _selected(tokens, j, stop)
+    if j == first:
+        return i
+    if kind == "entity" and j in pairs:
+        j = pairs[j] + 1
+    unit = render(tokens, first, j)
+    maps = {}
+    while j + 2 < stop and tokens[j].kind == KEYWORD:
+        word = tokens[j].value.lower()
+        if word not in ("generic", "port"):
+            break
+        if not vhdl._is_keyword(tokens[j + 1], "map"):
+            break
+        end = pairs.get(j + 2)
+        if end is None:
+            break
+        maps[word] = _associations(tokens, j + 3, end)
+        j = end + 1
+    if t.kind == IDENTIFIER and not maps:
+        # "<label> : <name>" without a map is not an instantiation, e.g. a
+        # labeled assignment or block
+        return i
+    instances.append(
+        Instantiation(
+            tokens[i].value,
+            kind,
+            unit,
+            maps.get("generic", []),
+            maps.get("port", []),
+        )
+    )
+    return j
+
+
+def _selected(tokens: Sequence[Token], i: int, stop: int) -> int:
+    """Returns the index of the first token after a selected name"""
+    while i < stop and tokens[i].kind in (IDENTIFIER, KEYWORD):
+        i += 1
+        if i + 1 < stop and tokens[i].value == ".":
+            i += 1
+        else:
+            break
+    return i
+
+
+def _split(
+    tokens: Sequence[Token], i: int, stop: int
+) -> List[Tuple[int, int]]:
+    """Splits a token range on commas outside of parentheses"""
+    parts = []
+    depth = 0
+    start = i
+    for j in range(i, stop):
+        t = tokens[j]
+        if t.kind != DELIMITER:
+            continue
+        if t.value == "(":
+            depth += 1
+        elif t.value == ")":
+            depth -= 1
+        elif t.value == "," and depth == 0:
+            parts.append((start, j))
+            start = j + 1
+    if start < stop:
+        parts.append((start, stop))
+    return parts
+
+
+def _associations(
+    tokens: Sequence[Token], i: int, stop: int
+) -> List[Tuple[Optional[str], str]]:
+    """Parses an association list between a pair of parentheses"""
+    associations = []
+    for first, last in _split(tokens, i, stop):
+        arrow = first
+        depth = 0
+        for j in range(first, last):
+            value = tokens[j].value
+            if value == "(":
+                depth += 1
+            elif value == ")":
+                depth -= 1
+            elif value == "=>" and depth == 0:
+                arrow = j
+                break
+        if arrow > first:
+            formal = intern(render(tokens, first, arrow))
+            associations.append((formal, render(tokens, arrow + 1, last)))
+        else:
+            associations.append((None, render(tokens, first, last)))
+    return associations
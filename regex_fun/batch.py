@@ -0,0 +1,257 @@
+import os
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from regex_fun import vhdl
+
+T = TypeVar("T")
+
+# file extensions of vhdl source files
+EXTENSIONS = (".vhd", ".vhdl")
+
+# sections of a parse result, see regex_fun.vhdl.ParseResult.as_dict
+SECTIONS = ("entity", "generics", "ports", "architecture", "constants")
+
+FileRecord = namedtuple(
+    "FileRecord", "path entity generics ports constants errors"
+)
+FileRecord.__doc__ = """Parse result of one vhdl file
+
+Attributes:
+    path (str): path of the file
+    entity (Optional[str]): see :func:`regex_fun.vhdl.get_entity`
+    generics (Optional[List[Generic]]): see
+        :func:`regex_fun.vhdl.get_generics`
+    ports (Optional[List[Port]]): see :func:`regex_fun.vhdl.get_ports`
+    constants (Optional[List[Constant]]): see
+        :func:`regex_fun.vhdl.get_constants`
+    errors (List[str]): errors that occurred while reading or parsing
+"""
+
+
+def find_files(
+    root: str, extensions: Tuple[str, ...] = EXTENSIONS
+) -> Iterator[str]:
+    """Finds all vhdl files in a directory tree
+
+    Directories and files are visited in sorted order, so the result is the
+    same on every run. Hidden directories (e.g. .git) are skipped.
+
+    Args:
+        root (str): root directory
+        extensions (Tuple[str, ...], optional): file extensions to look for.
+            Defaults to (".vhd", ".vhdl").
+
+    Yields:
+        str: path of every vhdl file
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if filename.lower().endswith(extensions):
+                yield os.path.join(dirpath, filename)
+
+
+def parse_file(path: str) -> FileRecord:
+    """Parses one vhdl file
+
+    Errors are not raised but recorded, so that a single broken file does not
+    stop a scan over a whole project.
+
+    Args:
+        path (str): path of the file
+
+    Returns:
+        FileRecord: parse result
+    """
+    try:
+        # the file is not decoded, only the tokens are
+        with open(path, "rb") as f:
+            text = f.read()
+        result = vhdl.parse_vhdl(text)
+        return FileRecord(
+            path,
+            result.entity,
+            result.generics,
+            result.ports,
+            result.constants,
+            [],
+        )
+    except (OSError, ValueError) as e:
+        return FileRecord(path, None, None, None, None, [repr(e)])
+
+
+def _apply(func: Callable[[str], T], paths: List[str]) -> List[T]:
+    return [func(path) for path in paths]
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    items = iter(items)
+    chunk = list(islice(items, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(items, size))
+
+
+def map_files(
+    func: Callable[[str], T],
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: int = 32,
+) -> Iterator[T]:
+    """Applies a function to files in parallel
+
+    The paths are handed to a process pool in chunks while they are still
+    being produced, and every result is yielded as soon as its chunk is
+    done. Only a few chunks per worker are in flight at any time, so memory
+    stays bounded for any number of files.
+
+    With more than one worker, results are yielded in the order they are
+    finished. With a single worker, the function is applied in this process
+    in the order of the paths.
+
+    Args:
+        func (Callable[[str], T]): function of a path, must be picklable
+        paths (Iterable[str]): paths of the files
+        workers (Optional[int], optional): number of worker processes.
+            Defaults to None, the number of CPUs.
+        chunksize (int, optional): number of files per task. Defaults to 32.
+
+    Yields:
+        T: result of every file
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for path in paths:
+            yield func(path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in _chunks(paths, chunksize):
+            pending.add(pool.submit(_apply, func, chunk))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def parse_files(
+    paths: Iterable[str], workers: Optional[int] = None, chunksize: int = 32
+) -> Iterator[FileRecord]:
+    """Parses vhdl files in parallel, see :func:`map_files`
+
+    Args:
+        paths (Iterable[str]): paths of the files
+        workers (Optional[int], optional): number of worker processes.
+            Defaults to None, the number of CPUs.
+        chunksize (int, optional): number of files per task. Defaults to 32.
+
+    Returns:
+        Iterator[FileRecord]: parse result of every file
+    """
+    return map_files(parse_file, paths, workers, chunksize)
+
+
+def scan_project(
+    root: str, workers: Optional[int] = None, chunksize: int = 32
+) -> Iterator[FileRecord]:
+    """Parses all vhdl files in a directory tree in parallel
+
+    The files are parsed with :func:`parse_files` while the directory tree is
+    still being walked, see :func:`find_files`.
+
+    Args:
+        root (str): root directory
+        workers (Optional[int], optional): number of worker processes.
+            Defaults to None, the number of CPUs.
+        chunksize (int, optional): number of files per task. Defaults to 32.
+
+    Returns:
+        Iterator[FileRecord]: parse result of every file
+    """
+    return parse_files(find_files(root), workers, chunksize)
+
+
+def _parse_texts(
+    texts: List[Union[str, bytes]], sections: Tuple[str, ...]
+) -> List[dict]:
+    parse = vhdl._parse
+    return [
+        {section: getattr(result, section) for section in sections}
+        for result in map(parse, texts)
+    ]
+
+
+def _check(texts: List[Union[str, bytes]]):
+    types = (str, bytes)
+    for text in texts:
+        assert type(text) in types, "argument type must be string or bytes"
+
+
+def parse_many(
+    texts: Iterable[Union[str, bytes]],
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+    sections: Tuple[str, ...] = SECTIONS,
+) -> List[dict]:
+    """Parses many strings representing vhdl file content
+
+    Meant for many small inputs, where the per call overhead of the get_*
+    functions (type check, comparison with the last parsed input or lookup
+    in the cache, copy of the result) outweighs the parsing itself. Every
+    input is tokenized once and only the requested sections are extracted.
+
+    With workers, the inputs are handed to a process pool in chunks. Only a
+    few chunks per worker are in flight at any time.
+
+    Args:
+        texts (Iterable[Union[str, bytes]]): input strings or bytes, see
+            :func:`regex_fun.vhdl.parse_vhdl`
+        workers (Optional[int], optional): number of worker processes.
+            Defaults to None, parse in this process.
+        chunksize (int, optional): number of inputs per task. Defaults to
+            256.
+        sections (Tuple[str, ...], optional): sections to extract. Defaults
+            to all of SECTIONS.
+
+    Raises:
+        ValueError: if a section is unknown
+
+    Returns:
+        List[dict]: sections of every input, in input order
+    """
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        raise ValueError("unknown sections: {}".format(sorted(unknown)))
+    sections = tuple(sections)
+    if workers is None or workers <= 1:
+        texts = list(texts)
+        _check(texts)
+        return _parse_texts(texts, sections)
+    results = []  # type: List[dict]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # futures are collected in submission order to keep the input order
+        pending = deque()
+        for chunk in _chunks(texts, chunksize):
+            _check(chunk)
+            pending.append(pool.submit(_parse_texts, chunk, sections))
+            if len(pending) >= 2 * workers:
+                results.extend(pending.popleft().result())
+        while pending:
+            results.extend(pending.popleft().result())
+    return results
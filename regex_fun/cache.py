@@ -0,0 +1,127 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Union
+
+
+class LRUCache:
+    """Size-bounded least recently used cache keyed on a hash of input text
+
+    Entries are looked up by a content hash of the text, so two equal strings
+    share one entry even if they are different objects. When the cache is
+    full, the least recently used entry is evicted.
+
+    Attributes:
+        maxsize (int): maximum number of entries
+        hits (int): number of lookups that found an entry
+        misses (int): number of lookups that found no entry
+        evictions (int): number of entries that were evicted
+    """
+
+    def __init__(self, maxsize: int = 128):
+        assert maxsize > 0, "maxsize must be positive"
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: Union[str, bytes]) -> bytes:
+        """Returns the content hash of a text
+
+        Args:
+            text (Union[str, bytes]): input string or bytes
+
+        Returns:
+            bytes: 128 bit digest of the text
+        """
+        if type(text) is bytes:
+            # bytes never share an entry with the equal string, as the
+            # offsets of their results differ
+            return hashlib.blake2b(text, digest_size=16, person=b"b").digest()
+        data = text.encode("utf-8", "surrogatepass")
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def get(self, text: str, default: Any = None) -> Any:
+        """Looks up the entry of a text and marks it as recently used
+
+        Args:
+            text (str): input string
+            default (Any, optional): returned if there is no entry. Defaults
+                to None.
+
+        Returns:
+            Any: cached value or default
+        """
+        key = self.key(text)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, text: str, value: Any):
+        """Stores the entry of a text, evicting the least recently used entry
+        if the cache is full
+
+        Args:
+            text (str): input string
+            value (Any): value to cache
+        """
+        key = self.key(text)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, text: str, factory: Callable[[str], Any]) -> Any:
+        """Looks up the entry of a text and creates it on a miss
+
+        Args:
+            text (str): input string
+            factory (Callable[[str], Any]): creates the value from the text
+
+        Returns:
+            Any: cached or created value
+        """
+        value = self.get(text, _MISS)
+        if value is _MISS:
+            value = factory(text)
+            self.set(text, value)
+        return value
+
+    def clear(self):
+        """Removes all entries and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Returns the cache counters
+
+        Returns:
+            dict: hits, misses, evictions, current size and maximum size
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, text: str) -> bool:
+        return self.key(text) in self._entries
+
+
+# marks a missing entry, since None is a valid cached value
+_MISS = object()
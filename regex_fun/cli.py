@@ -0,0 +1,163 @@
+import argparse
+import os
+import sys
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# everything else is imported when it is needed, so that --help and small
+# runs do not pay for the process pool, json and the architecture parser
+
+
+def _paths(args: List[str]) -> Iterator[str]:
+    """Yields files as given and the vhdl files of directories"""
+    from regex_fun.batch import find_files
+
+    for path in args:
+        if os.path.isdir(path):
+            yield from find_files(path)
+        else:
+            yield path
+
+
+def _unit(path: str, unit, lines) -> dict:
+    """Returns a design unit as a JSON object"""
+    start = unit.start
+    item = {
+        "path": path,
+        "kind": unit.kind,
+        "name": unit.name,
+        "of": unit.of,
+        "line": lines.position(start)[0],
+        "start": start,
+        "end": unit.end,
+    }
+    if unit.kind == "entity":
+        item["generics"] = _items(unit.generics)
+        item["ports"] = _items(unit.ports)
+    elif unit.kind in ("package", "package body"):
+        item["constants"] = _items(unit.constants)
+    elif unit.kind == "architecture":
+        from regex_fun.architecture import index_unit
+
+        index = index_unit(unit)
+        item["instances"] = [
+            {"label": i.label, "kind": i.kind, "unit": i.unit}
+            for i in index.instances
+        ]
+    return item
+
+
+def _items(records: Optional[list]) -> Optional[List[dict]]:
+    return None if records is None else [r._asdict() for r in records]
+
+
+def _lines(path: str) -> Tuple[List[str], bool]:
+    """Parses one file into JSON lines, one per design unit
+
+    Runs in the worker processes. Errors are returned as a JSON line with an
+    "error" member instead of being raised, together with True.
+    """
+    import json
+    from regex_fun import vhdl
+    from regex_fun.lexer import LineIndex
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return [json.dumps({"path": path, "error": repr(e)})], True
+    lines = LineIndex(data)
+    units = [
+        json.dumps(_unit(path, unit, lines))
+        for unit in vhdl.iter_design_units(data)
+    ]
+    return units, False
+
+
+def _at_least(minimum: int) -> Callable[[str], int]:
+    """Returns an argument type of integers that are not below minimum"""
+
+    def count(text: str) -> int:
+        try:
+            value = int(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                "invalid int value: {!r}".format(text)
+            )
+        if value < minimum:
+            raise argparse.ArgumentTypeError(
+                "{} is less than {}".format(value, minimum)
+            )
+        return value
+
+    return count
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="regex-fun",
+        description="Parses vhdl files and prints one JSON line per design "
+        "unit (entity, architecture, package, ...).",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        metavar="PATH",
+        help="vhdl file or directory, directories are searched for .vhd and "
+        ".vhdl files",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=_at_least(0),
+        default=1,
+        help="number of worker processes, 0 for one per CPU. Defaults to 1, "
+        "parse in this process in the order of the paths",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=_at_least(1),
+        default=32,
+        help="number of files per task of a worker. Defaults to 32",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Runs the command line interface
+
+    Every design unit is printed as one JSON object per line as soon as its
+    file is parsed: path, kind, name, of (entity of an architecture or
+    configuration), line, start and end (byte offsets), and generics and
+    ports of entities, constants of packages and instances of
+    architectures. A file that can not be read is printed as a line with
+    path and error.
+
+    Args:
+        argv (Optional[List[str]], optional): arguments. Defaults to None,
+            the arguments of the process.
+
+    Returns:
+        int: exit code, 1 if a file could not be read
+    """
+    args = _parser().parse_args(argv)
+    from regex_fun.batch import map_files
+
+    workers = None if args.workers == 0 else args.workers
+    out = sys.stdout
+    status = 0
+    try:
+        for lines, failed in map_files(
+            _lines, _paths(args.paths), workers, args.chunksize
+        ):
+            if failed:
+                status = 1
+            for line in lines:
+                out.write(line)
+                out.write("\n")
+            out.flush()
+    except BrokenPipeError:
+        # the reader went away, e.g. "regex-fun src | head"
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, out.fileno())
+        return 1
+    return status
@@ -0,0 +1,459 @@
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import os
+import socket
+import struct
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from regex_fun.batch import EXTENSIONS, FileRecord, find_files, parse_file
+
+# inotify event masks, see inotify(7)
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_ISDIR = 0x40000000
+_IN_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+)
+_EVENT = struct.Struct("iIII")
+
+# number of files parsed between two chances for queries to be answered
+_BATCH = 32
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class Watcher:
+    """Finds changed vhdl files in a directory tree by polling
+
+    Every file is remembered with its modification time and size. A file is
+    changed if either of them differs from the last check.
+
+    Args:
+        root (str): root directory
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._files = {}  # type: Dict[str, Tuple[int, int]]
+
+    def poll(self) -> Tuple[Set[str], Set[str]]:
+        """Checks the whole directory tree, see :func:`check`"""
+        found = set(find_files(self.root))
+        return self.check(found | set(self._files))
+
+    def check(self, paths: Set[str]) -> Tuple[Set[str], Set[str]]:
+        """Checks some files
+
+        Args:
+            paths (Set[str]): paths of files that may have changed, been
+                added or removed
+
+        Returns:
+            Tuple[Set[str], Set[str]]: changed (or added) and removed paths
+        """
+        changed, removed = set(), set()
+        for path in paths:
+            stat = _stat(path)
+            if stat is None:
+                if self._files.pop(path, None) is not None:
+                    removed.add(path)
+            elif self._files.get(path) != stat:
+                self._files[path] = stat
+                changed.add(path)
+        return changed, removed
+
+
+class _Inotify:
+    """Minimal inotify binding, see Daemon
+
+    Raises:
+        OSError: if inotify is not available, e.g. on other systems than
+            Linux
+    """
+
+    def __init__(self):
+        try:
+            libc = ctypes.CDLL(
+                ctypes.util.find_library("c") or "libc.so.6", use_errno=True
+            )
+            init = libc.inotify_init1
+        except (AttributeError, OSError):
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}  # type: Dict[int, str]
+
+    def watch_tree(self, root: str):
+        """Watches a directory and all its non-hidden subdirectories"""
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            wd = self._libc.inotify_add_watch(
+                self.fd, os.fsencode(dirpath), _IN_MASK
+            )
+            if wd >= 0:
+                self._dirs[wd] = dirpath
+
+    def read(self) -> Optional[Set[str]]:
+        """Returns the paths of all pending events
+
+        New directories are watched right away. None means that events were
+        lost and the whole tree has to be checked.
+        """
+        paths = set()
+        lost = False
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, size = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset : offset + size].rstrip(b"\0")
+                offset += size
+                if mask & _IN_Q_OVERFLOW:
+                    lost = True
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        # files created before the watch are found by poll
+                        self.watch_tree(path)
+                        lost = True
+                elif path.lower().endswith(EXTENSIONS):
+                    paths.add(path)
+        return None if lost else paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _record(record: FileRecord) -> dict:
+    """Returns a file record as a JSON object"""
+    return {
+        "path": record.path,
+        "entity": record.entity,
+        "generics": _items(record.generics),
+        "ports": _items(record.ports),
+        "constants": _items(record.constants),
+        "errors": record.errors,
+    }
+
+
+def _items(records: Optional[list]) -> Optional[List[dict]]:
+    return None if records is None else [r._asdict() for r in records]
+
+
+class Daemon:
+    """Keeps the parse results of a directory tree in memory and serves them
+
+    The tree is parsed once when the daemon starts. Afterwards only files
+    that changed are parsed again, see :class:`Watcher`. Changes are found
+    with inotify where available, with a polling fallback that checks the
+    whole tree every interval.
+
+    Queries are answered over a unix socket. Every request is one line of
+    JSON, {"id": 1, "method": "entity", "params": {"name": "fifo"}}, and is
+    answered by one line of JSON, {"id": 1, "result": ...} or
+    {"id": 1, "error": "..."}. Methods are:
+
+    - ping: "pong"\n
+    - status: root, number of files, errors, time of the last update\n
+    - files: paths of all files\n
+    - file (path): parse result of a file\n
+    - entities: names of all entities\n
+    - entity (name): parse results of the files defining an entity\n
+    - refresh: checks for changes right away and returns what changed\n
+    - shutdown: stops the daemon\n
+
+    Args:
+        root (str): root directory
+        socket_path (str): path of the unix socket
+        interval (float, optional): seconds between two polls. Defaults to
+            1.0.
+        backend (str, optional): "inotify", "poll" or "auto", inotify if it
+            is available. Defaults to "auto".
+
+    Attributes:
+        records (Dict[str, FileRecord]): parse result by path
+        backend (str): "inotify" or "poll"
+        updated (Optional[float]): time of the last change
+    """
+
+    def __init__(
+        self,
+        root: str,
+        socket_path: str,
+        interval: float = 1.0,
+        backend: str = "auto",
+    ):
+        if backend not in ("auto", "inotify", "poll"):
+            raise ValueError("unknown backend: {}".format(backend))
+        self.root = root
+        self.socket_path = socket_path
+        self.interval = interval
+        self.records = {}  # type: Dict[str, FileRecord]
+        self.updated = None  # type: Optional[float]
+        self.backend = backend
+        self._watcher = Watcher(root)
+        self._entities = {}  # type: Dict[str, Set[str]]
+        self._inotify = None  # type: Optional[_Inotify]
+        self._server = None
+        self._stopped = None  # type: Optional[asyncio.Future]
+        self._lock = None  # type: Optional[asyncio.Lock]
+        self._methods = {
+            "ping": lambda: "pong",
+            "status": self._status,
+            "files": lambda: sorted(self.records),
+            "file": self._file,
+            "entities": lambda: sorted(self._entities),
+            "entity": self._entity,
+            "shutdown": self.stop,
+        }
+
+    def update(self) -> dict:
+        """Checks the whole tree and parses changed files
+
+        Returns:
+            dict: numbers of changed and removed files
+        """
+        changed, removed = self._watcher.poll()
+        for path in changed:
+            self._set(parse_file(path))
+        for path in removed:
+            self._remove(path)
+        return self._changes(changed, removed)
+
+    def _changes(self, changed: Set[str], removed: Set[str]) -> dict:
+        if changed or removed:
+            self.updated = time.time()
+        return {"changed": len(changed), "removed": len(removed)}
+
+    def _set(self, record: FileRecord):
+        self._remove(record.path)
+        self.records[record.path] = record
+        if record.entity is not None:
+            name = _entity_name(record.entity)
+            self._entities.setdefault(name, set()).add(record.path)
+
+    def _remove(self, path: str):
+        record = self.records.pop(path, None)
+        if record is None or record.entity is None:
+            return
+        name = _entity_name(record.entity)
+        paths = self._entities.get(name, set())
+        paths.discard(path)
+        if not paths:
+            self._entities.pop(name, None)
+
+    async def _refresh(self, paths: Optional[Set[str]] = None) -> dict:
+        """Parses changed files, answering queries in between"""
+        async with self._lock:
+            if paths is None:
+                changed, removed = self._watcher.poll()
+            else:
+                changed, removed = self._watcher.check(paths)
+            for i, path in enumerate(sorted(changed)):
+                self._set(parse_file(path))
+                if i % _BATCH == _BATCH - 1:
+                    await asyncio.sleep(0)
+            for path in removed:
+                self._remove(path)
+            return self._changes(changed, removed)
+
+    async def start(self):
+        """Parses the tree, starts watching it and opens the socket"""
+        loop = asyncio.get_event_loop()
+        self._lock = asyncio.Lock()
+        self._stopped = loop.create_future()
+        if self.backend != "poll":
+            try:
+                self._inotify = _Inotify()
+                self._inotify.watch_tree(self.root)
+                loop.add_reader(self._inotify.fd, self._on_events)
+                self.backend = "inotify"
+            except OSError:
+                if self.backend == "inotify":
+                    raise
+                self._inotify = None
+                self.backend = "poll"
+        self.update()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(
+            self._client, self.socket_path
+        )
+        if self._inotify is None:
+            loop.create_task(self._poll())
+
+    async def wait(self):
+        """Waits until the daemon is stopped, then closes the socket"""
+        await self._stopped
+        self._server.close()
+        await self._server.wait_closed()
+        if self._inotify is not None:
+            asyncio.get_event_loop().remove_reader(self._inotify.fd)
+            self._inotify.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def stop(self) -> str:
+        """Stops the daemon"""
+        if not self._stopped.done():
+            self._stopped.set_result(None)
+        return "stopping"
+
+    async def _poll(self):
+        while not self._stopped.done():
+            await asyncio.sleep(self.interval)
+            await self._refresh()
+
+    def _on_events(self):
+        paths = self._inotify.read()
+        asyncio.ensure_future(self._refresh(paths))
+
+    async def _client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._respond(line)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, line: bytes) -> dict:
+        """Answers one request"""
+        try:
+            request = json.loads(line.decode("utf-8"))
+            method = request["method"]
+            params = request.get("params") or {}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return {"id": None, "error": "invalid request"}
+        response = {"id": request.get("id")}
+        try:
+            if method == "refresh":
+                response["result"] = await self._refresh()
+            elif method in self._methods:
+                response["result"] = self._methods[method](**params)
+            else:
+                response["error"] = "unknown method: {}".format(method)
+        except (KeyError, TypeError) as e:
+            response["error"] = "invalid params: {}".format(e)
+        return response
+
+    def _status(self) -> dict:
+        return {
+            "root": self.root,
+            "backend": self.backend,
+            "files": len(self.records),
+            "errors": sum(1 for r in self.records.values() if r.errors),
+            "updated": self.updated,
+        }
+
+    def _file(self, path: str) -> dict:
+        return _record(self.records[path])
+
+    def _entity(self, name: str) -> List[dict]:
+        paths = self._entities.get(name.lower(), ())
+        return [_record(self.records[path]) for path in sorted(paths)]
+
+
+def _entity_name(entity: str) -> str:
+    # entity strings start with "entity <name>"
+    return entity.split(None, 2)[1].lower()
+
+
+def serve(
+    root: str,
+    socket_path: str,
+    interval: float = 1.0,
+    backend: str = "auto",
+):
+    """Runs a daemon until it receives a shutdown request
+
+    Args:
+        root (str): root directory
+        socket_path (str): path of the unix socket
+        interval (float, optional): seconds between two polls. Defaults to
+            1.0.
+        backend (str, optional): "inotify", "poll" or "auto". Defaults to
+            "auto".
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    daemon = Daemon(root, socket_path, interval, backend)
+    try:
+        loop.run_until_complete(daemon.start())
+        loop.run_until_complete(daemon.wait())
+        # connections that are still open and a running poll
+        all_tasks = getattr(asyncio, "all_tasks", None)
+        if all_tasks is None:
+            all_tasks = asyncio.Task.all_tasks
+        tasks = [task for task in all_tasks(loop) if not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True)
+            )
+    finally:
+        loop.close()
+
+
+def query(socket_path: str, method: str, timeout: float = 10.0, **params):
+    """Sends one request to a daemon and returns the result
+
+    Args:
+        socket_path (str): path of the unix socket
+        method (str): method name, see Daemon
+        timeout (float, optional): seconds to wait for the answer. Defaults
+            to 10.0.
+        **params: parameters of the method
+
+    Raises:
+        RuntimeError: if the daemon answers with an error
+
+    Returns:
+        result of the method
+    """
+    request = {"id": 1, "method": method, "params": params}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(socket_path)
+        s.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with s.makefile("rb") as f:
+            response = json.loads(f.readline().decode("utf-8"))
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response["result"]
@@ -0,0 +1,456 @@
+from collections import namedtuple
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from regex_fun import vhdl
+from regex_fun.batch import find_files, map_files
+from regex_fun.lexer import Token, IDENTIFIER, KEYWORD
+
+Instance = namedtuple("Instance", "label kind library name architecture")
+Instance.__doc__ = """An instantiation within an architecture
+
+Attributes:
+    label (str): instance label
+    kind (str): "entity", "component" or "configuration"
+    library (Optional[str]): library of an entity or configuration
+        instantiation, None for components
+    name (str): name of the instantiated unit
+    architecture (Optional[str]): architecture of an entity instantiation
+"""
+
+References = namedtuple("References", "units libraries uses instances")
+References.__doc__ = """Units defined and referenced in vhdl file content
+
+All names are lower case, since vhdl is case insensitive.
+
+Attributes:
+    units (List[Tuple[str, str, Optional[str]]]): kind, name and entity name
+        (architectures and configurations) of every library unit
+    libraries (List[str]): names of library clauses
+    uses (List[Tuple[str, ...]]): selected names of use clauses and context
+        references, e.g. ("ieee", "std_logic_1164", "all")
+    instances (List[Instance]): component, entity and configuration
+        instantiations
+"""
+
+# libraries that are provided by the tools and never part of a project
+EXTERNAL = frozenset(("ieee", "std"))
+
+
+def get_references(text: Union[str, bytes]) -> References:
+    """Parses unit definitions and references out of an input string
+
+    The input is expected to be a string representing vhdl file content. It
+    is tokenized once, and the token stream is split into units and scanned
+    for library clauses, use clauses, context references and instantiations.
+
+    Args:
+        text (Union[str, bytes]): input string or bytes, see
+            :func:`regex_fun.vhdl.parse_vhdl`
+
+    Returns:
+        References: defined and referenced units
+    """
+    tokens = vhdl.parse_vhdl(text).tokens
+    units = [
+        (u.kind, u.name.lower(), None if u.of is None else u.of.lower())
+        for u in vhdl.split_units(tokens)
+    ]
+    libraries, uses, instances = [], [], []
+    n = len(tokens)
+    i = 0
+    while i < n:
+        t = tokens[i]
+        if t.kind == KEYWORD:
+            word = t.value.lower()
+            if word == "library":
+                names, i = _names(tokens, i + 1)
+                libraries.extend(name[0] for name in names)
+                continue
+            if word == "use" or (
+                word == "context" and _is_selected(tokens, i + 1)
+            ):
+                names, i = _names(tokens, i + 1)
+                uses.extend(names)
+                continue
+        elif t.kind == IDENTIFIER and i + 3 < n and tokens[i + 1].value == ":":
+            # <label> : ...
+            instance = _instance(tokens, i)
+            if instance is not None:
+                instances.append(instance)
+        i += 1
+    return References(units, libraries, uses, instances)
+
+
+def iter_uses(tokens: List[Token]) -> Iterator[Tuple[int, Tuple[str, ...]]]:
+    """Finds the names of all use clauses in a token stream
+
+    Args:
+        tokens (List[Token]): tokens of one input, e.g. those of
+            :attr:`regex_fun.vhdl.ParseResult.tokens`
+
+    Yields:
+        Tuple[int, Tuple[str, ...]]: offset of the use keyword and lower case
+            selected name, e.g. (0, ("ieee", "std_logic_1164", "all")), for
+            every name of every use clause
+    """
+    for i, t in enumerate(tokens):
+        if t.kind == KEYWORD and t.value.lower() == "use":
+            for name in _names(tokens, i + 1)[0]:
+                yield t.start, name
+
+
+def _is_selected(tokens: List[Token], i: int) -> bool:
+    # "context lib.name;" is a reference, "context name is" a declaration
+    return i + 1 < len(tokens) and tokens[i + 1].value == "."
+
+
+def _selected_name(
+    tokens: List[Token], i: int
+) -> Tuple[Tuple[str, ...], int]:
+    """Parses a selected name such as lib.pkg.all
+
+    Returns:
+        Tuple[Tuple[str, ...], int]: lower case name parts and the index of
+            the first token after the name
+    """
+    n = len(tokens)
+    parts = []
+    while i < n and tokens[i].kind in (IDENTIFIER, KEYWORD):
+        parts.append(tokens[i].value.lower())
+        i += 1
+        if i < n and tokens[i].value == ".":
+            i += 1
+        else:
+            break
+    return tuple(parts), i
+
+
+def _names(tokens: List[Token], i: int) -> Tuple[List[Tuple[str, ...]], int]:
+    """Parses a comma separated list of selected names up to a semicolon"""
+    n = len(tokens)
+    names = []
+    while i < n:
+        name, i = _selected_name(tokens, i)
+        if name:
+            names.append(name)
+        if i < n and tokens[i].value == ",":
+            i += 1
+            continue
+        break
+    return names, i
+
+
+def _instance(tokens: List[Token], i: int) -> Optional[Instance]:
+    """Parses an instantiation starting at its label, if there is one
+
+    Recognized are "<label> : entity <lib>.<name> [(<arch>)]",
+    "<label> : configuration <lib>.<name>", "<label> : component <name>"
+    and "<label> : <name> generic|port map".
+    """
+    label = tokens[i].value
+    t = tokens[i + 2]
+    if t.kind == KEYWORD:
+        word = t.value.lower()
+        if word in ("entity", "configuration"):
+            name, j = _selected_name(tokens, i + 3)
+            if not name:
+                return None
+            library = name[0] if len(name) > 1 else None
+            architecture = None
+            if word == "entity" and j + 2 < len(tokens):
+                if tokens[j].value == "(" and tokens[j + 2].value == ")":
+                    architecture = tokens[j + 1].value.lower()
+            return Instance(label, word, library, name[-1], architecture)
+        if word == "component" and tokens[i + 3].kind == IDENTIFIER:
+            name = tokens[i + 3].value.lower()
+            return Instance(label, "component", None, name, None)
+        return None
+    if t.kind == IDENTIFIER and i + 4 < len(tokens):
+        aspect, map_ = tokens[i + 3], tokens[i + 4]
+        if aspect.kind == KEYWORD and vhdl._is_keyword(map_, "map"):
+            if aspect.value.lower() in ("generic", "port"):
+                name = t.value.lower()
+                return Instance(label, "component", None, name, None)
+    return None
+
+
+def _read_references(path: str) -> Tuple[str, Optional[References], str]:
+    """Reads the references of a file, see DependencyGraph.scan"""
+    try:
+        with open(path, "rb") as f:
+            return path, get_references(f.read()), ""
+    except (OSError, ValueError) as e:
+        return path, None, repr(e)
+
+
+class DependencyGraph:
+    """Dependencies between the vhdl files of a project
+
+    A file depends on another file if it uses a package, instantiates an
+    entity or configuration, or implements an architecture or package body
+    of a unit defined in that other file. Units are looked up by library and
+    name. All files belong to the same library (default "work"), unless
+    another library is given when the file is added. Units of the external
+    libraries ieee and std are ignored.
+
+    Files are added and updated one at a time. Every change marks the file
+    and everything that depends on it, directly or indirectly, as dirty, so
+    only those files have to be analyzed again.
+
+    Args:
+        library (str, optional): default library of added files. Defaults to
+            "work".
+
+    Attributes:
+        library (str): default library of added files
+        dirty (Set[str]): paths that changed or depend on a changed file
+        errors (Dict[str, str]): paths that could not be read by scan
+    """
+
+    def __init__(self, library: str = "work"):
+        self.library = library.lower()
+        self.dirty = set()  # type: Set[str]
+        self.errors = {}  # type: Dict[str, str]
+        self._files = {}  # type: Dict[str, Tuple[Set[tuple], Set[tuple]]]
+        self._providers = {}  # type: Dict[tuple, Set[str]]
+        self._consumers = {}  # type: Dict[tuple, Set[str]]
+
+    @classmethod
+    def scan(
+        cls, root: str, workers: Optional[int] = None, library: str = "work"
+    ) -> "DependencyGraph":
+        """Builds the graph of all vhdl files in a directory tree
+
+        References are extracted in parallel with
+        :func:`regex_fun.batch.map_files`.
+
+        Args:
+            root (str): root directory
+            workers (Optional[int], optional): number of worker processes.
+                Defaults to None, the number of CPUs.
+            library (str, optional): library of all files. Defaults to "work".
+
+        Returns:
+            DependencyGraph: graph with every file marked as dirty
+        """
+        graph = cls(library)
+        for path, refs, error in map_files(
+            _read_references, find_files(root), workers
+        ):
+            if refs is None:
+                graph.errors[path] = error
+            else:
+                graph.add(path, refs)
+        return graph
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def add(
+        self, path: str, refs: References, library: Optional[str] = None
+    ) -> Set[str]:
+        """Adds a file or replaces the references of a known file
+
+        Args:
+            path (str): path of the file
+            refs (References): references of the file, see get_references
+            library (Optional[str], optional): library of the file. Defaults
+                to None, the default library of the graph.
+
+        Returns:
+            Set[str]: paths that were marked as dirty by this change
+        """
+        library = self.library if library is None else library.lower()
+        provides, needs = _keys(refs, library)
+        before = self._downstream(path) if path in self._files else set()
+        self._unlink(path)
+        self._files[path] = (provides, needs)
+        for key in provides:
+            self._providers.setdefault(key, set()).add(path)
+        for key in needs:
+            self._consumers.setdefault(key, set()).add(path)
+        changed = before | self._downstream(path)
+        self.dirty |= changed
+        return changed
+
+    def update(
+        self,
+        path: str,
+        text: Union[str, bytes],
+        library: Optional[str] = None,
+    ) -> Set[str]:
+        """Parses changed file content and updates the graph, see add
+
+        Args:
+            path (str): path of the file
+            text (Union[str, bytes]): new content of the file
+            library (Optional[str], optional): library of the file. Defaults
+                to None, the default library of the graph.
+
+        Returns:
+            Set[str]: paths that were marked as dirty by this change
+        """
+        return self.add(path, get_references(text), library)
+
+    def remove(self, path: str) -> Set[str]:
+        """Removes a file
+
+        Args:
+            path (str): path of the file
+
+        Returns:
+            Set[str]: paths that were marked as dirty, without the removed one
+        """
+        if path not in self._files:
+            return set()
+        changed = self._downstream(path)
+        changed.discard(path)
+        self._unlink(path)
+        del self._files[path]
+        self.dirty.discard(path)
+        self.dirty |= changed
+        return changed
+
+    def _unlink(self, path: str):
+        if path not in self._files:
+            return
+        provides, needs = self._files[path]
+        for key in provides:
+            self._providers[key].discard(path)
+        for key in needs:
+            self._consumers[key].discard(path)
+
+    def dependencies(self, path: str) -> Set[str]:
+        """Returns the files a file directly depends on
+
+        Args:
+            path (str): path of the file
+
+        Returns:
+            Set[str]: paths of the dependencies
+        """
+        deps = set()
+        for key in self._files[path][1]:
+            deps |= self._providers.get(key, set())
+        deps.discard(path)
+        return deps
+
+    def dependents(self, path: str) -> Set[str]:
+        """Returns the files that directly depend on a file
+
+        Args:
+            path (str): path of the file
+
+        Returns:
+            Set[str]: paths of the dependents
+        """
+        deps = set()
+        for key in self._files[path][0]:
+            deps |= self._consumers.get(key, set())
+        deps.discard(path)
+        return deps
+
+    def _downstream(self, path: str) -> Set[str]:
+        """Returns a file and everything that depends on it"""
+        seen = {path}
+        stack = [path]
+        while stack:
+            for dependent in self.dependents(stack.pop()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return seen
+
+    def levels(
+        self, paths: Optional[Iterable[str]] = None
+    ) -> List[List[str]]:
+        """Sorts files into compile levels
+
+        Every file only depends on files of earlier levels, so all files of
+        one level can be analyzed in parallel once the previous levels are
+        done. Dependencies outside of the given paths are assumed to be
+        analyzed already.
+
+        Args:
+            paths (Optional[Iterable[str]], optional): files to sort, e.g. the
+                dirty ones. Defaults to None, all files.
+
+        Raises:
+            ValueError: if files depend on each other in a cycle
+
+        Returns:
+            List[List[str]]: sorted paths of every level
+        """
+        paths = set(self._files if paths is None else paths)
+        remaining = {p: len(self.dependencies(p) & paths) for p in paths}
+        level = sorted(p for p, count in remaining.items() if count == 0)
+        levels = []
+        while level:
+            levels.append(level)
+            following = set()
+            for path in level:
+                del remaining[path]
+                for dependent in self.dependents(path):
+                    if dependent in remaining:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            following.add(dependent)
+            level = sorted(following)
+        if remaining:
+            raise ValueError(
+                "dependency cycle between: {}".format(
+                    ", ".join(sorted(remaining))
+                )
+            )
+        return levels
+
+    def compile_order(self) -> List[str]:
+        """Returns all files in an order in which they can be analyzed
+
+        Returns:
+            List[str]: paths, see levels
+        """
+        return [path for level in self.levels() for path in level]
+
+
+def _keys(refs: References, library: str) -> Tuple[Set[tuple], Set[tuple]]:
+    """Returns the (library, name) keys a file provides and needs
+
+    Args:
+        refs (References): references of the file
+        library (str): library of the file, which "work" refers to
+
+    Returns:
+        Tuple[Set[tuple], Set[tuple]]: provided and needed keys
+    """
+
+    def key(lib: Optional[str], name: str) -> Optional[tuple]:
+        lib = library if lib is None or lib == "work" else lib
+        return None if lib in EXTERNAL else (lib, name)
+
+    provides, needs = set(), set()
+    for kind, name, of in refs.units:
+        if kind in ("entity", "package", "configuration", "context"):
+            provides.add((library, name))
+        if kind in ("architecture", "configuration"):
+            needs.add(key(None, of))
+        elif kind == "package body":
+            needs.add(key(None, name))
+    for name in refs.uses:
+        if len(name) >= 2 and name[1] != "all":
+            needs.add(key(name[0], name[1]))
+    for instance in refs.instances:
+        needs.add(key(instance.library, instance.name))
+    needs.discard(None)
+    return provides, needs - provides
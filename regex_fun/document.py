@@ -0,0 +1,216 @@
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Tuple
+from regex_fun import vhdl
+from regex_fun.lexer import Token, tokenize
+from regex_fun.records import Constant, Generic, Port
+
+# marks a value of a _Region that has not been extracted yet
+_MISSING = object()
+
+
+class _Region:
+    """Tokens from one library unit header up to the next one
+
+    The tokens keep the offsets of the text they were scanned from, base is
+    the start of the region in that text. Everything extracted from the
+    tokens only depends on their values and relative offsets, so it stays
+    valid while the region is moved by edits before it.
+    """
+
+    __slots__ = ("tokens", "base", "_unit", "_constants")
+
+    def __init__(self, tokens: List[Token], base: int):
+        self.tokens = tokens
+        self.base = base
+        self._unit = _MISSING
+        self._constants = _MISSING
+
+    @property
+    def unit(self) -> Optional[vhdl.DesignUnit]:
+        if self._unit is _MISSING:
+            self._unit = vhdl._design_unit(self.tokens)
+        return self._unit
+
+    @property
+    def constants(self) -> Optional[List[Constant]]:
+        if self._constants is _MISSING:
+            self._constants = vhdl._constants(self.tokens)
+        return self._constants
+
+
+class Document:
+    """Vhdl file content that is parsed incrementally while it is edited
+
+    The content is split into regions, one per library unit (see
+    :func:`regex_fun.vhdl.iter_design_units`). An edit re-scans the text
+    from the region before the edited one, and stops as soon as the scan
+    reaches the unchanged start of a region behind the edit. The tokens and
+    everything already extracted from all other regions are kept, so the
+    cost of an edit depends on the size of the edited units, not on the
+    size of the file.
+
+    The sections are extracted from the units on first access after an
+    edit. For valid vhdl they are the same as those of
+    :func:`regex_fun.vhdl.parse_vhdl` for the current content. While the
+    content is broken, e.g. halfway through typing, a declaration never
+    extends over the header of the next unit, and only units found by
+    :func:`regex_fun.vhdl.iter_design_units` are considered.
+
+    Args:
+        text (str): initial content
+    """
+
+    def __init__(self, text: str = ""):
+        assert type(text) is str, "argument type must be string"
+        self._text = text
+        self._starts = []  # type: List[int]
+        self._regions = []  # type: List[_Region]
+        self._scan(0, 0, 0, 0)
+
+    @property
+    def text(self) -> str:
+        """str: current content"""
+        return self._text
+
+    def __len__(self) -> int:
+        return len(self._text)
+
+    def edit(
+        self, offset: int, removed: int, inserted: str
+    ) -> List[vhdl.DesignUnit]:
+        """Replaces a range of the content
+
+        Args:
+            offset (int): offset of the first replaced character
+            removed (int): number of replaced characters
+            inserted (str): new text
+
+        Raises:
+            ValueError: if the range is not within the content
+
+        Returns:
+            List[vhdl.DesignUnit]: units that were parsed again, with
+                offsets into the new content
+        """
+        if offset < 0 or removed < 0 or offset + removed > len(self._text):
+            raise ValueError(
+                "edit out of range: {}+{}".format(offset, removed)
+            )
+        text = self._text
+        self._text = text[:offset] + inserted + text[offset + removed :]
+        delta = len(inserted) - removed
+        # the region before the edited one is scanned again as well, as the
+        # edit may change the header of the edited region
+        first = max(bisect_right(self._starts, offset) - 2, 0)
+        count = self._scan(first, offset, offset + removed, delta)
+        return [
+            unit
+            for unit in (self._unit(i) for i in range(first, first + count))
+            if unit is not None
+        ]
+
+    def apply(self, edits: Iterable[Tuple[int, int, str]]):
+        """Applies edits in order, see :meth:`edit`
+
+        Args:
+            edits (Iterable[Tuple[int, int, str]]): offset, number of removed
+                characters and inserted text of every edit
+        """
+        for offset, removed, inserted in edits:
+            self.edit(offset, removed, inserted)
+
+    def _scan(self, first: int, start: int, stop: int, delta: int) -> int:
+        """Scans the regions from the region first on again
+
+        Regions that start behind the old range from start to stop are
+        reused once the scan reaches their start, moved by delta.
+
+        Returns:
+            int: number of regions that were scanned
+        """
+        starts = self._starts
+        regions = self._regions
+        begin = starts[first] if starts else 0
+        # index of the first region that starts behind the edited range
+        old = bisect_right(starts, stop)
+        scanned = []  # type: List[_Region]
+        tokens = tokenize(self._text, comments=False, pos=begin)
+        for chunk in vhdl._split_units(tokens):
+            if scanned:
+                begin = chunk[0].start
+                while old < len(starts) and starts[old] + delta < begin:
+                    old += 1
+                if old < len(starts) and starts[old] + delta == begin:
+                    break
+            scanned.append(_Region(chunk, begin))
+        else:
+            old = len(starts)
+        regions[first:old] = scanned
+        starts[first:old] = [region.base for region in scanned]
+        if delta:
+            for i in range(first + len(scanned), len(starts)):
+                starts[i] += delta
+        return len(scanned)
+
+    def _unit(self, i: int) -> Optional[vhdl.DesignUnit]:
+        """Returns the unit of a region with offsets into the content"""
+        region = self._regions[i]
+        unit = region.unit
+        shift = self._starts[i] - region.base
+        if unit is None or not shift:
+            return unit
+        return vhdl.DesignUnit(
+            unit.kind,
+            unit.name,
+            unit.of,
+            [
+                t._replace(start=t.start + shift, end=t.end + shift)
+                for t in unit.tokens
+            ],
+        )
+
+    @property
+    def units(self) -> List[vhdl.DesignUnit]:
+        """List[vhdl.DesignUnit]: all library units of the content"""
+        units = (self._unit(i) for i in range(len(self._regions)))
+        return [unit for unit in units if unit is not None]
+
+    def _first(self, kind: str) -> Optional[vhdl.DesignUnit]:
+        for region in self._regions:
+            unit = region.unit
+            if unit is not None and unit.kind == kind:
+                return unit
+        return None
+
+    @property
+    def entity(self) -> Optional[str]:
+        """Optional[str]: see :func:`regex_fun.vhdl.get_entity`"""
+        unit = self._first("entity")
+        return None if unit is None else unit.text
+
+    @property
+    def generics(self) -> Optional[List[Generic]]:
+        """Optional[List[Generic]]: see :func:`regex_fun.vhdl.get_generics`"""
+        unit = self._first("entity")
+        return None if unit is None else unit.generics
+
+    @property
+    def ports(self) -> Optional[List[Port]]:
+        """Optional[List[Port]]: see :func:`regex_fun.vhdl.get_ports`"""
+        unit = self._first("entity")
+        return None if unit is None else unit.ports
+
+    @property
+    def architecture(self) -> Optional[str]:
+        """Optional[str]: see :func:`regex_fun.vhdl.get_architecture`"""
+        unit = self._first("architecture")
+        return None if unit is None else unit.text
+
+    @property
+    def constants(self) -> Optional[List[Constant]]:
+        """Optional[List[Constant]]: see
+        :func:`regex_fun.vhdl.get_constants`"""
+        constants = []  # type: List[Constant]
+        for region in self._regions:
+            constants.extend(region.constants or ())
+        return constants or None
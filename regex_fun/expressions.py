@@ -0,0 +1,843 @@
+import math
+import re
+from collections import namedtuple
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from regex_fun import vhdl
+from regex_fun.deps import iter_uses
+from regex_fun.lexer import (
+    Token,
+    IDENTIFIER,
+    KEYWORD,
+    NUMBER,
+    BIT_STRING,
+    STRING,
+    CHARACTER,
+    DELIMITER,
+    tokenize,
+    render,
+)
+
+
+class EvaluationError(ValueError):
+    """Raised if an expression can not be evaluated"""
+
+
+def _divide(a, b):
+    # integer division truncates towards zero in vhdl
+    if isinstance(a, int) and isinstance(b, int):
+        q = abs(a) // abs(b)
+        return q if (a < 0) == (b < 0) else -q
+    return a / b
+
+
+def _rem(a, b):
+    # the result of rem has the sign of the left operand
+    return a - _divide(a, b) * b
+
+
+def _concat(a, b):
+    if isinstance(a, str) and isinstance(b, str):
+        return a + b
+    raise TypeError("& is only supported for strings")
+
+
+def _to_integer(value) -> int:
+    # conversion of a real to an integer rounds half away from zero
+    if isinstance(value, float):
+        return int(math.copysign(math.floor(abs(value) + 0.5), value))
+    return int(value)
+
+
+def _power(a, b):
+    if isinstance(a, int) and isinstance(b, int) and b < 0:
+        raise TypeError("negative exponent of an integer")
+    return a ** b
+
+
+# operators by precedence, from the lowest to the highest
+_LOGICAL = {
+    "and": lambda a, b: a and b,
+    "or": lambda a, b: a or b,
+    "xor": lambda a, b: a != b,
+    "nand": lambda a, b: not (a and b),
+    "nor": lambda a, b: not (a or b),
+    "xnor": lambda a, b: a == b,
+}
+_RELATIONAL = {
+    "=": lambda a, b: a == b,
+    "/=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+_ADDING = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "&": _concat,
+}
+_MULTIPLYING = {
+    "*": lambda a, b: a * b,
+    "/": _divide,
+    "mod": lambda a, b: a % b,
+    "rem": _rem,
+}
+_NEGATE = lambda a: -a  # NOQA
+_PLUS = lambda a: +a  # NOQA
+
+# functions of the standard packages that show up in constant expressions,
+# e.g. integer(ceil(log2(real(N))))
+FUNCTIONS = {
+    "integer": _to_integer,
+    "natural": _to_integer,
+    "positive": _to_integer,
+    "real": float,
+    "minimum": min,
+    "maximum": max,
+    "ceil": lambda x: float(math.ceil(x)),
+    "floor": lambda x: float(math.floor(x)),
+    "round": lambda x: float(_to_integer(float(x))),
+    "trunc": lambda x: float(math.trunc(x)),
+    "sqrt": math.sqrt,
+    "log2": math.log2,
+    "log10": math.log10,
+    "exp": math.exp,
+}  # type: Dict[str, Callable]
+
+# enumeration literals of the standard package
+_LITERALS = {"true": True, "false": False}
+
+_BIT_STRING = re.compile(r'(\d*)([us]?)([boxd])"([^"]*)"', re.IGNORECASE)
+_BITS = {"b": 1, "o": 3, "x": 4}
+_BASES = {"b": 2, "o": 8, "x": 16, "d": 10}
+
+# instructions of a compiled expression
+_PUSH, _NAME, _UNARY, _BINARY, _CALL = range(5)
+
+
+def _number(text: str):
+    """Returns the value of a decimal or based abstract literal"""
+    text = text.replace("_", "").lower()
+    if "#" in text:
+        base, digits, exponent = text.split("#")
+        base = int(base)
+        if "." in digits:
+            whole, fraction = digits.split(".")
+            value = float(int(whole or "0", base)) + sum(
+                int(d, base) * base ** -(i + 1) for i, d in enumerate(fraction)
+            )
+        else:
+            value = int(digits, base)
+        if exponent:
+            value *= base ** int(exponent[1:])
+        return value
+    if "." in text:
+        return float(text)
+    if "e" in text:
+        mantissa, exponent = text.split("e")
+        if int(exponent) < 0:
+            raise EvaluationError("negative exponent of an integer literal")
+        return int(mantissa) * 10 ** int(exponent)
+    return int(text)
+
+
+def _bit_string(text: str) -> int:
+    """Returns the unsigned (or, for s prefixed ones, signed) value"""
+    m = _BIT_STRING.match(text)
+    length, signed, base, digits = m.groups()
+    base = base.lower()
+    digits = digits.replace("_", "")
+    try:
+        value = int(digits, _BASES[base]) if digits else 0
+    except ValueError:
+        raise EvaluationError("bit string {} has no value".format(text))
+    width = int(length) if length else _BITS.get(base, 0) * len(digits)
+    if signed and width and value >> (width - 1) & 1:
+        value -= 1 << width
+    return value
+
+
+class Expression:
+    """A compiled vhdl expression
+
+    The expression is parsed once into a small stack program that can be
+    evaluated many times with different values for its names. Expressions
+    without names are evaluated once when they are compiled.
+
+    Supported are integer, real, based and bit string literals, true and
+    false, the arithmetic, relational and logical operators, parentheses,
+    names (also selected names such as pkg.WIDTH) and calls of functions.
+
+    Attributes:
+        text (str): normalized expression string
+        names (Tuple[str, ...]): lower case names the expression refers to,
+            in order of their first occurrence
+    """
+
+    __slots__ = ("text", "names", "_program", "_value")
+
+    def __init__(self, text: str, program: list, names: Tuple[str, ...]):
+        self.text = text
+        self.names = names
+        self._program = program
+        self._value = None
+        if not names and not any(op == _CALL for op, _ in program):
+            self._value = (self._run({}, FUNCTIONS),)
+
+    def evaluate(
+        self,
+        names: Optional[Dict[str, object]] = None,
+        functions: Optional[Dict[str, Callable]] = None,
+    ):
+        """Evaluates the expression
+
+        Args:
+            names (Optional[Dict[str, object]], optional): values of the
+                names of the expression by lower case name. Defaults to None.
+            functions (Optional[Dict[str, Callable]], optional): functions
+                by lower case name. Defaults to None, see FUNCTIONS.
+
+        Raises:
+            EvaluationError: if a name or function is undefined or an
+                operation fails, e.g. a division by zero
+
+        Returns:
+            the value, e.g. an int, float, bool or str
+        """
+        if self._value is not None:
+            return self._value[0]
+        if functions is None:
+            functions = FUNCTIONS
+        return self._run(names or {}, functions)
+
+    def _run(self, names: Dict[str, object], functions: Dict[str, Callable]):
+        stack = []
+        push = stack.append
+        try:
+            for op, arg in self._program:
+                if op == _PUSH:
+                    push(arg)
+                elif op == _NAME:
+                    push(names[arg])
+                elif op == _BINARY:
+                    b = stack.pop()
+                    stack[-1] = arg(stack[-1], b)
+                elif op == _UNARY:
+                    stack[-1] = arg(stack[-1])
+                else:
+                    name, n = arg
+                    args = stack[len(stack) - n :]
+                    del stack[len(stack) - n :]
+                    push(functions[name](*args))
+        except KeyError as e:
+            raise EvaluationError(
+                "{} is undefined in {}".format(e.args[0], self.text)
+            )
+        except (ArithmeticError, TypeError, ValueError) as e:
+            raise EvaluationError("{} in {}".format(e, self.text))
+        return stack[0]
+
+    def __repr__(self) -> str:
+        return "Expression({})".format(self.text)
+
+
+class _Parser:
+    """Recursive descent parser of one expression, see compile_expression"""
+
+    def __init__(self, tokens: Sequence[Token], i: int, stop: int):
+        self.tokens = tokens
+        self.i = i
+        self.stop = stop
+        self.program = []  # type: List[tuple]
+        self.names = []  # type: List[str]
+
+    def peek(self) -> Optional[str]:
+        """Returns the lower case value of the next token"""
+        if self.i < self.stop:
+            t = self.tokens[self.i]
+            if t.kind in (DELIMITER, KEYWORD):
+                return t.value.lower()
+            return ""
+        return None
+
+    def expect(self, value: str):
+        if self.peek() != value:
+            raise self.error("expected {}".format(value))
+        self.i += 1
+
+    def error(self, message: str) -> EvaluationError:
+        text = render(self.tokens, 0, self.stop)
+        return EvaluationError("{} in {}".format(message, text))
+
+    def parse(self) -> "_Parser":
+        self.expression()
+        if self.i < self.stop:
+            raise self.error("unexpected " + self.tokens[self.i].value)
+        return self
+
+    def binary(self, operand: Callable, operators: Dict[str, Callable]):
+        operand()
+        while self.peek() in operators:
+            op = operators[self.peek()]
+            self.i += 1
+            operand()
+            self.program.append((_BINARY, op))
+
+    def expression(self):
+        self.binary(self.relation, _LOGICAL)
+
+    def relation(self):
+        self.simple()
+        op = self.peek()
+        if op in _RELATIONAL:
+            self.i += 1
+            self.simple()
+            self.program.append((_BINARY, _RELATIONAL[op]))
+
+    def simple(self):
+        sign = self.peek()
+        if sign in ("+", "-"):
+            # the sign applies to the whole first term, e.g. -a*b is -(a*b)
+            self.i += 1
+            self.term()
+            self.program.append((_UNARY, _NEGATE if sign == "-" else _PLUS))
+        else:
+            self.term()
+        while self.peek() in _ADDING:
+            op = _ADDING[self.peek()]
+            self.i += 1
+            self.term()
+            self.program.append((_BINARY, op))
+
+    def term(self):
+        self.binary(self.factor, _MULTIPLYING)
+
+    def factor(self):
+        op = self.peek()
+        if op in ("abs", "not"):
+            self.i += 1
+            self.primary()
+            self.program.append((_UNARY, abs if op == "abs" else _not))
+            return
+        self.primary()
+        if self.peek() == "**":
+            self.i += 1
+            self.primary()
+            self.program.append((_BINARY, _power))
+
+    def primary(self):
+        if self.i >= self.stop:
+            raise self.error("unexpected end")
+        t = self.tokens[self.i]
+        self.i += 1
+        if t.kind == NUMBER:
+            self.program.append((_PUSH, _number(t.value)))
+        elif t.kind == BIT_STRING:
+            self.program.append((_PUSH, _bit_string(t.value)))
+        elif t.kind in (STRING, CHARACTER):
+            value = t.value[1:-1].replace('""', '"')
+            self.program.append((_PUSH, value))
+        elif t.kind == DELIMITER and t.value == "(":
+            self.expression()
+            self.expect(")")
+        elif t.kind == IDENTIFIER:
+            self.name(t)
+        else:
+            raise self.error("unexpected " + t.value)
+
+    def name(self, t: Token):
+        parts = [t.value.lower()]
+        while self.peek() == "." and self.i + 1 < self.stop:
+            parts.append(self.tokens[self.i + 1].value.lower())
+            self.i += 2
+        if self.peek() == "'":
+            raise self.error("attributes are not supported")
+        if self.peek() == "(":
+            self.i += 1
+            n = 0
+            if self.peek() != ")":
+                self.expression()
+                n = 1
+                while self.peek() == ",":
+                    self.i += 1
+                    self.expression()
+                    n += 1
+            self.expect(")")
+            # functions of packages are called by their simple name
+            self.program.append((_CALL, (parts[-1], n)))
+            return
+        name = ".".join(parts)
+        if name in _LITERALS:
+            self.program.append((_PUSH, _LITERALS[name]))
+            return
+        if name not in self.names:
+            self.names.append(name)
+        self.program.append((_NAME, name))
+
+
+def _not(a):
+    return not a
+
+
+def _compile(tokens: Sequence[Token], i: int, stop: int) -> Expression:
+    parser = _Parser(tokens, i, stop).parse()
+    return Expression(
+        render(tokens, i, stop), parser.program, tuple(parser.names)
+    )
+
+
+@lru_cache(maxsize=4096)
+def compile_expression(text: str) -> Expression:
+    """Compiles an expression string
+
+    Compiled expressions are cached by their string, so every distinct
+    expression is only parsed once.
+
+    Args:
+        text (str): expression string, e.g. "2**ADDR_WIDTH - 1"
+
+    Raises:
+        EvaluationError: if the string is not a supported expression
+
+    Returns:
+        Expression: compiled expression
+    """
+    tokens = list(tokenize(text, comments=False))
+    if not tokens:
+        raise EvaluationError("empty expression")
+    return _compile(tokens, 0, len(tokens))
+
+
+def evaluate(
+    text: str,
+    names: Optional[Dict[str, object]] = None,
+    functions: Optional[Dict[str, Callable]] = None,
+):
+    """Evaluates an expression string
+
+    Args:
+        text (str): expression string, e.g. 'x"0F" + 2**4'
+        names (Optional[Dict[str, object]], optional): values of the names
+            in the expression. Names are case insensitive. Defaults to None.
+        functions (Optional[Dict[str, Callable]], optional): functions by
+            lower case name. Defaults to None, see FUNCTIONS.
+
+    Raises:
+        EvaluationError: if the expression can not be evaluated
+
+    Returns:
+        the value, e.g. an int, float, bool or str
+    """
+    expression = compile_expression(text)
+    if names:
+        names = {name.lower(): value for name, value in names.items()}
+    return expression.evaluate(names, functions)
+
+
+class Range(namedtuple("Range", "left direction right")):
+    """A range such as "N-1 downto 0" with evaluated bounds
+
+    Attributes:
+        left (int): left bound
+        direction (str): "to" or "downto"
+        right (int): right bound
+    """
+
+    __slots__ = ()
+
+    @property
+    def length(self) -> int:
+        """int: number of values in the range, 0 for a null range"""
+        if self.direction == "to":
+            return max(0, self.right - self.left + 1)
+        return max(0, self.left - self.right + 1)
+
+    @property
+    def low(self):
+        return self.left if self.direction == "to" else self.right
+
+    @property
+    def high(self):
+        return self.right if self.direction == "to" else self.left
+
+
+RangeExpression = namedtuple("RangeExpression", "left direction right")
+RangeExpression.__doc__ = """A compiled range, see compile_range
+
+Attributes:
+    left (Expression): left bound
+    direction (str): "to" or "downto"
+    right (Expression): right bound
+"""
+
+
+@lru_cache(maxsize=4096)
+def compile_range(text: str) -> Optional[RangeExpression]:
+    """Compiles the first range constraint of a type string
+
+    Recognized are range constraints ("integer range 0 to N") and the first
+    index constraint of an array type ("std_logic_vector(N-1 downto 0)").
+    Compiled ranges are cached by their string.
+
+    Args:
+        text (str): type or range string
+
+    Raises:
+        EvaluationError: if a bound is not a supported expression
+
+    Returns:
+        Optional[RangeExpression]: compiled range, None if the string has no
+            range with a direction, e.g. "integer" or "natural range <>"
+    """
+    tokens = list(tokenize(text, comments=False))
+    n = len(tokens)
+    for i, t in enumerate(tokens):
+        if t.kind == KEYWORD and t.value.lower() == "range":
+            return _range(tokens, i + 1, n)
+        if t.kind == DELIMITER and t.value == "(":
+            return _range(tokens, i + 1, vhdl._closing(tokens, i, n))
+    if n > 2:
+        # a plain range, e.g. "7 downto 0"
+        return _range(tokens, 0, n)
+    return None
+
+
+def _range(
+    tokens: Sequence[Token], i: int, stop: int
+) -> Optional[RangeExpression]:
+    """Compiles "<left> to|downto <right>" up to the first comma"""
+    if stop < 0:
+        stop = len(tokens)
+    depth = 0
+    direction = -1
+    for j in range(i, stop):
+        t = tokens[j]
+        if t.kind == DELIMITER:
+            if t.value == "(":
+                depth += 1
+            elif t.value == ")":
+                depth -= 1
+            elif t.value == "," and depth == 0:
+                stop = j
+                break
+        elif t.kind == KEYWORD and depth == 0 and direction < 0:
+            if t.value.lower() in ("to", "downto"):
+                direction = j
+    if direction < 0:
+        return None
+    return RangeExpression(
+        _compile(tokens, i, direction),
+        tokens[direction].value.lower(),
+        _compile(tokens, direction + 1, stop),
+    )
+
+
+def get_range(
+    text: str,
+    names: Optional[Dict[str, object]] = None,
+    functions: Optional[Dict[str, Callable]] = None,
+) -> Optional[Range]:
+    """Evaluates the first range constraint of a type string
+
+    Args:
+        text (str): type or range string, e.g. "integer range 0 to 2**17"
+        names (Optional[Dict[str, object]], optional): values of the names
+            in the bounds. Names are case insensitive. Defaults to None.
+        functions (Optional[Dict[str, Callable]], optional): functions by
+            lower case name. Defaults to None, see FUNCTIONS.
+
+    Raises:
+        EvaluationError: if a bound can not be evaluated
+
+    Returns:
+        Optional[Range]: evaluated range, None if the string has no range
+    """
+    compiled = compile_range(text)
+    if compiled is None:
+        return None
+    if names:
+        names = {name.lower(): value for name, value in names.items()}
+    return Range(
+        compiled.left.evaluate(names, functions),
+        compiled.direction,
+        compiled.right.evaluate(names, functions),
+    )
+
+
+class Resolver:
+    """Resolves the values of constants and generics
+
+    Declarations are added by scope, the lower case name of a package or
+    entity, or None for global names. A name within an expression is looked
+    up in the scope of its declaration, then in the scopes made visible by
+    use clauses, then in the global scope. Selected names such as pkg.WIDTH
+    or work.pkg.WIDTH are looked up in the named package.
+
+    Every value is computed once and memoized until the next declarations
+    are added. Values are resolved in dependency order with an explicit stack,
+    so long chains of constants do not hit the recursion limit, and circular
+    references are reported as errors.
+
+    Args:
+        functions (Optional[Dict[str, Callable]], optional): functions by
+            lower case name. Defaults to None, see FUNCTIONS.
+
+    Attributes:
+        functions (Dict[str, Callable]): functions by lower case name
+        errors (Dict[str, str]): qualified names that could not be resolved
+            with the reason
+    """
+
+    def __init__(self, functions: Optional[Dict[str, Callable]] = None):
+        self.functions = FUNCTIONS if functions is None else functions
+        self._declarations = {}  # type: Dict[tuple, object]
+        # declarations whose value is not a supported expression
+        self._invalid = {}  # type: Dict[tuple, str]
+        self._uses = {}  # type: Dict[Optional[str], List[str]]
+        # memoized values and errors, they may depend on any declaration
+        self._values = {}  # type: Dict[tuple, object]
+        self._failed = {}  # type: Dict[tuple, str]
+
+    @property
+    def errors(self) -> Dict[str, str]:
+        errors = {_qualified(k): e for k, e in self._invalid.items()}
+        errors.update((_qualified(k), e) for k, e in self._failed.items())
+        return errors
+
+    def add(self, name: str, value, scope: Optional[str] = None):
+        """Adds one declaration
+
+        Args:
+            name (str): constant or generic name
+            value: expression string or a value, e.g. an int
+            scope (Optional[str], optional): package or entity name. Defaults
+                to None, the global scope.
+
+        Raises:
+            EvaluationError: if the expression string is not supported
+        """
+        if isinstance(value, str):
+            value = compile_expression(value)
+        key = (_scope(scope), name.lower())
+        self._declarations[key] = value
+        self._invalid.pop(key, None)
+        self._invalidate()
+
+    def add_records(
+        self, records: Iterable[tuple], scope: Optional[str] = None
+    ):
+        """Adds constants or generics
+
+        Records without a value, e.g. deferred constants or generics
+        without a default, are skipped. Records whose value is not a
+        supported expression (e.g. an aggregate) are recorded in errors.
+
+        Args:
+            records (Iterable[tuple]): Constant or Generic records
+            scope (Optional[str], optional): package or entity name. Defaults
+                to None, the global scope.
+        """
+        self._add_records(records, _scope(scope))
+        self._invalidate()
+
+    def _add_records(self, records: Iterable[tuple], scope: Optional[str]):
+        declarations = self._declarations
+        invalid = self._invalid
+        for name, _, value in records:
+            if value is None:
+                continue
+            key = (scope, name.lower())
+            try:
+                declarations[key] = compile_expression(value)
+                invalid.pop(key, None)
+            except EvaluationError as e:
+                declarations.pop(key, None)
+                invalid[key] = str(e)
+
+    def use(self, scope: Optional[str], used: str):
+        """Makes the names of a package visible within a scope
+
+        Args:
+            scope (Optional[str]): package or entity name
+            used (str): package name
+        """
+        if self._use(_scope(scope), used.lower()):
+            self._invalidate()
+
+    def _use(self, scope: Optional[str], used: str) -> bool:
+        uses = self._uses.setdefault(scope, [])
+        if used in uses or used == scope:
+            return False
+        uses.append(used)
+        return True
+
+    def add_text(self, text: str):
+        """Adds all constants and generics of vhdl file content
+
+        Constants of a package and its body are added to the scope of the
+        package, generics and constants of an entity and its architectures
+        to the scope of the entity. Use clauses in front of a unit make the
+        used packages visible within its scope.
+
+        Memoized values are dropped once for the whole input, so adding a
+        file costs time in proportion to its size.
+
+        Args:
+            text (str): input string
+        """
+        tokens = vhdl.parse_vhdl(text).tokens
+        uses = [
+            (start, name[-2])
+            for start, name in iter_uses(tokens)
+            if len(name) > 1
+        ]
+        u = 0
+        for unit in vhdl.split_units(tokens):
+            if unit.kind in ("architecture", "configuration"):
+                scope = _scope(unit.of)
+            elif unit.kind == "context":
+                continue
+            else:
+                scope = _scope(unit.name)
+            # use clauses between the previous unit and this one
+            while u < len(uses) and uses[u][0] < unit.start:
+                self._use(scope, uses[u][1])
+                u += 1
+            while u < len(uses) and uses[u][0] < unit.end:
+                u += 1
+            self._add_records(unit.generics or [], scope)
+            self._add_records(unit.constants or [], scope)
+        self._invalidate()
+
+    def resolve(self, name: str, scope: Optional[str] = None):
+        """Resolves the value of one name
+
+        Args:
+            name (str): name, e.g. "WIDTH" or "pkg.WIDTH"
+            scope (Optional[str], optional): scope to look the name up in.
+                Defaults to None, the global scope.
+
+        Raises:
+            EvaluationError: if the name is undefined, its expression can not
+                be evaluated or it refers to itself
+
+        Returns:
+            the value
+        """
+        return self._resolve(self._lookup(name.lower(), _scope(scope)))
+
+    def resolve_all(self) -> Dict[str, object]:
+        """Resolves all declarations in one batch
+
+        Names that can not be resolved are recorded in errors instead of
+        raising.
+
+        Returns:
+            Dict[str, object]: values by qualified lower case name, e.g.
+                "pkg.width"
+        """
+        for key in self._declarations:
+            if key not in self._values and key not in self._failed:
+                try:
+                    self._resolve(key)
+                except EvaluationError:
+                    pass
+        return {
+            _qualified(key): value
+            for key, value in self._values.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._declarations)
+
+    def _invalidate(self):
+        self._values.clear()
+        self._failed.clear()
+
+    def _lookup(self, name: str, scope: Optional[str]) -> tuple:
+        """Returns the declaration key of a name as seen from a scope"""
+        parts = name.split(".")
+        if len(parts) > 1:
+            keys = [(parts[-2], parts[-1])]
+        else:
+            keys = [(scope, name)]
+            keys.extend((used, name) for used in self._uses.get(scope, ()))
+            keys.append((None, name))
+        for key in keys:
+            if key in self._declarations or key in self._invalid:
+                return key
+        raise EvaluationError(
+            "{} is undefined in {}".format(name, scope or "global scope")
+        )
+
+    def _resolve(self, key: tuple):
+        values = self._values
+        if key in values:
+            return values[key]
+        failed = self._failed
+        invalid = self._invalid
+        error = failed.get(key, invalid.get(key))
+        if error is not None:
+            raise EvaluationError(error)
+        root = key
+        declarations = self._declarations
+        # every frame is the key, the index of its next name and the values
+        # of its names
+        stack = [[key, 0, {}]]
+        visiting = {key}
+        try:
+            while stack:
+                frame = stack[-1]
+                key, i, bound = frame
+                value = declarations[key]
+                if not isinstance(value, Expression):
+                    values[key] = value
+                    visiting.discard(key)
+                    stack.pop()
+                    continue
+                names = value.names
+                dependency = None
+                while i < len(names):
+                    dependency = self._lookup(names[i], key[0])
+                    if dependency in values:
+                        bound[names[i]] = values[dependency]
+                        i += 1
+                        dependency = None
+                        continue
+                    error = failed.get(dependency, invalid.get(dependency))
+                    if error is not None:
+                        raise EvaluationError(
+                            "{} depends on {}: {}".format(
+                                _qualified(key), _qualified(dependency), error
+                            )
+                        )
+                    if dependency in visiting:
+                        cycle = [_qualified(f[0]) for f in stack]
+                        cycle.append(_qualified(dependency))
+                        raise EvaluationError(
+                            "circular reference " + " -> ".join(cycle)
+                        )
+                    break
+                frame[1] = i
+                if dependency is not None:
+                    visiting.add(dependency)
+                    stack.append([dependency, 0, {}])
+                    continue
+                values[key] = value.evaluate(bound, self.functions)
+                visiting.discard(key)
+                stack.pop()
+        except EvaluationError as e:
+            for frame in stack:
+                failed[frame[0]] = str(e)
+            raise
+        return values[root]
+
+
+def _scope(scope: Optional[str]) -> Optional[str]:
+    return None if scope is None else scope.lower()
+
+
+def _qualified(key: tuple) -> str:
+    scope, name = key
+    return name if scope is None else scope + "." + name
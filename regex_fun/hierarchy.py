@@ -0,0 +1,353 @@
+from collections import OrderedDict, namedtuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from regex_fun import vhdl
+from regex_fun.architecture import index_unit
+from regex_fun.batch import find_files, map_files
+from regex_fun.expressions import EvaluationError, Resolver, compile_expression
+from regex_fun.records import Instantiation, Port
+from regex_fun.widths import PortWidths
+
+# summary of one library unit, see _summarize. entities carry generics and
+# ports, architectures their instantiations and packages their constants
+_Unit = namedtuple("_Unit", "kind name of items")
+
+
+def _summarize(text: Union[str, bytes]) -> List[_Unit]:
+    """Extracts what elaboration needs from vhdl file content"""
+    units = []
+    for unit in vhdl.iter_design_units(text):
+        if unit.kind == "entity":
+            items = (unit.generics or [], unit.ports or [])
+        elif unit.kind == "architecture":
+            items = index_unit(unit).instances
+        elif unit.kind in ("package", "package body"):
+            items = unit.constants or []
+        else:
+            continue
+        units.append(_Unit(unit.kind, unit.name, unit.of, items))
+    return units
+
+
+def _read_units(path: str) -> Tuple[str, Optional[List[_Unit]], str]:
+    """Reads the units of a file, see Design.scan"""
+    try:
+        with open(path, "rb") as f:
+            return path, _summarize(f.read()), ""
+    except (OSError, ValueError) as e:
+        return path, None, repr(e)
+
+
+class Node:
+    """An elaborated entity
+
+    Instances of the same entity and architecture with the same generic
+    values are elaborated once and share one node, so a design with many
+    identical instances is a small graph of nodes. :meth:`walk` expands it
+    into the full instance tree.
+
+    Attributes:
+        entity (str): entity name as declared
+        architecture (Optional[str]): architecture name, None if the entity
+            has no architecture
+        generics (OrderedDict[str, object]): value of every generic by lower
+            case name, None if the value could not be evaluated
+        ports (List[Port]): ports of the entity
+        widths (OrderedDict[str, Optional[int]]): bit width by port name,
+            see :class:`regex_fun.widths.PortWidths`
+        children (List[Tuple[str, Optional[Node]]]): instance label and
+            node of every instantiation, None if the instantiated unit is
+            not part of the design
+    """
+
+    __slots__ = (
+        "entity",
+        "architecture",
+        "generics",
+        "ports",
+        "widths",
+        "children",
+        "_count",
+    )
+
+    def __init__(
+        self,
+        entity: str,
+        architecture: Optional[str],
+        generics: "OrderedDict[str, object]",
+        ports: List[Port],
+        widths: "OrderedDict[str, Optional[int]]",
+    ):
+        self.entity = entity
+        self.architecture = architecture
+        self.generics = generics
+        self.ports = ports
+        self.widths = widths
+        self.children = []  # type: List[Tuple[str, Optional[Node]]]
+        self._count = None
+
+    def count(self) -> int:
+        """Returns the number of instances in the tree, including this one"""
+        if self._count is None:
+            # shared nodes are counted once per instance, but computed once
+            self._count = 1 + sum(
+                node.count() for _, node in self.children if node is not None
+            )
+        return self._count
+
+    def walk(self, path: Optional[str] = None) -> Iterator[Tuple[str, "Node"]]:
+        """Iterates over the instance tree in depth-first order
+
+        Args:
+            path (Optional[str], optional): path of this node. Defaults to
+                None, the entity name.
+
+        Yields:
+            Tuple[str, Node]: hierarchical path, e.g. "top/u0/u3", and node
+                of every instance
+        """
+        stack = [(self.entity if path is None else path, self)]
+        while stack:
+            path, node = stack.pop()
+            yield path, node
+            for label, child in reversed(node.children):
+                if child is not None:
+                    stack.append((path + "/" + label, child))
+
+    def __repr__(self) -> str:
+        return "Node({}({}), {} instances)".format(
+            self.entity, self.architecture, self.count()
+        )
+
+
+class Design:
+    """Entities, architectures and packages of a design, for elaboration
+
+    Every file is parsed once when it is added, and every entity keeps its
+    generics, ports, compiled port widths and the instantiations of its
+    architectures. Elaboration only works on this summary and never reads a
+    file again. Package constants are resolved with
+    :class:`regex_fun.expressions.Resolver` and are visible to all generic
+    and port expressions.
+
+    Components are bound to the entity of the same name, entity
+    instantiations without an architecture to the last architecture added.
+    Generate statements are not unrolled, instances within them are
+    elaborated once.
+
+    Attributes:
+        errors (Dict[str, str]): files that could not be read and instances
+            that could not be elaborated, with the reason
+    """
+
+    def __init__(self):
+        self.errors = {}  # type: Dict[str, str]
+        self._entities = {}  # type: Dict[str, Tuple[str, list, list]]
+        # architectures of every entity with their instantiations
+        self._architectures = {}  # type: Dict[str, OrderedDict]
+        self._resolver = Resolver()
+        self._constants = None  # type: Optional[dict]
+        self._widths = {}  # type: Dict[str, PortWidths]
+        self._nodes = {}  # type: Dict[tuple, Node]
+
+    @classmethod
+    def scan(cls, root: str, workers: Optional[int] = None) -> "Design":
+        """Adds all vhdl files in a directory tree
+
+        The files are parsed in parallel with
+        :func:`regex_fun.batch.map_files`.
+
+        Args:
+            root (str): root directory
+            workers (Optional[int], optional): number of worker processes.
+                Defaults to None, the number of CPUs.
+
+        Returns:
+            Design: design of all files
+        """
+        return cls.from_files(find_files(root), workers)
+
+    @classmethod
+    def from_files(
+        cls, paths: Iterable[str], workers: Optional[int] = None
+    ) -> "Design":
+        """Adds vhdl files, parsed in parallel
+
+        Args:
+            paths (Iterable[str]): paths of the files
+            workers (Optional[int], optional): number of worker processes.
+                Defaults to None, the number of CPUs.
+
+        Returns:
+            Design: design of all files
+        """
+        design = cls()
+        for path, units, error in map_files(_read_units, paths, workers):
+            if units is None:
+                design.errors[path] = error
+            else:
+                design._add(units)
+        return design
+
+    def add_text(self, text: Union[str, bytes]):
+        """Adds the units of vhdl file content
+
+        Args:
+            text (Union[str, bytes]): input string or bytes, see
+                :func:`regex_fun.vhdl.parse_vhdl`
+        """
+        self._add(_summarize(text))
+
+    def _add(self, units: List[_Unit]):
+        for kind, name, of, items in units:
+            key = name.lower()
+            if kind == "entity":
+                self._entities[key] = (name, items[0], items[1])
+                self._widths.pop(key, None)
+            elif kind == "architecture":
+                architectures = self._architectures.setdefault(
+                    of.lower(), OrderedDict()
+                )
+                # the last architecture added is the default one
+                architectures.pop(key, None)
+                architectures[key] = items
+            else:
+                self._resolver.add_records(items, key)
+                self._constants = None
+        self._nodes.clear()
+
+    @property
+    def entities(self) -> List[str]:
+        """List[str]: names of all entities as declared"""
+        return [entity[0] for entity in self._entities.values()]
+
+    def elaborate(
+        self,
+        top: str,
+        generics: Optional[Dict[str, object]] = None,
+        architecture: Optional[str] = None,
+    ) -> Node:
+        """Elaborates the instance tree below a top entity
+
+        Args:
+            top (str): name of the top entity
+            generics (Optional[Dict[str, object]], optional): values of the
+                generics of the top entity, see
+                :meth:`regex_fun.widths.PortWidths.generics`. Defaults to
+                None, the default values.
+            architecture (Optional[str], optional): architecture of the top
+                entity. Defaults to None, the last one added.
+
+        Raises:
+            KeyError: if the top entity is not part of the design
+
+        Returns:
+            Node: top node
+        """
+        key = top.lower()
+        if key not in self._entities:
+            raise KeyError("unknown entity: {}".format(top))
+        name = self._entities[key][0]
+        return self._node(key, architecture, generics or {}, name, ())
+
+    def _constant_values(self) -> dict:
+        if self._constants is None:
+            self._constants = self._resolver.resolve_all()
+        return self._constants
+
+    def _port_widths(self, key: str) -> PortWidths:
+        widths = self._widths.get(key)
+        if widths is None:
+            _, generics, ports = self._entities[key]
+            widths = PortWidths(ports, generics, self._constant_values())
+            self._widths[key] = widths
+        return widths
+
+    def _node(
+        self,
+        key: str,
+        architecture: Optional[str],
+        overrides: Dict[str, object],
+        path: str,
+        parents: Tuple[tuple, ...],
+    ) -> Node:
+        """Elaborates one entity, reusing the node of identical instances"""
+        name, generics, ports = self._entities[key]
+        architectures = self._architectures.get(key, {})
+        if architecture is None and architectures:
+            architecture = next(reversed(architectures))
+        architecture = None if architecture is None else architecture.lower()
+        widths = self._port_widths(key)
+        values = widths.generics(overrides)
+        resolved = OrderedDict(
+            (generic.name.lower(), values.get(generic.name.lower()))
+            for generic in generics
+        )
+        node_key = (key, architecture, tuple(resolved.items()))
+        try:
+            node = self._nodes.get(node_key)
+        except TypeError:
+            # unhashable generic values are never shared
+            node, node_key = None, None
+        if node is not None:
+            return node
+        # unhashable generics are told apart by entity and architecture only
+        stack_key = (key, architecture) if node_key is None else node_key
+        if stack_key in parents:
+            raise EvaluationError("recursive instantiation of " + name)
+        parents += (stack_key,)
+        node = Node(
+            name,
+            architecture,
+            resolved,
+            ports,
+            widths.widths(resolved),
+        )
+        for instance in architectures.get(architecture, ()):
+            label = instance.label
+            child = self._child(
+                instance, values, path + "/" + label, parents
+            )
+            node.children.append((label, child))
+        if node_key is not None:
+            self._nodes[node_key] = node
+        return node
+
+    def _child(
+        self,
+        instance: Instantiation,
+        values: dict,
+        path: str,
+        parents: Tuple[tuple, ...],
+    ) -> Optional[Node]:
+        """Elaborates the unit of an instantiation, see _node"""
+        if instance.kind == "configuration":
+            self.errors[path] = "configurations are not supported"
+            return None
+        unit = instance.unit
+        architecture = None
+        if unit.endswith(")"):
+            unit, architecture = unit[:-1].split("(", 1)
+        key = unit.rsplit(".", 1)[-1].strip().lower()
+        if key not in self._entities:
+            self.errors[path] = "unknown entity: {}".format(unit)
+            return None
+        overrides = {}
+        formals = [generic.name for generic in self._entities[key][1]]
+        for i, (formal, actual) in enumerate(instance.generic_map):
+            if formal is None:
+                if i >= len(formals):
+                    continue
+                formal = formals[i]
+            if actual.lower() == "open":
+                continue
+            try:
+                overrides[formal] = compile_expression(actual).evaluate(
+                    values
+                )
+            except EvaluationError as e:
+                self.errors[path + ":" + formal] = str(e)
+        try:
+            return self._node(key, architecture, overrides, path, parents)
+        except EvaluationError as e:
+            self.errors[path] = str(e)
+            return None
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Iterator, List, Optional
+from regex_fun.batch import FileRecord, find_files, parse_files
+from regex_fun.records import Constant, Generic, Port
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    entity TEXT,
+    errors TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS generics (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS ports (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    type TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS constants (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS generics_path ON generics(path);
+CREATE INDEX IF NOT EXISTS ports_path ON ports(path);
+CREATE INDEX IF NOT EXISTS constants_path ON constants(path);
+"""
+
+# tables holding the records of a file, in the order of the FileRecord fields
+_SECTIONS = ("generics", "ports", "constants")
+_RECORDS = (Generic, Port, Constant)
+# a section that could not be parsed (None) is stored as this single row
+_NONE = -1
+
+
+def _digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class DesignIndex:
+    """Persistent index of all vhdl files in a directory tree
+
+    The index is stored in a SQLite file. For every vhdl file it keeps the
+    path, modification time, size and content hash together with the parsed
+    entity, generics, ports and constants.
+
+    :meth:`update` only parses files that changed since the last update. A
+    file whose modification time and size are unchanged is not even read.
+    A file with a new modification time but the same content hash is not
+    parsed again.
+
+    Args:
+        path (str): path of the SQLite file, ":memory:" for a temporary index
+    """
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        """Closes the SQLite file"""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, root: str, workers: Optional[int] = 1) -> dict:
+        """Brings the index up to date with a directory tree
+
+        Files are found with :func:`regex_fun.batch.find_files`. Changed and
+        new files are parsed with :func:`regex_fun.batch.parse_files`, records
+        of files that no longer exist are removed. A file that disappears
+        while the tree is walked counts as removed.
+
+        Args:
+            root (str): root directory
+            workers (Optional[int], optional): number of worker processes to
+                parse changed files with. Defaults to 1.
+
+        Returns:
+            dict: number of "added", "changed", "removed", "touched" (new
+                modification time, same content) and "unchanged" files
+        """
+        root = os.path.abspath(root)
+        prefix = os.path.join(root, "")
+        known = {
+            path: (mtime, size, digest)
+            for path, mtime, size, digest in self._db.execute(
+                "SELECT path, mtime, size, hash FROM files"
+            )
+            if path.startswith(prefix)
+        }
+        stats = dict.fromkeys(
+            ("added", "changed", "removed", "touched", "unchanged"), 0
+        )
+        stale, touched = {}, []
+        for path in find_files(root):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            old = known.get(path)
+            if old is not None and old[:2] == (st.st_mtime_ns, st.st_size):
+                del known[path]
+                stats["unchanged"] += 1
+                continue
+            try:
+                digest = _digest(path)
+            except OSError:
+                continue
+            known.pop(path, None)
+            if old is not None and old[2] == digest:
+                touched.append((st.st_mtime_ns, st.st_size, path))
+                continue
+            stale[path] = (st.st_mtime_ns, st.st_size, digest)
+            stats["added" if old is None else "changed"] += 1
+        stats["touched"] = len(touched)
+        stats["removed"] = len(known)
+        with self._db:
+            self._db.executemany(
+                "DELETE FROM files WHERE path = ?", ((p,) for p in known)
+            )
+            self._db.executemany(
+                "UPDATE files SET mtime = ?, size = ? WHERE path = ?", touched
+            )
+            for record in parse_files(list(stale), workers):
+                self._store(record, *stale[record.path])
+        return stats
+
+    def _store(self, record: FileRecord, mtime: int, size: int, digest: str):
+        path = record.path
+        self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+        errors = json.dumps(record.errors)
+        self._db.execute(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            (path, mtime, size, digest, record.entity, errors),
+        )
+        for table, items in zip(_SECTIONS, record[2:5]):
+            rows = (
+                [(path, _NONE, "", "", "")]
+                if items is None
+                else [(path, i) + tuple(item) for i, item in enumerate(items)]
+            )
+            self._db.executemany(
+                "INSERT INTO {} VALUES (?, ?, ?, ?, ?)".format(table), rows
+            )
+
+    def _section(self, table: str, record: type, path: str) -> Optional[list]:
+        rows = self._db.execute(
+            "SELECT position, * FROM {} WHERE path = ? "
+            "ORDER BY position".format(table),
+            (path,),
+        ).fetchall()
+        if rows and rows[0][0] == _NONE:
+            return None
+        return [record(*row[3:]) for row in rows]
+
+    def get(self, path: str) -> Optional[FileRecord]:
+        """Returns the indexed record of a file
+
+        Args:
+            path (str): path of the file
+
+        Returns:
+            Optional[FileRecord]: record, None if the file is not indexed
+        """
+        path = os.path.abspath(path)
+        row = self._db.execute(
+            "SELECT entity, errors FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return None
+        sections = [
+            self._section(table, record, path)
+            for table, record in zip(_SECTIONS, _RECORDS)
+        ]
+        return FileRecord(path, row[0], *sections, json.loads(row[1]))
+
+    def paths(self) -> List[str]:
+        """Returns the paths of all indexed files
+
+        Returns:
+            List[str]: sorted paths
+        """
+        rows = self._db.execute("SELECT path FROM files ORDER BY path")
+        return [row[0] for row in rows]
+
+    def records(self) -> Iterator[FileRecord]:
+        """Yields the indexed record of every file
+
+        Yields:
+            FileRecord: record of every file, sorted by path
+        """
+        for path in self.paths():
+            yield self.get(path)
@@ -0,0 +1,295 @@
+import csv
+import json
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from regex_fun import vhdl
+from regex_fun.batch import SECTIONS
+
+# phases of the parser in the order they usually run. comments are dropped
+# while tokenizing, so stripping them is part of the tokenize phase
+PHASES = (
+    "tokenize",
+    "normalize",
+    "entity",
+    "generics",
+    "ports",
+    "architecture",
+    "constants",
+)
+
+# selects all files in Profiler.phases
+_ALL = object()
+
+Stats = namedtuple("Stats", "calls seconds size matches")
+Stats.__doc__ = """Aggregated measurements of parser calls
+
+Attributes:
+    calls (int): number of calls
+    seconds (float): total wall time
+    size (int): total number of characters of the inputs
+    matches (int): total number of tokens (tokenize) or records found
+"""
+
+Outlier = namedtuple("Outlier", "file seconds size ratio")
+Outlier.__doc__ = """A file that took much longer to parse than others
+
+Attributes:
+    file (str): name of the file
+    seconds (float): parse time of the file
+    size (int): number of characters of the file
+    ratio (float): parse time per character relative to the median
+"""
+
+
+def _matches(value) -> int:
+    """Counts what a phase found: tokens, records, or 1 for a unit"""
+    if value is None:
+        return 0
+    if isinstance(value, list):
+        return len(value)
+    return 1
+
+
+class Profiler:
+    """Records wall time, input size and match count of every parser phase
+
+    Measurements are aggregated per file and phase as they are recorded, so
+    memory only grows with the number of files. Inputs are attributed to the
+    file set with :meth:`file`, or to None.
+
+    Only parsing in this process is recorded, parsing in the worker
+    processes of :mod:`regex_fun.batch` is not.
+    """
+
+    def __init__(self):
+        # file -> phase -> [calls, seconds, size, matches]
+        self._stats = OrderedDict()  # type: Dict[Optional[str], Dict]
+        self._file = None  # type: Optional[str]
+
+    def record(self, phase: str, seconds: float, size: int, value):
+        """Records one call of a phase
+
+        Args:
+            phase (str): name of the phase, see :data:`PHASES`
+            seconds (float): wall time of the call
+            size (int): number of characters of the input
+            value: result of the call, counted with its length
+        """
+        phases = self._stats.get(self._file)
+        if phases is None:
+            phases = self._stats[self._file] = {}
+        stats = phases.get(phase)
+        if stats is None:
+            stats = phases[phase] = [0, 0.0, 0, 0]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] += size
+        stats[3] += _matches(value)
+
+    @contextmanager
+    def file(self, name: Optional[str]) -> Iterator[None]:
+        """Attributes all calls within the context to a file
+
+        Args:
+            name (Optional[str]): name of the file, e.g. its path
+        """
+        previous = self._file
+        self._file = name
+        try:
+            yield
+        finally:
+            self._file = previous
+
+    def clear(self):
+        """Drops all measurements"""
+        self._stats.clear()
+
+    @property
+    def files(self) -> List[Optional[str]]:
+        """List[Optional[str]]: files in the order they were first seen"""
+        return list(self._stats)
+
+    def phases(self, file=_ALL) -> "OrderedDict[str, Stats]":
+        """Returns the measurements per phase
+
+        Args:
+            file (Optional[str], optional): only the calls of this file.
+                Defaults to all files.
+
+        Returns:
+            OrderedDict[str, Stats]: measurements by phase, in the order of
+                :data:`PHASES`
+        """
+        if file is _ALL:
+            files = list(self._stats.values())
+        else:
+            files = [self._stats.get(file, {})]
+        totals = {}  # type: Dict[str, list]
+        for phases in files:
+            for phase, stats in phases.items():
+                total = totals.setdefault(phase, [0, 0.0, 0, 0])
+                for i, value in enumerate(stats):
+                    total[i] += value
+        order = list(PHASES) + sorted(set(totals) - set(PHASES))
+        return OrderedDict(
+            (phase, Stats(*totals[phase]))
+            for phase in order
+            if phase in totals
+        )
+
+    def totals(self) -> "OrderedDict[Optional[str], Stats]":
+        """Returns the measurements per file, summed over all phases
+
+        The size of a file is the size of its largest input, as every phase
+        reads the same input.
+
+        Returns:
+            OrderedDict[Optional[str], Stats]: measurements by file
+        """
+        result = OrderedDict()  # type: OrderedDict
+        for file, phases in self._stats.items():
+            values = list(phases.values())
+            result[file] = Stats(
+                sum(stats[0] for stats in values),
+                sum(stats[1] for stats in values),
+                max(stats[2] // stats[0] for stats in values),
+                sum(stats[3] for stats in values),
+            )
+        return result
+
+    def outliers(self, factor: float = 10.0) -> List[Outlier]:
+        """Finds files whose parse time per character is far above the norm
+
+        The norm is the median parse time per character of all files.
+
+        Args:
+            factor (float, optional): minimum ratio to the median. Defaults
+                to 10.
+
+        Returns:
+            List[Outlier]: outliers, slowest per character first
+        """
+        rates = [
+            (file, stats, stats.seconds / max(stats.size, 1))
+            for file, stats in self.totals().items()
+        ]
+        if not rates:
+            return []
+        ordered = sorted(rate for _, _, rate in rates)
+        median = ordered[len(ordered) // 2]
+        if median <= 0:
+            return []
+        outliers = [
+            Outlier(file, stats.seconds, stats.size, rate / median)
+            for file, stats, rate in rates
+            if rate >= factor * median
+        ]
+        outliers.sort(key=lambda outlier: outlier.ratio, reverse=True)
+        return outliers
+
+    def as_dict(self, factor: float = 10.0) -> dict:
+        """Returns all measurements as a dictionary
+
+        Args:
+            factor (float, optional): see :meth:`outliers`. Defaults to 10.
+
+        Returns:
+            dict: "phases" (all files), "files" (per file and phase) and
+                "outliers"
+        """
+        return {
+            "phases": {
+                phase: stats._asdict()
+                for phase, stats in self.phases().items()
+            },
+            "files": [
+                {
+                    "file": file,
+                    "phases": {
+                        phase: stats._asdict()
+                        for phase, stats in self.phases(file).items()
+                    },
+                }
+                for file in self._stats
+            ],
+            "outliers": [
+                outlier._asdict() for outlier in self.outliers(factor)
+            ],
+        }
+
+    def export(self, path: str, format: str = "json"):
+        """Writes all measurements to a file
+
+        Args:
+            path (str): path of the file
+            format (str, optional): "json" for :meth:`as_dict`, "csv" for
+                one row per file and phase. Defaults to "json".
+
+        Raises:
+            ValueError: on an unknown format
+        """
+        if format == "json":
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.as_dict(), f, indent=2)
+        elif format == "csv":
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(("file", "phase") + Stats._fields)
+                for file in self._stats:
+                    for phase, stats in self.phases(file).items():
+                        writer.writerow((file, phase) + tuple(stats))
+        else:
+            raise ValueError("unknown format: {}".format(format))
+
+
+def enable_profiling() -> Profiler:
+    """Records every call of the parser phases
+
+    Once enabled, every phase (see :data:`PHASES`) of
+    :func:`regex_fun.vhdl.parse_vhdl` and the get_* functions is timed.
+    While disabled, which is the default, the phases are called without any
+    measurement. Results served from a cache are not parsed and thus not
+    recorded.
+
+    Calling the function again replaces the profiler with an empty one.
+
+    Returns:
+        Profiler: the profiler
+    """
+    profiler = Profiler()
+    vhdl._profiler = profiler
+    return profiler
+
+
+def disable_profiling():
+    """Disables the profiler enabled with :func:`enable_profiling`"""
+    vhdl._profiler = None
+
+
+def profile_files(
+    paths: Iterable[str], sections: Tuple[str, ...] = SECTIONS
+) -> Profiler:
+    """Parses files in this process and profiles every file
+
+    Args:
+        paths (Iterable[str]): paths of the files
+        sections (Tuple[str, ...], optional): sections to extract. Defaults
+            to all sections.
+
+    Returns:
+        Profiler: measurements attributed to the path of every file
+    """
+    previous = vhdl._profiler
+    profiler = enable_profiling()
+    try:
+        for path in paths:
+            with open(path, "rb") as f:
+                text = f.read()
+            with profiler.file(path):
+                result = vhdl._parse(text)
+                for section in sections:
+                    getattr(result, section)
+    finally:
+        vhdl._profiler = previous
+    return profiler
@@ -0,0 +1,417 @@
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from typing import Callable, Iterator, Optional, Sequence, Tuple
+
+# token kinds
+IDENTIFIER = "identifier"
+KEYWORD = "keyword"
+NUMBER = "number"
+BIT_STRING = "bit_string"
+STRING = "string"
+CHARACTER = "character"
+COMMENT = "comment"
+DELIMITER = "delimiter"
+OTHER = "other"
+
+Token = namedtuple("Token", "kind value start end")
+Token.__doc__ = """A single VHDL token
+
+Attributes:
+    kind (str): token kind, e.g. "identifier" or "delimiter"
+    value (str): token text as found in the input
+    start (int): offset of the first character in the input
+    end (int): offset after the last character in the input
+"""
+
+
+class Span(namedtuple("Span", "start end line column")):
+    """Position of a piece of vhdl code in the unmodified input
+
+    A span is a pair of offsets instead of a copied substring. The text is
+    only copied when it is requested, for bytes-like inputs it can be viewed
+    without any copy.
+
+    Attributes:
+        start (int): offset of the first character
+        end (int): offset after the last character
+        line (int): line of the first character, starting at 1
+        column (int): column of the first character, starting at 1
+    """
+
+    __slots__ = ()
+
+    def text(self, source):
+        """Returns the spanned part of the input
+
+        Args:
+            source (str or bytes-like): the input the span refers to
+
+        Returns:
+            str or bytes: copy of the spanned part
+        """
+        return source[self.start : self.end]
+
+    def view(self, source) -> memoryview:
+        """Returns the spanned part of a bytes-like input without copying it
+
+        Args:
+            source (bytes-like): the input the span refers to, e.g. bytes or
+                a memory-mapped file
+
+        Returns:
+            memoryview: view of the spanned part
+        """
+        return memoryview(source)[self.start : self.end]
+
+
+class LineIndex:
+    """Maps offsets of an input to line and column numbers
+
+    The start offset of every line is found once with a single scan over the
+    input. Every lookup is a binary search over these offsets.
+
+    Args:
+        text (str or bytes-like): input
+    """
+
+    __slots__ = ("_starts",)
+
+    def __init__(self, text):
+        newline = _NEWLINE if isinstance(text, str) else _BYTES_NEWLINE
+        self._starts = array("q", [0])
+        self._starts.extend(m.end() for m in newline.finditer(text))
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Returns the line and column of an offset, both starting at 1
+
+        Args:
+            offset (int): offset in the input
+
+        Returns:
+            Tuple[int, int]: line and column
+        """
+        line = bisect_right(self._starts, offset)
+        return line, offset - self._starts[line - 1] + 1
+
+    def span(self, start: int, end: int) -> Span:
+        """Returns the span of a range of offsets
+
+        Args:
+            start (int): offset of the first character
+            end (int): offset after the last character
+
+        Returns:
+            Span: span with line and column of the start offset
+        """
+        return Span(start, end, *self.position(start))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+
+_NEWLINE = re.compile("\n")
+_BYTES_NEWLINE = re.compile(b"\n")
+
+# reserved words of VHDL-2008 (IEEE 1076-2008, section 15.10)
+KEYWORDS = frozenset(
+    """
+    abs access after alias all and architecture array assert assume
+    assume_guarantee attribute begin block body buffer bus case component
+    configuration constant context cover default disconnect downto else elsif
+    end entity exit fairness file for force function generate generic group
+    guarded if impure in inertial inout is label library linkage literal loop
+    map mod nand new next nor not null of on open or others out package
+    parameter port postponed procedure process property protected pure range
+    record register reject release rem report restrict restrict_guarantee
+    return rol ror select sequence severity shared signal sla sll sra srl
+    strong subtype then to transport type unaffected units until use variable
+    vmode vprop vunit wait when while with xnor xor
+    """.split()
+)
+_BYTES_KEYWORDS = frozenset(word.encode("ascii") for word in KEYWORDS)
+
+# (?:               begin of non-capture group
+#     \s*           zero or more whitespace characters (skipped)
+# )                 end of non-capture group
+# followed by exactly one of the token alternatives below. Every alternative
+# consumes its token without backtracking into earlier characters, so the
+# input is scanned once from left to right. Comments are line comments and
+# VHDL-2008 block comments, an unterminated block comment runs to the end of
+# the input
+_TOKEN_PATTERN = r"""\s*(?:
+    (?P<comment>--[^\n]*|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|/\*[\s\S]*)
+    |(?P<bit_string>\d*[usUS]?[boxdBOXD]"[^"\n]*")
+    |(?P<identifier>[^\W\d_]\w*|\\[^\\\n]*\\)
+    |(?P<number>\d[\d_]*(?:\#[\w.]*\#|\.\d[\d_]*)?(?:[eE][+-]?\d[\d_]*)?)
+    |(?P<string>"(?:[^"\n]|"")*")
+    |(?P<character>'.')
+    |(?P<delimiter>=>|\*\*|:=|/=|>=|<=|<>|\?\?|\?/=|\?<=|\?>=|\?[<>=]|<<|>>
+        |[&'()*+,\-./:;<=>|\[\]?@^`])
+    |(?P<other>\S)
+    )"""
+_TOKEN_RE = re.compile(_TOKEN_PATTERN, re.VERBOSE)
+# the same pattern for undecoded input. whitespace, digits and word
+# characters are ASCII only, every byte above 0x7f (e.g. of a UTF-8 sequence)
+# may be part of an identifier
+_8BIT_TOKEN_PATTERN = _TOKEN_PATTERN.replace(
+    r"[^\W\d_]\w*", r"(?:[^\W\d_]|[\x80-\xff])[\w\x80-\xff]*"
+)
+# for bytes-like input, e.g. bytes or a memory-mapped file
+_BYTES_TOKEN_RE = re.compile(_8BIT_TOKEN_PATTERN.encode("ascii"), re.VERBOSE)
+# for bytes decoded as latin-1, which maps every byte to the character with
+# the same code, so offsets stay byte offsets
+_LATIN1_TOKEN_RE = re.compile(_8BIT_TOKEN_PATTERN, re.VERBOSE | re.ASCII)
+_BYTES_NON_ASCII = re.compile(rb"[\x80-\xff]+")
+# offset after the end of any input
+_END = sys.maxsize
+
+
+def tokenize(
+    text: str, comments: bool = True, pos: int = 0
+) -> Iterator[Token]:
+    """Splits an input string into VHDL tokens
+
+    The input is expected to be a string representing vhdl file content. It is
+    scanned once from left to right and every token is yielded as soon as it
+    is found. Whitespace is skipped. Identifiers that are reserved words are
+    yielded as keywords.
+
+    A single quote directly after an identifier or a closing parenthesis is
+    an attribute tick (e.g. clk'event) and never the start of a character
+    literal.
+
+    Args:
+        text (str): input string
+        comments (bool, optional): yield comments. Defaults to True.
+        pos (int, optional): offset to start at, which must not be within a
+            token. Defaults to 0.
+
+    Returns:
+        Iterator[Token]: tokens in the order they appear in the input
+    """
+    return _scan(_TOKEN_RE.match, text, comments, None, pos)
+
+
+def tokenize_buffer(
+    buffer, comments: bool = True, encoding: str = "utf-8"
+) -> Iterator[Token]:
+    """Splits a bytes-like input into VHDL tokens
+
+    Works like :func:`tokenize`, but on bytes, bytearray, memoryview or mmap
+    objects. Start and end of a token are byte offsets. Bytes that can not be
+    decoded are replaced and never raise an error.
+
+    A bytes object is decoded once as latin-1, which keeps every offset, and
+    scanned as a string. Only tokens that contain bytes above 0x7f are
+    decoded again with the encoding. Any other input is scanned in place,
+    without a copy, and the value of every token is decoded.
+
+    Args:
+        buffer (bytes-like): input
+        comments (bool, optional): yield comments. Defaults to True.
+        encoding (str, optional): encoding of the token values. Defaults to
+            "utf-8".
+
+    Returns:
+        Iterator[Token]: tokens in the order they appear in the input
+    """
+    if type(buffer) is not bytes:
+
+        def decode(value):
+            return value.decode(encoding, "replace")
+
+        return _scan(_BYTES_TOKEN_RE.match, buffer, comments, decode, 0)
+
+    def redecode(value):
+        return value.encode("latin-1").decode(encoding, "replace")
+
+    runs = (m.span() for m in _BYTES_NON_ASCII.finditer(buffer))
+    text = buffer.decode("latin-1")
+    return _scan(_LATIN1_TOKEN_RE.match, text, comments, redecode, 0, runs)
+
+
+def _scan(
+    match,
+    text,
+    comments: bool,
+    decode: Optional[Callable[..., str]],
+    pos: int,
+    runs: Optional[Iterator[Tuple[int, int]]] = None,
+):
+    """Token loop of tokenize and tokenize_buffer
+
+    decode is applied to the value of every token that overlaps one of the
+    runs, given as start and end offsets in ascending order. Without runs, it
+    is applied to every token.
+    """
+    keywords = KEYWORDS
+    prev = None
+    if decode is None:
+        run_start = run_end = _END
+    elif runs is None:
+        run_start, run_end = -1, _END
+    else:
+        run_start, run_end = next(runs, (_END, _END))
+    while True:
+        m = match(text, pos)
+        if m is None:
+            return
+        kind = m.lastgroup
+        start, pos = m.span(kind)
+        if kind == COMMENT and not comments:
+            continue
+        if kind == CHARACTER and prev is not None and (
+            prev.kind == IDENTIFIER or prev.value in (")", "]")
+        ):
+            # attribute tick. the quote is scanned again as a delimiter
+            kind, value, pos = DELIMITER, "'", start + 1
+        else:
+            value = m.group(kind)
+            if pos > run_start:
+                while run_end <= start:
+                    run_start, run_end = next(runs, (_END, _END))
+                if run_start < pos:
+                    value = decode(value)
+            if kind == IDENTIFIER and value.lower() in keywords:
+                kind = KEYWORD
+        token = Token(kind, value, start, pos)
+        if kind != COMMENT:
+            prev = token
+        yield token
+
+
+def render(tokens: Sequence[Token], start: int = 0, stop: int = None) -> str:
+    """Joins tokens back into a normalized string
+
+    Tokens that were separated by whitespace or comments in the input are
+    separated by a single whitespace, all other tokens are joined directly.
+
+    Args:
+        tokens (Sequence[Token]): tokens of one input
+        start (int, optional): index of the first token. Defaults to 0.
+        stop (int, optional): index after the last token. Defaults to None.
+
+    Returns:
+        str: normalized string
+    """
+    if stop is None:
+        stop = len(tokens)
+    if start >= stop:
+        return ""
+    prev = tokens[start]
+    parts = [prev.value]
+    append = parts.append
+    for i in range(start + 1, stop):
+        t = tokens[i]
+        if t.start != prev.end:
+            append(" ")
+        append(t.value)
+        prev = t
+    return "".join(parts)
+
+
+def _skim(text) -> Iterator[Tuple[str, int, int]]:
+    """Yields kind, start and end of every token without creating tokens
+
+    Keywords are yielded as identifiers. Works on str and bytes-like input,
+    see :func:`tokenize` and :func:`tokenize_buffer`.
+    """
+    if isinstance(text, str):
+        match, keywords, closers = _TOKEN_RE.match, KEYWORDS, (")", "]")
+    else:
+        match, keywords, closers = (
+            _BYTES_TOKEN_RE.match,
+            _BYTES_KEYWORDS,
+            (b")", b"]"),
+        )
+    pos = 0
+    prev_kind, prev_start, prev_end = None, 0, 0
+    while True:
+        m = match(text, pos)
+        if m is None:
+            return
+        kind = m.lastgroup
+        start, pos = m.span(kind)
+        if kind == CHARACTER and prev_kind is not None:
+            value = text[prev_start:prev_end]
+            if not isinstance(value, (str, bytes)):
+                value = bytes(value)
+            if value in closers or (
+                prev_kind == IDENTIFIER and value.lower() not in keywords
+            ):
+                # attribute tick, see _scan
+                kind, pos = DELIMITER, start + 1
+        if kind != COMMENT:
+            prev_kind, prev_start, prev_end = kind, start, pos
+        yield kind, start, pos
+
+
+def normalize(text):
+    """Removes VHDL comments and whitespace characters from an input string
+
+    The input is expected to be a string or bytes-like object representing
+    vhdl file content. It is scanned once, and comment markers within string,
+    bit string and character literals are kept.
+
+    - All VHDL comments (-- and /* */) are removed\n
+    - All whitespaces/tabs/new lines are replaced by a single whitespace\n
+
+    The result is the same as rendering the tokens of the input (see
+    :func:`render`), but no tokens are created.
+
+    Args:
+        text (Union[str, bytes-like]): input
+
+    Returns:
+        Union[str, bytes]: normalized input, bytes for bytes-like input
+    """
+    space = " " if isinstance(text, str) else b" "
+    parts = []
+    append = parts.append
+    end = None
+    for kind, start, pos in _skim(text):
+        if kind == COMMENT:
+            continue
+        if end is not None and start != end:
+            append(space)
+        append(text[start:pos])
+        end = pos
+    return space[:0].join(parts)
+
+
+def strip_comments(text):
+    """Removes VHDL comments from an input string, keeping its layout
+
+    The input is scanned once, comment markers within literals are kept (see
+    :func:`normalize`). Line comments are removed up to the end of the line,
+    block comments are replaced by the line breaks they contain, or a single
+    whitespace if there are none. The line of every token stays the same.
+
+    Args:
+        text (Union[str, bytes-like]): input
+
+    Returns:
+        Union[str, bytes]: input without comments, bytes for bytes-like input
+    """
+    if isinstance(text, str):
+        newline, space, block = "\n", " ", "/*"
+    else:
+        newline, space, block = b"\n", b" ", b"/*"
+    parts = []
+    append = parts.append
+    last = 0
+    for kind, start, pos in _skim(text):
+        if kind == COMMENT:
+            append(text[last:start])
+            comment = text[start:pos]
+            if not isinstance(comment, (str, bytes)):
+                comment = bytes(comment)
+            if comment[:2] == block:
+                lines = comment.count(newline)
+                append(newline * lines if lines else space)
+            last = pos
+    append(text[last:])
+    return newline[:0].join(parts)
@@ -0,0 +1,252 @@
+from array import array
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from regex_fun import vhdl
+from regex_fun.lexer import IDENTIFIER, LineIndex, Span
+
+Match = namedtuple("Match", "path entity kind record")
+Match.__doc__ = """A generic, port or constant found by a query
+
+Attributes:
+    path (str): path of the file
+    entity (Optional[str]): name of the entity of the file, None if the
+        file has no entity
+    kind (str): "generic", "port" or "constant"
+    record (tuple): the Generic, Port or Constant record
+"""
+
+# tables of the records of a file, see QueryIndex.add
+_TABLES = ("entity", "generic", "port", "constant", "direction", "type")
+
+
+def type_mark(type_: str) -> str:
+    """Returns the lower case type mark of a type string
+
+    Args:
+        type_ (str): type string, e.g. "STD_LOGIC_VECTOR(7 downto 0)"
+
+    Returns:
+        str: type mark, e.g. "std_logic_vector"
+    """
+    mark = type_.split(None, 1)[0] if type_.strip() else ""
+    return mark.split("(", 1)[0].lower()
+
+
+class QueryIndex:
+    """In-memory inverted index over the parse results of many files
+
+    Every file is indexed by its entity name, the names of its generics,
+    ports and constants, port directions, type marks and every identifier
+    that occurs in it. Each key maps to the matches per file, so a query
+    only touches its matches, and a file is removed by deleting exactly the
+    keys it was indexed by. All keys are case insensitive.
+
+    Type queries match the type mark, i.e. "std_logic_vector" matches
+    "std_logic_vector(7 downto 0)".
+    """
+
+    def __init__(self):
+        # table -> key -> path -> matches
+        self._tables = {table: {} for table in _TABLES}  # type: Dict
+        # identifier -> path -> start and end offset of every occurrence
+        self._references = {}  # type: Dict[str, Dict[str, array]]
+        # path -> (table, key) pairs the file was indexed by
+        self._keys = {}  # type: Dict[str, List[Tuple[str, str]]]
+        self._lines = {}  # type: Dict[str, LineIndex]
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def paths(self) -> List[str]:
+        """List[str]: paths of all indexed files"""
+        return list(self._keys)
+
+    def add(self, path: str, text: Union[str, bytes]):
+        """Indexes a file, replacing its previous contents
+
+        Args:
+            path (str): path of the file
+            text (Union[str, bytes]): file content, see
+                :func:`regex_fun.vhdl.parse_vhdl`. Offsets of bytes are
+                byte offsets.
+        """
+        self.remove(path)
+        result = vhdl.parse_vhdl(text)
+        keys = []  # type: List[Tuple[str, str]]
+        span = result.entity_span
+        entity = None if span is None else result.tokens[span[0] + 1].value
+        declared = set()  # type: Set[int]
+        if entity is not None:
+            self._post(keys, "entity", entity, path, entity)
+        for section, kind in (
+            ("generics", "generic"),
+            ("ports", "port"),
+            ("constants", "constant"),
+        ):
+            for record, token in result._entries(section)[1] or ():
+                declared.add(token.start)
+                match = Match(path, entity, kind, record)
+                self._post(keys, kind, record.name, path, match)
+                mark = type_mark(record.type)
+                self._post(keys, "type", mark, path, match)
+                if kind == "port":
+                    direction = record.direction
+                    self._post(keys, "direction", direction, path, match)
+        for t in result.tokens:
+            if t.kind == IDENTIFIER and t.start not in declared:
+                files = self._references.setdefault(t.value.lower(), {})
+                offsets = files.get(path)
+                if offsets is None:
+                    offsets = files[path] = array("q")
+                    keys.append(("reference", t.value.lower()))
+                offsets.append(t.start)
+                offsets.append(t.end)
+        self._keys[path] = keys
+        self._lines[path] = result.lines
+
+    def add_file(self, path: str):
+        """Reads and indexes a file, see :meth:`add`"""
+        with open(path, "rb") as f:
+            self.add(path, f.read())
+
+    def remove(self, path: str):
+        """Removes a file from the index
+
+        Args:
+            path (str): path of the file
+        """
+        for table, key in self._keys.pop(path, ()):
+            postings = (
+                self._references
+                if table == "reference"
+                else self._tables[table]
+            )
+            files = postings.get(key)
+            if files is not None:
+                files.pop(path, None)
+                if not files:
+                    del postings[key]
+        self._lines.pop(path, None)
+
+    def _post(self, keys: list, table: str, key: str, path: str, item):
+        key = key.lower()
+        files = self._tables[table].setdefault(key, {})
+        items = files.get(path)
+        if items is None:
+            items = files[path] = []
+            keys.append((table, key))
+        items.append(item)
+
+    def _get(self, table: str, key: str) -> List:
+        files = self._tables[table].get(key.lower(), {})
+        return [item for items in files.values() for item in items]
+
+    def entities(self, name: str) -> List[str]:
+        """Returns the paths of the files defining an entity
+
+        Args:
+            name (str): entity name
+
+        Returns:
+            List[str]: paths
+        """
+        return list(self._tables["entity"].get(name.lower(), ()))
+
+    def ports(
+        self,
+        name: Optional[str] = None,
+        direction: Optional[str] = None,
+        type_: Optional[str] = None,
+    ) -> List[Match]:
+        """Finds ports by name, direction and type mark
+
+        The most selective of the given keys is looked up, the others filter
+        its matches.
+
+        Args:
+            name (Optional[str], optional): port name. Defaults to None.
+            direction (Optional[str], optional): e.g. "inout". Defaults to
+                None.
+            type_ (Optional[str], optional): type mark. Defaults to None.
+
+        Raises:
+            ValueError: if no key is given
+
+        Returns:
+            List[Match]: matching ports
+        """
+        return self._find(
+            "port", (("port", name), ("direction", direction), ("type", type_))
+        )
+
+    def generics(
+        self, name: Optional[str] = None, type_: Optional[str] = None
+    ) -> List[Match]:
+        """Finds generics by name and type mark, see :meth:`ports`"""
+        return self._find("generic", (("generic", name), ("type", type_)))
+
+    def constants(
+        self, name: Optional[str] = None, type_: Optional[str] = None
+    ) -> List[Match]:
+        """Finds constants by name and type mark, see :meth:`ports`"""
+        return self._find("constant", (("constant", name), ("type", type_)))
+
+    def types(self, type_: str) -> List[Match]:
+        """Finds all generics, ports and constants of a type
+
+        Args:
+            type_ (str): type mark, e.g. "state_type"
+
+        Returns:
+            List[Match]: matches in the order the files were added
+        """
+        return self._get("type", type_)
+
+    def _find(
+        self, kind: str, keys: Iterable[Tuple[str, Optional[str]]]
+    ) -> List[Match]:
+        keys = [(table, key.lower()) for table, key in keys if key is not None]
+        if not keys:
+            raise ValueError("at least one key is required")
+        # start with the key with the fewest files
+        keys.sort(key=lambda k: len(self._tables[k[0]].get(k[1], ())))
+        table, key = keys[0]
+        matches = [m for m in self._get(table, key) if m.kind == kind]
+        for table, key in keys[1:]:
+            matches = [m for m in matches if _field(m, table) == key]
+        return matches
+
+    def references(self, name: str) -> List[Tuple[str, Span]]:
+        """Finds every occurrence of an identifier
+
+        Declarations of generics, ports and constants are not references
+        and are found with the other queries.
+
+        Args:
+            name (str): identifier, e.g. "Natalia"
+
+        Returns:
+            List[Tuple[str, Span]]: path and span of every occurrence
+        """
+        result = []
+        for path, offsets in self._references.get(name.lower(), {}).items():
+            span = self._lines[path].span
+            result.extend(
+                (path, span(offsets[i], offsets[i + 1]))
+                for i in range(0, len(offsets), 2)
+            )
+        return result
+
+
+def _field(match: Match, table: str) -> str:
+    """Returns the key of a match within a table, see QueryIndex._find"""
+    record = match.record
+    if table == "type":
+        return type_mark(record.type)
+    if table == "direction":
+        return record.direction.lower()
+    return record.name.lower()
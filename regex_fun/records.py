@@ -0,0 +1,215 @@
+import sys
+from array import array
+from collections import OrderedDict, namedtuple
+from typing import Iterable, Iterator, List, Optional, Tuple, Type
+
+
+class Generic(namedtuple("Generic", "name type default")):
+    """A generic parameter of an entity
+
+    Records are tuples, so they compare equal to plain (name, type, default)
+    tuples and unpack the same way.
+
+    Attributes:
+        name (str): generic name
+        type (str): generic type, e.g. "integer"
+        default (Optional[str]): default value, None if not specified
+    """
+
+    __slots__ = ()
+
+
+class Port(namedtuple("Port", "name direction type")):
+    """A port of an entity
+
+    Records are tuples, so they compare equal to plain (name, direction,
+    type) tuples and unpack the same way.
+
+    Attributes:
+        name (str): port name
+        direction (str): "in", "out", "inout", "buffer" or "linkage"
+        type (str): port type, e.g. "std_logic"
+    """
+
+    __slots__ = ()
+
+
+class Constant(namedtuple("Constant", "name type value")):
+    """A constant declaration
+
+    Records are tuples, so they compare equal to plain (name, type, value)
+    tuples and unpack the same way.
+
+    Attributes:
+        name (str): constant name
+        type (str): constant type, e.g. "integer range 0 to 255"
+        value (Optional[str]): value, None for a deferred constant
+    """
+
+    __slots__ = ()
+
+
+class Signal(namedtuple("Signal", "name type default")):
+    """A signal declaration
+
+    Records are tuples, so they compare equal to plain (name, type, default)
+    tuples and unpack the same way.
+
+    Attributes:
+        name (str): signal name
+        type (str): signal type, e.g. "std_logic_vector(7 downto 0)"
+        default (Optional[str]): default value, None if not specified
+    """
+
+    __slots__ = ()
+
+
+class Process(namedtuple("Process", "label sensitivity")):
+    """A process statement
+
+    Attributes:
+        label (Optional[str]): process label, None if not labeled
+        sensitivity (Optional[List[str]]): names of the sensitivity list,
+            ["all"] for "process(all)", None if there is no list
+    """
+
+    __slots__ = ()
+
+
+class Instantiation(
+    namedtuple("Instantiation", "label kind unit generic_map port_map")
+):
+    """A component, entity or configuration instantiation
+
+    Every association of a map is a (formal, actual) pair. The formal of a
+    positional association is None.
+
+    Attributes:
+        label (str): instance label
+        kind (str): "component", "entity" or "configuration"
+        unit (str): instantiated unit as written, e.g. "work.fifo(rtl)"
+        generic_map (List[Tuple[Optional[str], str]]): generic associations
+        port_map (List[Tuple[Optional[str], str]]): port associations
+    """
+
+    __slots__ = ()
+
+
+def intern(text: Optional[str]) -> Optional[str]:
+    """Interns a type or direction string
+
+    Types such as "std_logic" repeat for almost every record. Interned, all
+    records share one string object.
+
+    Args:
+        text (Optional[str]): string
+
+    Returns:
+        Optional[str]: interned string, None stays None
+    """
+    return None if text is None else sys.intern(text)
+
+
+class Table:
+    """Columnar storage of records of one type
+
+    Instead of one tuple per record, every field is a column of integer ids
+    into a string table that is shared by all columns, so every distinct
+    string (e.g. "std_logic_vector(31 downto 0)") is stored once. The start
+    and end offset of every record in the source are kept in two more
+    integer arrays.
+
+    Args:
+        record (Type[tuple]): record type, e.g. Port
+        share (Optional[Table], optional): table whose string table is shared
+            with this one. Defaults to None, a new string table.
+
+    Attributes:
+        record (Type[tuple]): record type
+        strings (List[Optional[str]]): string table, id 0 is None
+        columns (Dict[str, array]): string ids per field
+        starts (array): start offset of every record in the source
+        ends (array): end offset of every record in the source
+    """
+
+    __slots__ = ("record", "strings", "_ids", "columns", "starts", "ends")
+
+    def __init__(self, record: Type[tuple], share: "Optional[Table]" = None):
+        self.record = record
+        if share is None:
+            self.strings = [None]
+            self._ids = {None: 0}
+        else:
+            self.strings = share.strings
+            self._ids = share._ids
+        self.columns = OrderedDict(
+            (field, array("I")) for field in record._fields
+        )
+        self.starts = array("q")
+        self.ends = array("q")
+
+    def _id(self, text: Optional[str]) -> int:
+        i = self._ids.get(text)
+        if i is None:
+            i = self._ids[text] = len(self.strings)
+            self.strings.append(text)
+        return i
+
+    def append(self, values: Iterable[Optional[str]], start=-1, end=-1):
+        """Appends one record
+
+        Args:
+            values (Iterable[Optional[str]]): field values of the record
+            start (int, optional): start offset in the source. Defaults to -1.
+            end (int, optional): end offset in the source. Defaults to -1.
+        """
+        for column, value in zip(self.columns.values(), values):
+            column.append(self._id(value))
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def extend(self, entries: Iterable[Tuple[tuple, int, int]]):
+        """Appends records together with their offsets
+
+        Args:
+            entries (Iterable[Tuple[tuple, int, int]]): records with start
+                and end offset
+        """
+        for values, start, end in entries:
+            self.append(values, start, end)
+
+    def column(self, field: str) -> List[Optional[str]]:
+        """Returns all values of one field
+
+        Args:
+            field (str): field name, e.g. "type"
+
+        Returns:
+            List[Optional[str]]: values in record order
+        """
+        strings = self.strings
+        return [strings[i] for i in self.columns[field]]
+
+    def span(self, i: int) -> Tuple[int, int]:
+        """Returns the start and end offset of a record in the source"""
+        return self.starts[i], self.ends[i]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> tuple:
+        strings = self.strings
+        return self.record(
+            *(strings[column[i]] for column in self.columns.values())
+        )
+
+    def __iter__(self) -> Iterator[tuple]:
+        strings = self.strings
+        columns = [iter(column) for column in self.columns.values()]
+        for ids in zip(*columns):
+            yield self.record(*(strings[i] for i in ids))
+
+    def __repr__(self) -> str:
+        return "Table({}, {} records, {} strings)".format(
+            self.record.__name__, len(self), len(self.strings)
+        )
@@ -0,0 +1,369 @@
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+from regex_fun.batch import FileRecord
+from regex_fun.records import Constant, Generic, Port
+
+# first bytes of every file
+MAGIC = b"RGXF"
+# incremented on every incompatible change of the layout
+VERSION = 1
+
+# magic, version, number of strings, files, generics, ports and constants,
+# size of the string data
+_HEADER = struct.Struct("<4sI6Q")
+# fields of a file record: path, entity and errors string ids, then first
+# record and count of generics, ports and constants
+_FILE_FIELDS = 9
+# a section that could not be parsed (None) has this count
+_NONE = 0xFFFFFFFF
+# record types of the sections, 3 string ids per record
+_SECTIONS = (Generic, Port, Constant)
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _pad(size: int) -> int:
+    # sections start at multiples of 8 bytes
+    return -size % 8
+
+
+class _Strings:
+    """String table of dumps, id 0 is None"""
+
+    def __init__(self):
+        self.ids = {None: 0}  # type: Dict[Optional[str], int]
+        self.data = [b""]  # type: List[bytes]
+
+    def id(self, text: Optional[str]) -> int:
+        i = self.ids.get(text)
+        if i is None:
+            i = self.ids[text] = len(self.data)
+            self.data.append(text.encode("utf-8"))
+        return i
+
+
+def _uint32(values: Iterable[int]) -> bytes:
+    a = array("I", values)
+    if a.itemsize != 4:
+        a = array("L", a)
+    if _BIG_ENDIAN:
+        a.byteswap()
+    return a.tobytes()
+
+
+def dumps(records: Iterable[FileRecord]) -> bytes:
+    """Serializes parse results into the binary format
+
+    The format consists of a header, a string table and fixed-width records
+    that refer to strings by id. Every distinct string (identifier, type,
+    value, path) is stored once. All integers are little endian unsigned
+    32 bit values:
+
+    - header: magic "RGXF", version, counts and string data size\n
+    - string offsets: one per string plus the end offset\n
+    - string data: all strings, UTF-8 encoded\n
+    - files: path, entity, errors and first record and count of the
+      generics, ports and constants\n
+    - generics, ports and constants: 3 string ids per record\n
+
+    Args:
+        records (Iterable[FileRecord]): parse results, e.g. of
+            :func:`regex_fun.batch.scan_project`
+
+    Returns:
+        bytes: serialized results
+    """
+    strings = _Strings()
+    files = []  # type: List[int]
+    sections = [[], [], []]  # type: List[List[int]]
+    for record in records:
+        errors = "\n".join(record.errors) if record.errors else None
+        files.append(strings.id(record.path))
+        files.append(strings.id(record.entity))
+        files.append(strings.id(errors))
+        for ids, items in zip(sections, record[2:5]):
+            first = len(ids) // 3
+            if items is None:
+                files.extend((first, _NONE))
+                continue
+            files.extend((first, len(items)))
+            for item in items:
+                ids.extend(strings.id(value) for value in item)
+    offsets = [0]
+    for data in strings.data:
+        offsets.append(offsets[-1] + len(data))
+    # the None string has no data
+    blob = b"".join(strings.data)
+    parts = [
+        _HEADER.pack(
+            MAGIC,
+            VERSION,
+            len(strings.data),
+            len(files) // _FILE_FIELDS,
+            len(sections[0]) // 3,
+            len(sections[1]) // 3,
+            len(sections[2]) // 3,
+            len(blob),
+        )
+    ]
+    for part in (_uint32(offsets), blob, _uint32(files)) + tuple(
+        _uint32(ids) for ids in sections
+    ):
+        parts.append(part)
+        parts.append(b"\0" * _pad(len(part)))
+    return b"".join(parts)
+
+
+def dump(records: Iterable[FileRecord], path: str):
+    """Serializes parse results into a file, see :func:`dumps`
+
+    Args:
+        records (Iterable[FileRecord]): parse results
+        path (str): path of the file
+    """
+    data = dumps(records)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class Store:
+    """Parse results loaded from the binary format
+
+    Nothing is decoded on load. The integer sections are viewed in place,
+    strings are decoded on first access and records are created when they
+    are requested.
+
+    Args:
+        buffer (bytes-like): serialized results, e.g. bytes or a memory
+            mapped file
+
+    Raises:
+        ValueError: if the buffer is not in the binary format or was written
+            by another version
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError("not a parse result file")
+        header = _HEADER.unpack_from(view, 0)
+        magic, version, n_strings, n_files = header[:4]
+        if magic != MAGIC:
+            raise ValueError("not a parse result file")
+        if version != VERSION:
+            raise ValueError(
+                "unsupported format version {}, expected {}".format(
+                    version, VERSION
+                )
+            )
+        sizes = (
+            4 * (n_strings + 1),
+            header[7],
+            4 * _FILE_FIELDS * n_files,
+        ) + tuple(4 * 3 * n for n in header[4:7])
+        sections = []
+        offset = _HEADER.size
+        for size in sizes:
+            sections.append(view[offset : offset + size])
+            offset += size + _pad(size)
+        if offset - _pad(sizes[-1]) > len(view):
+            raise ValueError("truncated parse result file")
+        self._offsets = _ints(sections[0])
+        self._data = sections[1]
+        self._files = _ints(sections[2])
+        self._sections = [_ints(s) for s in sections[3:]]
+        self._strings = [None] * n_strings  # type: List[Optional[str]]
+        self._decoded = [True] + [False] * (n_strings - 1)
+        self._paths = None  # type: Optional[Dict[str, int]]
+        self._view = view
+        self._mmap = None  # type: Optional[mmap.mmap]
+        self._file = None
+
+    @classmethod
+    def open(cls, path: str) -> "Store":
+        """Memory-maps a file in the binary format
+
+        Args:
+            path (str): path of the file
+
+        Returns:
+            Store: loaded results, close it to unmap the file
+        """
+        f = open(path, "rb")
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file can not be mapped
+            f.close()
+            raise ValueError("not a parse result file")
+        try:
+            store = cls(mm)
+        except ValueError:
+            mm.close()
+            f.close()
+            raise
+        store._mmap = mm
+        store._file = f
+        return store
+
+    def close(self):
+        """Releases the memory-mapped file"""
+        if self._mmap is not None:
+            # views into the mapping have to be released first
+            for view in [self._offsets, self._files, self._data]:
+                view.release()
+            for view in self._sections:
+                view.release()
+            self._view.release()
+            self._mmap.close()
+            self._file.close()
+            self._mmap = None
+
+    def __enter__(self) -> "Store":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def string(self, i: int) -> Optional[str]:
+        """Returns a string of the string table by id"""
+        if not self._decoded[i]:
+            data = self._data[self._offsets[i] : self._offsets[i + 1]]
+            self._strings[i] = str(data, "utf-8")
+            self._decoded[i] = True
+        return self._strings[i]
+
+    def __len__(self) -> int:
+        return len(self._files) // _FILE_FIELDS
+
+    def __getitem__(self, i: int) -> FileRecord:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("file index out of range")
+        fields = self._files[i * _FILE_FIELDS : (i + 1) * _FILE_FIELDS]
+        string = self.string
+        errors = string(fields[2])
+        sections = []
+        for record, ids, j in zip(_SECTIONS, self._sections, (3, 5, 7)):
+            first, count = fields[j], fields[j + 1]
+            if count == _NONE:
+                sections.append(None)
+                continue
+            values = ids[3 * first : 3 * (first + count)]
+            sections.append(
+                [
+                    record(
+                        string(values[k]),
+                        string(values[k + 1]),
+                        string(values[k + 2]),
+                    )
+                    for k in range(0, len(values), 3)
+                ]
+            )
+        return FileRecord(
+            string(fields[0]),
+            string(fields[1]),
+            sections[0],
+            sections[1],
+            sections[2],
+            [] if errors is None else errors.split("\n"),
+        )
+
+    def __iter__(self) -> Iterator[FileRecord]:
+        # iterating touches every record, so all strings are decoded and all
+        # ids are converted at once instead of one by one
+        strings = self._decode_all()
+        sections = []
+        for record, ids in zip(_SECTIONS, self._sections):
+            values = iter([strings[i] for i in ids.tolist()])
+            triples = zip(values, values, values)
+            sections.append([record._make(t) for t in triples])
+        files = self._files.tolist()
+        for i in range(0, len(files), _FILE_FIELDS):
+            fields = files[i : i + _FILE_FIELDS]
+            items = [
+                None
+                if fields[j + 1] == _NONE
+                else records[fields[j] : fields[j] + fields[j + 1]]
+                for records, j in zip(sections, (3, 5, 7))
+            ]
+            errors = strings[fields[2]]
+            yield FileRecord(
+                strings[fields[0]],
+                strings[fields[1]],
+                items[0],
+                items[1],
+                items[2],
+                [] if errors is None else errors.split("\n"),
+            )
+
+    def _decode_all(self) -> List[Optional[str]]:
+        """Decodes the whole string table"""
+        if not all(self._decoded):
+            data = bytes(self._data)
+            offsets = self._offsets.tolist()
+            self._strings = [None] + [
+                data[offsets[i] : offsets[i + 1]].decode("utf-8")
+                for i in range(1, len(offsets) - 1)
+            ]
+            self._decoded = [True] * len(self._strings)
+        return self._strings
+
+    def paths(self) -> List[str]:
+        """Returns the paths of all files"""
+        files = self._files
+        return [
+            self.string(files[i]) for i in range(0, len(files), _FILE_FIELDS)
+        ]
+
+    def get(self, path: str) -> Optional[FileRecord]:
+        """Returns the parse result of one file
+
+        Args:
+            path (str): path of the file
+
+        Returns:
+            Optional[FileRecord]: parse result, None if the path is unknown
+        """
+        if self._paths is None:
+            self._paths = {path: i for i, path in enumerate(self.paths())}
+        i = self._paths.get(path)
+        return None if i is None else self[i]
+
+
+def _ints(view: memoryview) -> memoryview:
+    """Views little endian 32 bit integers in place"""
+    if _BIG_ENDIAN:
+        a = array("I")
+        a.frombytes(view)
+        a.byteswap()
+        return memoryview(a)
+    return view.cast("I")
+
+
+def loads(data) -> Store:
+    """Loads serialized parse results, see :class:`Store`
+
+    Args:
+        data (bytes-like): serialized results
+
+    Returns:
+        Store: loaded results
+    """
+    return Store(data)
+
+
+def load(path: str) -> Store:
+    """Memory-maps a file of serialized parse results, see :class:`Store`
+
+    Args:
+        path (str): path of the file
+
+    Returns:
+        Store: loaded results, close it to unmap the file
+    """
+    return Store.open(path)
@@ -0,0 +1,214 @@
+import mmap
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+from regex_fun.lexer import (
+    Token,
+    tokenize_buffer,
+    IDENTIFIER,
+    KEYWORD,
+    DELIMITER,
+)
+from regex_fun.records import Generic, Port, Constant
+from regex_fun import vhdl
+
+# size of the blocks in which pages of a mapped file are released again
+CHUNKSIZE = 1 << 24
+
+
+def iter_tokens(
+    path: str, chunksize: int = CHUNKSIZE, encoding: str = "utf-8"
+) -> Iterator[Token]:
+    """Yields the tokens of a vhdl file without reading it into memory
+
+    The file is memory-mapped and tokenized in place (see
+    :func:`regex_fun.lexer.tokenize_buffer`). Whenever the tokenizer has moved
+    past a block of chunksize bytes, the pages of that block are released
+    again where the platform supports it, so the resident memory stays
+    bounded by the block size and not by the file size. Comments are skipped.
+
+    Args:
+        path (str): path of the file
+        chunksize (int, optional): size of the released blocks in bytes.
+            Defaults to 16 MiB.
+        encoding (str, optional): encoding of the token values. Defaults to
+            "utf-8".
+
+    Yields:
+        Token: tokens of the file, start and end are byte offsets
+    """
+    # blocks must start on page boundaries
+    chunksize = max(mmap.PAGESIZE, chunksize // mmap.PAGESIZE * mmap.PAGESIZE)
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file can not be mapped
+            return
+    release = hasattr(mm, "madvise") and hasattr(mmap, "MADV_DONTNEED")
+    released = 0
+    tokens = tokenize_buffer(mm, comments=False, encoding=encoding)
+    try:
+        for token in tokens:
+            if release and token.start - released >= 2 * chunksize:
+                mm.madvise(mmap.MADV_DONTNEED, released, chunksize)
+                released += chunksize
+            yield token
+    finally:
+        # the tokenizer holds on to the buffer until it is closed
+        tokens.close()
+        mm.close()
+
+
+def iter_constants(
+    path: str, encoding: str = "utf-8"
+) -> Iterator[Constant]:
+    """Yields the constants of a vhdl file as soon as they are found
+
+    The file is processed with :func:`iter_tokens`, so only one declaration is
+    kept in memory at a time. The constants are the same as the ones returned
+    by :func:`regex_fun.vhdl.get_constants`.
+
+    Args:
+        path (str): path of the file
+        encoding (str, optional): encoding of the file. Defaults to "utf-8".
+
+    Yields:
+        Constant: constant name, type and value
+    """
+    tokens = iter_tokens(path, encoding=encoding)
+    for token in tokens:
+        if token.kind == KEYWORD and token.value.lower() == "constant":
+            declaration = _declaration(tokens)
+            constants = []
+            vhdl._constant(declaration, 0, constants)
+            for constant, _ in constants:
+                yield constant
+
+
+def iter_generics(
+    path: str, encoding: str = "utf-8"
+) -> Iterator[Generic]:
+    """Yields the generics of the first entity of a vhdl file
+
+    The file is processed with :func:`iter_tokens`, so only one interface
+    element is kept in memory at a time. Reading stops at the end of the
+    generic clause. The generics are the same as the ones returned by
+    :func:`regex_fun.vhdl.get_generics`.
+
+    Args:
+        path (str): path of the file
+        encoding (str, optional): encoding of the file. Defaults to "utf-8".
+
+    Yields:
+        Generic: generic name, type and default value
+    """
+    tokens = iter_tokens(path, encoding=encoding)
+    for element in _clause_elements(tokens, "generic"):
+        for generic, _ in vhdl._generic_items(element):
+            yield generic
+    tokens.close()
+
+
+def iter_ports(path: str, encoding: str = "utf-8") -> Iterator[Port]:
+    """Yields the ports of the first entity of a vhdl file
+
+    The file is processed with :func:`iter_tokens`, so only one interface
+    element is kept in memory at a time. Reading stops at the end of the
+    port clause. The ports are the same as the ones returned by
+    :func:`regex_fun.vhdl.get_ports`.
+
+    Args:
+        path (str): path of the file
+        encoding (str, optional): encoding of the file. Defaults to "utf-8".
+
+    Yields:
+        Port: port name, direction and type
+    """
+    tokens = iter_tokens(path, encoding=encoding)
+    for element in _clause_elements(tokens, "port"):
+        for port, _ in vhdl._port_items(element):
+            yield port
+    tokens.close()
+
+
+def _declaration(tokens: Iterator[Token]) -> List[Token]:
+    """Collects the tokens of a declaration up to its end
+
+    The declaration ends on a semicolon or on a closing parenthesis that was
+    not opened within the declaration, which is included in the result.
+    """
+    declaration = []
+    depth = 0
+    for t in tokens:
+        declaration.append(t)
+        if t.kind != DELIMITER:
+            continue
+        if t.value == "(":
+            depth += 1
+        elif t.value == ")":
+            if depth == 0:
+                break
+            depth -= 1
+        elif t.value == ";" and depth == 0:
+            break
+    return declaration
+
+
+def _clause_elements(
+    tokens: Iterator[Token], word: str
+) -> Iterator[Tuple[List[Token], Optional[str], str, Optional[str]]]:
+    """Yields the interface elements of a clause of the first entity
+
+    Args:
+        tokens (Iterator[Token]): tokens of one input
+        word (str): "generic" or "port"
+
+    Yields:
+        Tuple[List[Token], Optional[str], str, Optional[str]]: names, mode,
+            type and default value of every element
+    """
+    # entity <name> is
+    header = deque(maxlen=3)
+    for t in tokens:
+        header.append(t)
+        if (
+            len(header) == 3
+            and vhdl._is_keyword(header[0], "entity")
+            and header[1].kind == IDENTIFIER
+            and vhdl._is_keyword(header[2], "is")
+        ):
+            break
+    else:
+        return
+    # <word> (
+    stop = ("end", "begin", "port") if word == "generic" else ("end", "begin")
+    prev = None
+    for t in tokens:
+        if t.value == "(" and prev is not None:
+            if vhdl._is_keyword(prev, word):
+                break
+        if t.kind == KEYWORD and t.value.lower() in stop:
+            return
+        prev = t
+    else:
+        return
+    # elements separated by semicolons up to the closing parenthesis
+    element = []
+    depth = 0
+    for t in tokens:
+        if t.kind == DELIMITER:
+            if t.value == "(":
+                depth += 1
+            elif t.value == ")":
+                if depth == 0:
+                    break
+                depth -= 1
+            elif t.value == ";" and depth == 0:
+                parsed = vhdl._element(element, 0, len(element))
+                if parsed is not None:
+                    yield parsed
+                element = []
+                continue
+        element.append(t)
+    parsed = vhdl._element(element, 0, len(element))
+    if parsed is not None:
+        yield parsed
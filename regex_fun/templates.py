@@ -0,0 +1,352 @@
+from functools import partial
+from string import Formatter
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Union
+from regex_fun import vhdl
+from regex_fun.batch import map_files
+
+# kinds of output, in the order they are generated for every entity
+KINDS = ("component", "instantiation", "testbench")
+
+# output is written to files in blocks of about this many characters
+_BLOCK = 1 << 16
+
+
+class _Template:
+    """A template that is split into literal text and fields once
+
+    Rendering appends the parts to a list, so that a whole output is joined
+    once instead of being built by repeated concatenation.
+    """
+
+    __slots__ = ("_parts",)
+
+    def __init__(self, text: str):
+        self._parts = []  # type: List[tuple]
+        for literal, field, _, _ in Formatter().parse(text):
+            if literal:
+                self._parts.append((True, literal))
+            if field is not None:
+                self._parts.append((False, field))
+
+    def render(self, out: List[str], **values: str):
+        for literal, part in self._parts:
+            out.append(part if literal else values[part])
+
+
+_COMPONENT = _Template("component {name} is\n")
+_COMPONENT_END = _Template("end component {name};\n")
+_ENTITY = _Template("{indent}{label} : entity {library}.{name}\n")
+_TESTBENCH = _Template(
+    "library ieee;\n"
+    "use ieee.std_logic_1164.all;\n"
+    "\n"
+    "entity {name}_tb is\n"
+    "end entity {name}_tb;\n"
+    "\n"
+    "architecture sim of {name}_tb is\n"
+)
+_TESTBENCH_BEGIN = _Template("begin\n")
+_TESTBENCH_END = _Template("end architecture sim;\n")
+_CLAUSE = _Template("{indent}{word} (\n")
+_MAP = _Template("{indent}{word} map (\n")
+_CLOSE = _Template("{indent}){end}\n")
+_GENERIC = _Template("{indent}{name}{pad} : {type}{default}{sep}\n")
+_PORT = _Template("{indent}{name}{pad} : {direction} {type}{sep}\n")
+_ASSOCIATION = _Template("{indent}{name}{pad} => {name}{sep}\n")
+_CONSTANT = _Template("{indent}constant {name}{pad} : {type}{default};\n")
+_SIGNAL = _Template("{indent}signal {name}{pad} : {type};\n")
+
+
+def _width(records: Optional[Sequence[tuple]]) -> int:
+    return max((len(record.name) for record in records or ()), default=0)
+
+
+def _interface(out: List[str], entity: vhdl.Entity, indent: str):
+    """Renders the generic and port clauses of a declaration"""
+    inner = indent + "  "
+    width = max(_width(entity.generics), _width(entity.ports))
+    generics = entity.generics or ()
+    if generics:
+        _CLAUSE.render(out, indent=indent, word="generic")
+        last = len(generics) - 1
+        for i, generic in enumerate(generics):
+            _GENERIC.render(
+                out,
+                indent=inner,
+                name=generic.name,
+                pad=" " * (width - len(generic.name)),
+                type=generic.type,
+                default=""
+                if generic.default is None
+                else " := " + generic.default,
+                sep="" if i == last else ";",
+            )
+        _CLOSE.render(out, indent=indent, end=";")
+    ports = entity.ports or ()
+    if ports:
+        _CLAUSE.render(out, indent=indent, word="port")
+        last = len(ports) - 1
+        for i, port in enumerate(ports):
+            _PORT.render(
+                out,
+                indent=inner,
+                name=port.name,
+                pad=" " * (width - len(port.name)),
+                direction=port.direction,
+                type=port.type,
+                sep="" if i == last else ";",
+            )
+        _CLOSE.render(out, indent=indent, end=";")
+
+
+def _maps(out: List[str], entity: vhdl.Entity, indent: str):
+    """Renders the generic and port maps of an instantiation"""
+    inner = indent + "  "
+    width = max(_width(entity.generics), _width(entity.ports))
+    maps = [
+        (word, records)
+        for word, records in (
+            ("generic", entity.generics or ()),
+            ("port", entity.ports or ()),
+        )
+        if records
+    ]
+    for j, (word, records) in enumerate(maps):
+        _MAP.render(out, indent=indent, word=word)
+        last = len(records) - 1
+        for i, record in enumerate(records):
+            _ASSOCIATION.render(
+                out,
+                indent=inner,
+                name=record.name,
+                pad=" " * (width - len(record.name)),
+                sep="" if i == last else ",",
+            )
+        end = ";" if j == len(maps) - 1 else ""
+        _CLOSE.render(out, indent=indent, end=end)
+    if not maps:
+        out.append(";\n")
+
+
+def _component(out: List[str], entity: vhdl.Entity):
+    _COMPONENT.render(out, name=entity.name)
+    _interface(out, entity, "  ")
+    _COMPONENT_END.render(out, name=entity.name)
+
+
+def _instantiation(
+    out: List[str],
+    entity: vhdl.Entity,
+    label: Optional[str] = None,
+    library: str = "work",
+    indent: str = "",
+):
+    if label is None:
+        label = "u_" + entity.name
+    _ENTITY.render(
+        out, indent=indent, label=label, library=library, name=entity.name
+    )
+    if not (entity.generics or entity.ports):
+        # "<label> : entity <name>;" without any map
+        out[-1] = out[-1].rstrip("\n")
+    _maps(out, entity, indent + "  ")
+
+
+def _testbench(out: List[str], entity: vhdl.Entity, library: str = "work"):
+    _TESTBENCH.render(out, name=entity.name)
+    width = _width(entity.generics)
+    for generic in entity.generics or ():
+        _CONSTANT.render(
+            out,
+            indent="  ",
+            name=generic.name,
+            pad=" " * (width - len(generic.name)),
+            type=generic.type,
+            default=""
+            if generic.default is None
+            else " := " + generic.default,
+        )
+    width = _width(entity.ports)
+    for port in entity.ports or ():
+        _SIGNAL.render(
+            out,
+            indent="  ",
+            name=port.name,
+            pad=" " * (width - len(port.name)),
+            type=port.type,
+        )
+    _TESTBENCH_BEGIN.render(out)
+    _instantiation(out, entity, "dut", library, "  ")
+    _TESTBENCH_END.render(out)
+
+
+def component(entity: vhdl.Entity) -> str:
+    """Generates the component declaration of an entity
+
+    Args:
+        entity (vhdl.Entity): entity, e.g. of
+            :func:`regex_fun.vhdl.iter_entities`
+
+    Returns:
+        str: component declaration
+    """
+    out = []  # type: List[str]
+    _component(out, entity)
+    return "".join(out)
+
+
+def instantiation(
+    entity: vhdl.Entity, label: Optional[str] = None, library: str = "work"
+) -> str:
+    """Generates an entity instantiation that maps every generic and port
+
+    Every generic and port is associated with a name equal to its own, see
+    :func:`testbench` for matching declarations.
+
+    Args:
+        entity (vhdl.Entity): entity
+        label (Optional[str], optional): instance label. Defaults to None,
+            "u_<entity name>".
+        library (str, optional): library of the entity. Defaults to "work".
+
+    Returns:
+        str: instantiation statement
+    """
+    out = []  # type: List[str]
+    _instantiation(out, entity, label, library)
+    return "".join(out)
+
+
+def testbench(entity: vhdl.Entity, library: str = "work") -> str:
+    """Generates a testbench skeleton of an entity
+
+    The testbench declares a constant per generic, set to its default
+    value, and a signal per port, and instantiates the entity as "dut".
+    Constants of generics without a default value have to be completed.
+
+    Args:
+        entity (vhdl.Entity): entity
+        library (str, optional): library of the entity. Defaults to "work".
+
+    Returns:
+        str: testbench entity and architecture
+    """
+    out = []  # type: List[str]
+    _testbench(out, entity, library)
+    return "".join(out)
+
+
+def generate(
+    entities: Iterable[vhdl.Entity],
+    kinds: Sequence[str] = KINDS,
+    library: str = "work",
+) -> Iterator[str]:
+    """Generates the output of many entities
+
+    Args:
+        entities (Iterable[vhdl.Entity]): entities
+        kinds (Sequence[str], optional): kinds of output, any of "component",
+            "instantiation" and "testbench". Defaults to all.
+        library (str, optional): library of the entities. Defaults to
+            "work".
+
+    Raises:
+        ValueError: if a kind is unknown
+
+    Yields:
+        str: output of every entity, separated by blank lines
+    """
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        raise ValueError("unknown kinds: {}".format(sorted(unknown)))
+    for entity in entities:
+        yield _render(entity, kinds, library)
+
+
+def _render(entity: vhdl.Entity, kinds: Sequence[str], library: str) -> str:
+    out = []  # type: List[str]
+    for kind in kinds:
+        if out:
+            out.append("\n")
+        if kind == "component":
+            _component(out, entity)
+        elif kind == "instantiation":
+            _instantiation(out, entity, None, library)
+        else:
+            _testbench(out, entity, library)
+    out.append("\n")
+    return "".join(out)
+
+
+def _render_file(path: str, kinds: Sequence[str], library: str) -> str:
+    """Generates the output of all entities of a file, see generate_files"""
+    try:
+        with open(path, "rb") as f:
+            text = f.read()
+    except OSError as e:
+        return "-- {}: {!r}\n\n".format(path, e)
+    return "".join(
+        _render(entity, kinds, library) for entity in vhdl.iter_entities(text)
+    )
+
+
+def generate_files(
+    paths: Iterable[str],
+    kinds: Sequence[str] = KINDS,
+    library: str = "work",
+    workers: Optional[int] = None,
+) -> Iterator[str]:
+    """Generates the output of all entities of many files in parallel
+
+    The files are read and their output is generated in worker processes,
+    see :func:`regex_fun.batch.map_files`. Files that can not be read yield
+    a comment with the error.
+
+    Args:
+        paths (Iterable[str]): paths of the files
+        kinds (Sequence[str], optional): see :func:`generate`. Defaults to
+            all.
+        library (str, optional): library of the entities. Defaults to
+            "work".
+        workers (Optional[int], optional): number of worker processes.
+            Defaults to None, the number of CPUs.
+
+    Raises:
+        ValueError: if a kind is unknown
+
+    Yields:
+        str: output of every file, in the order the files are finished
+    """
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        raise ValueError("unknown kinds: {}".format(sorted(unknown)))
+    render = partial(_render_file, kinds=tuple(kinds), library=library)
+    return map_files(render, paths, workers)
+
+
+def write(chunks: Iterable[str], file: Union[str, IO[str]]) -> int:
+    """Writes generated output to a file in large blocks
+
+    Args:
+        chunks (Iterable[str]): output, e.g. of :func:`generate`
+        file (Union[str, IO[str]]): path or text file object
+
+    Returns:
+        int: number of characters written
+    """
+    if isinstance(file, str):
+        with open(file, "w", encoding="utf-8") as f:
+            return write(chunks, f)
+    written = 0
+    block = []  # type: List[str]
+    size = 0
+    for chunk in chunks:
+        block.append(chunk)
+        size += len(chunk)
+        if size >= _BLOCK:
+            file.write("".join(block))
+            written += size
+            block = []
+            size = 0
+    file.write("".join(block))
+    return written + size
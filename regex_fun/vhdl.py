@@ -1,49 +1,344 @@
-import re
-from typing import Tuple, List, Optional
-from functools import wraps
+from collections import OrderedDict, namedtuple
+from time import perf_counter
+from typing import Iterable, Iterator, Tuple, List, Optional, Sequence, Union
+from regex_fun.cache import LRUCache
+from regex_fun.records import Generic, Port, Constant, Table, intern
+from regex_fun.lexer import (
+    LineIndex,
+    Span,
+    Token,
+    tokenize,
+    tokenize_buffer,
+    render,
+    IDENTIFIER,
+    KEYWORD,
+    DELIMITER,
+)
 
+# marks a section of a ParseResult that has not been extracted yet
+_MISSING = object()
 
-def _raw(func):
-    """Decorator for removing VHDL comments and whitespace characters
 
-    The input is expected to be a function with one argument that is a string
-    representing vhdl file content.
+class ParseResult:
+    """Result of parsing one string representing vhdl file content
 
-    Two processing steps are executed:
+    The input is tokenized exactly once, when the result is created. The
+    individual sections are extracted from the token stream on first access
+    and kept afterwards, so every section is only ever parsed once.
+
+    Attributes:
+        text (Union[str, bytes]): input string or bytes
+        tokens (List[Token]): tokens of the input, without comments
+        lines (LineIndex): line and column lookup of the input
+        buffer (str): normalized input string
+        entity (Optional[str]): see :func:`get_entity`
+        generics (Optional[List[Generic]]): see :func:`get_generics`
+        ports (Optional[List[Port]]): see :func:`get_ports`
+        architecture (Optional[str]): see :func:`get_architecture`
+        constants (Optional[List[Constant]]): see :func:`get_constants`
+    """
+
+    __slots__ = (
+        "text",
+        "tokens",
+        "_lines",
+        "_buffer",
+        "_entity_span",
+        "_entity",
+        "_generics",
+        "_ports",
+        "_architecture",
+        "_constants",
+    )
+
+    def __init__(self, text: Union[str, bytes], tokens: List[Token]):
+        self.text = text
+        self.tokens = tokens
+        self._lines = None
+        self._buffer = _MISSING
+        self._entity_span = _MISSING
+        self._entity = _MISSING
+        self._generics = _MISSING
+        self._ports = _MISSING
+        self._architecture = _MISSING
+        self._constants = _MISSING
+
+    @property
+    def lines(self) -> LineIndex:
+        if self._lines is None:
+            self._lines = LineIndex(self.text)
+        return self._lines
+
+    @property
+    def buffer(self) -> str:
+        if self._buffer is _MISSING:
+            self._buffer = _run("normalize", self.text, render, self.tokens)
+        return self._buffer
+
+    @property
+    def entity_span(self) -> Optional[Tuple[int, int]]:
+        """Optional[Tuple[int, int]]: indices of the first and last token of
+        the entity"""
+        if self._entity_span is _MISSING:
+            unit = _run("entity", self.text, _find_unit, self.tokens, "entity")
+            self._entity_span = None if unit is None else unit[:2]
+        return self._entity_span
+
+    @property
+    def entity(self) -> Optional[str]:
+        if self._entity is _MISSING:
+            span = self.entity_span
+            self._entity = (
+                None
+                if span is None
+                else render(self.tokens, span[0], span[1] + 1)
+            )
+        return self._entity
+
+    @property
+    def generics(self) -> Optional[List[Generic]]:
+        if self._generics is _MISSING:
+            self._generics = _run(
+                "generics", self.text, _generics, self.tokens, self.entity_span
+            )
+        return self._generics
+
+    @property
+    def ports(self) -> Optional[List[Port]]:
+        if self._ports is _MISSING:
+            self._ports = _run(
+                "ports", self.text, _ports, self.tokens, self.entity_span
+            )
+        return self._ports
+
+    @property
+    def architecture(self) -> Optional[str]:
+        if self._architecture is _MISSING:
+            unit = _run(
+                "architecture",
+                self.text,
+                _find_unit,
+                self.tokens,
+                "architecture",
+            )
+            self._architecture = (
+                None
+                if unit is None
+                else render(self.tokens, unit[0], unit[1] + 1)
+            )
+        return self._architecture
+
+    @property
+    def constants(self) -> Optional[List[Constant]]:
+        if self._constants is _MISSING:
+            self._constants = _run(
+                "constants", self.text, _constants, self.tokens
+            )
+        return self._constants
+
+    def as_dict(self) -> dict:
+        """Returns all sections of the result as a dictionary
+
+        Returns:
+            dict: section names mapped to their parsed values
+        """
+        return {
+            "entity": self.entity,
+            "generics": self.generics,
+            "ports": self.ports,
+            "architecture": self.architecture,
+            "constants": self.constants,
+        }
+
+    def table(self, section: str, share: Optional[Table] = None) -> Table:
+        """Returns generics, ports or constants in columnar form
+
+        Every distinct string is stored once, see
+        :class:`regex_fun.records.Table`. The offsets of a record are the
+        start and end of its name in the input string. A section that could
+        not be parsed results in an empty table.
+
+        Args:
+            section (str): "generics", "ports" or "constants"
+            share (Optional[Table], optional): table whose string table is
+                shared, e.g. across many files. Defaults to None.
+
+        Returns:
+            Table: records of the section
+        """
+        record, entries = self._entries(section)
+        table = Table(record, share)
+        table.extend((r, t.start, t.end) for r, t in entries or ())
+        return table
+
+    def span(self, section: str) -> Optional[Span]:
+        """Returns the position of the entity or architecture in the input
+
+        Args:
+            section (str): "entity" or "architecture"
+
+        Returns:
+            Optional[Span]: span from the unit keyword up to and including
+                the closing semicolon, None if there is no such unit
+        """
+        if section == "entity":
+            span = self.entity_span
+        elif section == "architecture":
+            unit = _find_unit(self.tokens, "architecture")
+            span = None if unit is None else unit[:2]
+        else:
+            raise ValueError("unknown section: {}".format(section))
+        if span is None:
+            return None
+        first, last = self.tokens[span[0]], self.tokens[span[1]]
+        return self.lines.span(first.start, last.end)
+
+    def spans(self, section: str) -> Optional[List[Span]]:
+        """Returns the positions of generics, ports or constants in the input
+
+        The span of a record is the span of its name, so that e.g. an editor
+        can jump to it without searching the input again. The list has the
+        same order as the records of the section.
+
+        Args:
+            section (str): "generics", "ports" or "constants"
+
+        Returns:
+            Optional[List[Span]]: spans, None if the section could not be
+                parsed
+        """
+        _, entries = self._entries(section)
+        if entries is None:
+            return None
+        span = self.lines.span
+        return [span(t.start, t.end) for _, t in entries]
+
+    def _entries(self, section: str) -> Tuple[type, Optional[list]]:
+        """Returns the record type and the records of a section together with
+        the tokens of their names"""
+        if section == "generics":
+            return Generic, _generic_entries(self.tokens, self.entity_span)
+        if section == "ports":
+            return Port, _port_entries(self.tokens, self.entity_span)
+        if section == "constants":
+            return Constant, _constant_entries(self.tokens)
+        raise ValueError("unknown section: {}".format(section))
 
-    - All valid VHDL comments are removed\n
-    - All whitespaces/tabs/new lines are replaced by a single whitespace\n
+
+# the most recently parsed input and its result while no cache is enabled.
+# the get_* functions are usually called one after another on the same
+# string, which then only has to be tokenized once
+_last = None
+# opt-in cache of parse results, see enable_cache
+_cache = None
+# opt-in recorder of the time spent in every parse phase, see
+# regex_fun.instrument.enable_profiling
+_profiler = None
+
+
+def enable_cache(maxsize: int = 128) -> LRUCache:
+    """Caches parse results by a content hash of the input string
+
+    Once enabled, :func:`parse_vhdl` and all get_* functions look up their
+    input in a size-bounded LRU cache before parsing it. A cached result keeps
+    the token stream of its input and every section that was extracted from
+    it, so repeated calls on equal strings only cost the hash of the input.
+
+    The cache replaces the memo of the last parsed input, so that every
+    lookup shows in its counters. Calling the function again replaces the
+    cache with an empty one.
 
     Args:
-        func ([type]): input function to decorate
+        maxsize (int, optional): maximum number of cached inputs. Defaults to
+            128.
+
+    Returns:
+        LRUCache: the cache, e.g. to read its counters or clear it
     """
+    global _cache, _last
+    _cache = LRUCache(maxsize)
+    _last = None
+    return _cache
+
+
+def disable_cache():
+    """Disables and drops the cache enabled with :func:`enable_cache`
+
+    The memo of the last parsed input is dropped as well, so the next call
+    parses its input again.
+    """
+    global _cache, _last
+    _cache = None
+    _last = None
+
+
+def parse_vhdl(text: Union[str, bytes]) -> ParseResult:
+    """Parses all sections out of an input string
+
+    The input is expected to be a string representing vhdl file content. It is
+    tokenized once (see :func:`regex_fun.lexer.tokenize`) and every section
+    (entity, generics, ports, architecture, constants) is extracted from that
+    single token stream.
+
+    The input may also be the undecoded bytes of a file. It is then
+    tokenized with :func:`regex_fun.lexer.tokenize_buffer`, only tokens with
+    non-ASCII bytes are decoded as UTF-8 and bytes that are not valid UTF-8
+    are replaced. Comments are never decoded, and offsets are byte offsets.
+
+    The last input and its result are kept, so consecutive calls on the same
+    string (e.g. one get_* function per section) only parse it once. To reuse
+    the results of more inputs, enable the cache (see :func:`enable_cache`).
+
+    Args:
+        text (Union[str, bytes]): input string or bytes
+
+    Returns:
+        ParseResult: parsed sections
+    """
+    global _last
+    assert type(text) in (str, bytes), "argument type must be string or bytes"
+    if _cache is not None:
+        return _cache.get_or_create(text, _parse)
+    last = _last
+    if last is not None and (last[0] is text or last[0] == text):
+        return last[1]
+    result = _parse(text)
+    _last = (text, result)
+    return result
+
+
+def _parse(text: Union[str, bytes]) -> ParseResult:
+    return ParseResult(text, _run("tokenize", text, _tokenize, text))
+
+
+def _tokenize(text: Union[str, bytes]) -> List[Token]:
+    return list(_tokens(text))
+
+
+def _tokens(text: Union[str, bytes]) -> Iterator[Token]:
+    if type(text) is bytes:
+        return tokenize_buffer(text, comments=False)
+    return tokenize(text, comments=False)
 
-    @wraps(func)
-    def inner(*args, **kwargs):
-        assert len(args) == 1, "number of arguments must be 1"
-        assert type(*args) is str, "argument type must be string"
-        # remove all VHDL comments
-        # (                 begin of capture group
-        #     --            two dashes
-        # )                 end of capture group
-        # .*?               any character zero or more times. lazy evaluation
-        # \n                new line
-        buffer = re.sub(r"(--).*?\n", "", *args)
-        # substitute all tabs, newlines, whitespaces with a single whitespace
-        # the .strip() removes any leading and trailing whitespace characters
-        # \s+               one or more whitespace characters
-        buffer = re.sub(r"\s+", " ", buffer).strip()
-        # add back to args
-        args = list(args)
-        args[0] = buffer
-        # call function
-        return func(*args, **kwargs)
-
-    return inner
-
-
-@_raw
-def get_entity(buffer: str) -> Optional[str]:
+
+def _run(phase: str, text: str, func, *args):
+    """Calls one phase of the parser, timed if profiling is enabled"""
+    profiler = _profiler
+    if profiler is None:
+        return func(*args)
+    start = perf_counter()
+    value = func(*args)
+    profiler.record(phase, perf_counter() - start, len(text), value)
+    return value
+
+
+def _copy(items: Optional[list]) -> Optional[list]:
+    # results are shared between calls on the same input. callers get their
+    # own list so that modifying it does not leak into later calls
+    return None if items is None else list(items)
+
+
+def get_entity(buffer: Union[str, bytes]) -> Optional[str]:
     """Parses the entity out of an input string
 
     The input is expected to be a string representing vhdl file content. If an
@@ -53,37 +348,16 @@ def get_entity(buffer: str) -> Optional[str]:
     with "entity" and ending on "end <name>;" or "end entity;"
 
     Args:
-        buffer (str): input string
+        buffer (Union[str, bytes]): input string or bytes, see
+            :func:`parse_vhdl`
 
     Returns:
         Optional[str]: entity string
     """
-    # (                 begin of capture group---------------------------ENTITY
-    #     entity        "entity"
-    #     \s+           one or more whitespace characters
-    #     \w+           one or more word characters
-    #     \s+           one or more whitespace characters
-    #     is            "is"
-    #     .+?           any character one or more times. lazy evaluation
-    #     end           "end"
-    #     \s+           one or more whitespace characters
-    #     \w+           one or more word characters
-    #     \s*           zero or more whitespace characters
-    #     ;             semicolon
-    # )                 end of capture group
-    m = re.search(
-        r"(entity\s+\w+\s+is.+?end\s+\w+\s*;)",
-        buffer,
-        flags=re.IGNORECASE | re.DOTALL,  # the DOTALL may not be necessary..
-    )
-    if m is None:
-        return None
-    entity = m.group(1)
-    return entity
+    return parse_vhdl(buffer).entity
 
 
-@_raw
-def get_generics(buffer: str) -> Optional[List[Tuple[str, str, str]]]:
+def get_generics(buffer: Union[str, bytes]) -> Optional[List[Generic]]:
     """Parses entity generics out of an input string
 
     The input is expected to be a string representing vhdl file content. If an
@@ -99,92 +373,16 @@ def get_generics(buffer: str) -> Optional[List[Tuple[str, str, str]]]:
     - default value (optional)\n
 
     Args:
-        buffer (str): input string
+        buffer (Union[str, bytes]): input string or bytes, see
+            :func:`parse_vhdl`
 
     Returns:
-        List[Tuple[str, str, str]]: generic names, types and default values
+        Optional[List[Generic]]: generic names, types and default values
     """
-    # (                 begin of capture group------------------ENTITY GENERICS
-    #     generic       "generic"
-    #     \s*           zero or more whitespace characters
-    #     \(            opening parenthesis
-    #     .*?           any character zero or more times. lazy evaluation
-    #     \)            closing parenthesis
-    #     \s*           zero or more whitespace characters
-    #     ;             semicolon
-    # )                 end of capture group
-    # \s*               zero or more whitespace characters
-    # port              "port"
-    # \s*               zero or more whitespace characters
-    # \(                opening parenthesis
-    m = re.search(
-        r"(generic\s*\(.*?\)\s*;)\s*port\s*\(", buffer, flags=re.IGNORECASE,
-    )
-    if m is None:
-        return None
-    generic_str = m.group(1)
-    # generic variable names
-    # (                 begin of capture group----------------------------NAMES
-    #     [a-z]         lowercase letter (identifiers must begin with a letter)
-    #     [a-z_0-9]     lowercase letter/underscore/digit or comma
-    #     *             zero or more times
-    # )                 end of capture group
-    # \s*               zero or more whitespace characters
-    # :                 double colon
-    # [^=]              any character that is not an equal sign
-    _generic_names = re.findall(
-        r"([a-z][a-z_0-9,]*)\s*:[^=]", generic_str, flags=re.IGNORECASE
-    )
-    # capture generic "type to end" of generic description
-    # used to identify the type and default value, but the default value is
-    # optional
-    # :                 double colon
-    # \s*               zero or more whitespace characters
-    # (                 begin of capture group-----------TYPES & DEFAULT VALUES
-    #     .*?           any character zero or more times. lazy evaluation
-    # )                 end of capture group
-    # \s*               zero or more whitespace characters
-    # (?:               begin of non-capture group
-    #     ;             semicolon
-    #     |             OR
-    #     \)            closing parenthesis
-    #     \s*           zero or more whitespace characters
-    #     ;             semicolon
-    # )                 end of non-capture group
-    __generic_type_to_end = re.findall(
-        r":\s*(.*?)\s*(?:;|\)\s*;)", generic_str, flags=re.IGNORECASE
-    )
-    # generic variable types (e.g. integer)
-    _generic_types = [
-        gtte.split(":=")[0].strip() for gtte in __generic_type_to_end
-    ]
-    # generic default values (e.g. 42)
-    # only if one is specified with ":=", None otherwise
-    _generic_def_vals = []
-    for gt in __generic_type_to_end:
-        def_val = gt.split(":=")[1].strip() if ":=" in gt else None
-        _generic_def_vals.append(def_val)
-
-    # account for multiple generic names in the same line, separated by comma
-    count = [_gn.count(",") + 1 for _gn in _generic_names]
-    # correct generic names list. every generic variable is an entry in a list
-    generic_names = [gn for _gn in _generic_names for gn in _gn.split(",")]
-    # correct generic types and default values. expand lists depending on count
-    generic_types, generic_def_vals = [], []
-    for c, _gt, _gd in zip(count, _generic_types, _generic_def_vals):
-        generic_types.extend([_gt] * c)
-        generic_def_vals.extend([_gd] * c)
-
-    # generic names, types and default values as a list of tuples
-    generics = [
-        (gn, gt, gd)
-        for gn, gt, gd in zip(generic_names, generic_types, generic_def_vals)
-    ]
-    return generics
+    return _copy(parse_vhdl(buffer).generics)
 
 
-@_raw
-def get_ports(buffer: str) -> Optional[List[Tuple[str, str, str]]]:
+def get_ports(buffer: Union[str, bytes]) -> Optional[List[Port]]:
     """Parses entity ports out of an input string
 
     The input is expected to be a string representing vhdl file content. If an
@@ -200,86 +398,16 @@ def get_ports(buffer: str) -> Optional[List[Tuple[str, str, str]]]:
     - type\n
 
     Args:
-        buffer (str): input string
+        buffer (Union[str, bytes]): input string or bytes, see
+            :func:`parse_vhdl`
 
     Returns:
-        Optional[List[Tuple[str, str, str]]]: port names, direction and types
+        Optional[List[Port]]: port names, direction and types
     """
-    # (                 begin of capture group---------------------ENTITY PORTS
-    #     port          "port"
-    #     \s*           zero or more whitespace characters
-    #     \(            opening parenthesis
-    #     .*?           any character zero or more times. lazy evaluation
-    #     \)            closing parenthesis
-    #     \s*           zero or more whitespace characters
-    #     ;             semicolon
-    # )                 end of capture group
-    # \s*               zero or more whitespace characters
-    # end               "end"
-    m = re.search(r"(port\s*\(.*?\)\s*;)\s*end", buffer, flags=re.IGNORECASE)
-    if m is None:
-        return None
-    port_str = m.group(1)
-    # port variable names
-    # (                 begin of capture group----------------------------NAMES
-    #     [a-z]         lowercase letter (identifiers must begin with that)
-    #     [a-z_0-9,]    lowercase letter/underscore/digit or comma
-    #     *             zero or more times
-    # )                 end of capture group
-    # \s*               zero or more whitespace characters
-    # :                 double colon
-    _port_names = re.findall(
-        r"([a-z][a-z_0-9,]*)\s*:", port_str, flags=re.IGNORECASE
-    )
-    # port directions (in, out, inout, buffer)
-    # :                 double colon
-    # \s*               zero or more whitespace characters
-    # (                 begin of capture group------------------------DIRECTION
-    #     [a-z]{2,}     lowercase letter. two or more times (shortest is "in")
-    # )                 end of capture group
-    # \s+               one or more whitespace characters
-    _port_dirs = re.findall(
-        r":\s*([a-z]{2,})\s+", port_str, flags=re.IGNORECASE
-    )
-    # port types (e.g. std_logic)
-    # :                 double colon
-    # \s*               zero or more whitespace characters
-    # [a-z]{2,}         lowercase letter. two or more times
-    # \s+               one or more whitespace characters
-    # (                 begin of capture group----------------------------TYPES
-    #     .+?           any character one or more times. lazy evaluation
-    # )                 end of capture group
-    # \s*               zero or more whitespace characters
-    # (?:               begin of non-capture group
-    #     \)            closing parenthesis
-    #     \s*           zero or more whitespace characters
-    #     ;             semicolon
-    #     |             OR
-    #     ;             semicolon
-    # )                 end of non-capture group
-    _port_types = re.findall(
-        r":\s*[a-z]{2,}\s+(.+?)\s*(?:\)\s*;|;)", port_str, flags=re.IGNORECASE,
-    )
+    return _copy(parse_vhdl(buffer).ports)
 
-    # account for  multiple port names in the same line, separated by comma
-    count = [_pn.count(",") + 1 for _pn in _port_names]
-    # correct port names list. every port variable is an entry in the list
-    port_names = [pn for _pn in _port_names for pn in _pn.split(",")]
-    # correct port dirs, types list. expand lists depending on no. of ports
-    port_dirs, port_types = [], []
-    for c, _pd, _pt in zip(count, _port_dirs, _port_types):
-        port_dirs.extend([_pd] * c)
-        port_types.extend([_pt] * c)
-
-    # port names, directions and types as a list of tuples
-    ports = [
-        (pn, pd, pt) for pn, pd, pt in zip(port_names, port_dirs, port_types)
-    ]
-    return ports
 
-
-@_raw
-def get_architecture(buffer: str) -> Optional[str]:
+def get_architecture(buffer: Union[str, bytes]) -> Optional[str]:
     """Parses the architecture out of an input string
 
     The input is expected to be a string representing vhdl file content. If an
@@ -290,42 +418,17 @@ def get_architecture(buffer: str) -> Optional[str]:
     "end <name>;" or "end architecture;"
 
     Args:
-        buffer (str): input string
+        buffer (Union[str, bytes]): input string or bytes, see
+            :func:`parse_vhdl`
 
     Returns:
         Optional[str]: architecture string
     """
-    # (                 begin of capture group---------------------ARCHITECTURE
-    #     architecture  "architecture"
-    #     \s+           one or more whitespace characters
-    #     \w+           one or more word characters
-    #     \s+           one or more whitespace characters
-    #     of            "of"
-    #     \s+           one or more whitespace characters
-    #     \w+           one or more word characters
-    #     \s+           one or more whitespace characters
-    #     is            "is"
-    #     .*            any character zero or more times
-    #     end           "end"
-    #     \s+           one or more whitespace characters
-    #     \w+           one or more word characters
-    #     \s*           zero or more whitespace characters
-    #     ;             semicolon
-    # )                 end of capture group
-    m = re.search(
-        r"(architecture\s+\w+\s+of\s+\w+\s+is.*end\s+\w+\s*;)",
-        buffer,
-        flags=re.IGNORECASE,
-    )
-    if m is None:
-        return None
-    architecture = m.group(1)
-    return architecture
+    return parse_vhdl(buffer).architecture
 
 
-@_raw
-def get_constants(buffer: str) -> Optional[List[Tuple[str, str, str]]]:
-    """Parses constants out of an input string 43
+def get_constants(buffer: Union[str, bytes]) -> Optional[List[Constant]]:
+    """Parses constants out of an input string
 
     The input is expected to be a string representing vhdl file content.
     Specifically, one where constants are defined. If constants are defined in
@@ -340,61 +443,614 @@ def get_constants(buffer: str) -> Optional[List[Tuple[str, str, str]]]:
     - default value\n
 
     Args:
-        buffer (str): input string
+        buffer (Union[str, bytes]): input string or bytes, see
+            :func:`parse_vhdl`
 
     Returns:
-        List[Tuple[str, str, str]]: constants names, types and default values
+        Optional[List[Constant]]: constants names, types and default values
     """
-    # constant          "constant"
-    # \s+               one or more whitespace characters
-    # (                 begin of capture group----------------------------NAMES
-    #     [a-z]         identifiers must begin with a letter
-    #     [a-z_0-9,]    lowercase letter/underscore/digit or comma
-    #     *             zero or more times
-    # )                 end of capture group
-    # \s*               zero or more whitespace characters
-    # :                 double colon
-    _constant_names = re.findall(
-        r"constant\s+([a-z][a-z_0-9,]*)\s*:", buffer, flags=re.IGNORECASE,
-    )
-    if _constant_names == []:
+    return _copy(parse_vhdl(buffer).constants)
+
+
+class DesignUnit:
+    """A library unit found in vhdl file content
+
+    The generics, ports and constants are extracted from the tokens on every
+    access.
+
+    Attributes:
+        kind (str): "entity", "architecture", "package", "package body",
+            "configuration" or "context"
+        name (str): name of the unit
+        of (Optional[str]): entity name of an architecture or configuration
+        tokens (List[Token]): tokens from the unit keyword up to and
+            including the closing semicolon
+        text (str): normalized unit string
+        generics (Optional[List[Generic]]): generics of an entity, see
+            :func:`get_generics`. None for other units
+        ports (Optional[List[Port]]): ports of an entity, see
+            :func:`get_ports`. None for other units
+        constants (Optional[List[Constant]]): constants declared within the
+            unit, see :func:`get_constants`
+    """
+
+    __slots__ = ("kind", "name", "of", "tokens", "_text")
+
+    def __init__(
+        self, kind: str, name: str, of: Optional[str], tokens: List[Token]
+    ):
+        self.kind = kind
+        self.name = name
+        self.of = of
+        self.tokens = tokens
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = render(self.tokens)
+        return self._text
+
+    @property
+    def generics(self) -> Optional[List[Generic]]:
+        if self.kind != "entity":
+            return None
+        return _generics(self.tokens, (0, len(self.tokens) - 1))
+
+    @property
+    def ports(self) -> Optional[List[Port]]:
+        if self.kind != "entity":
+            return None
+        return _ports(self.tokens, (0, len(self.tokens) - 1))
+
+    @property
+    def constants(self) -> Optional[List[Constant]]:
+        return _constants(self.tokens)
+
+    @property
+    def start(self) -> int:
+        """int: offset of the unit keyword in the input"""
+        return self.tokens[0].start
+
+    @property
+    def end(self) -> int:
+        """int: offset after the closing semicolon in the input"""
+        return self.tokens[-1].end
+
+    def __repr__(self) -> str:
+        of = "" if self.of is None else " of " + self.of
+        return "DesignUnit({} {}{})".format(self.kind, self.name, of)
+
+
+Entity = namedtuple("Entity", "name text generics ports architecture")
+Entity.__doc__ = """An entity with its interface and architecture
+
+Attributes:
+    name (str): entity name
+    text (str): entity string, see :func:`get_entity`
+    generics (Optional[List[Generic]]): see :func:`get_generics`
+    ports (Optional[List[Port]]): see :func:`get_ports`
+    architecture (Optional[str]): architecture string of the first
+        architecture of this entity, see :func:`get_architecture`
+"""
+
+
+def iter_design_units(text: Union[str, bytes]) -> Iterator[DesignUnit]:
+    """Finds all library units in an input string
+
+    The input is expected to be a string representing vhdl file content. It is
+    tokenized and split into units in a single forward pass, and every unit
+    is yielded as soon as its end is found. If the caller stops early, the
+    rest of the input is never tokenized. Units that are not terminated are
+    skipped.
+
+    Args:
+        text (Union[str, bytes]): input string or bytes, see
+            :func:`parse_vhdl`
+
+    Yields:
+        DesignUnit: units in the order they appear in the input
+    """
+    assert type(text) in (str, bytes), "argument type must be string or bytes"
+    return split_units(_tokens(text))
+
+
+def split_units(tokens: Iterable[Token]) -> Iterator[DesignUnit]:
+    """Finds all library units in a token stream
+
+    Works like :func:`iter_design_units` on tokens that are already at hand,
+    e.g. those of :attr:`ParseResult.tokens`, so the input does not have to
+    be tokenized again. The stream must not contain comments.
+
+    Args:
+        tokens (Iterable[Token]): tokens of one input
+
+    Yields:
+        DesignUnit: units in the order they appear in the input
+    """
+    for chunk in _split_units(tokens):
+        unit = _design_unit(chunk)
+        if unit is not None:
+            yield unit
+
+
+def iter_entities(text: Union[str, bytes]) -> Iterator[Entity]:
+    """Finds all entities together with their architectures
+
+    The input is processed with :func:`iter_design_units`. An entity is
+    yielded as soon as its first architecture is found, usually right after
+    the entity. Entities without an architecture in the input are yielded at
+    the end with an architecture of None.
+
+    Args:
+        text (Union[str, bytes]): input string or bytes, see
+            :func:`parse_vhdl`
+
+    Yields:
+        Entity: entities with generics, ports and architecture
+    """
+    pending = OrderedDict()
+    for unit in iter_design_units(text):
+        if unit.kind == "entity":
+            pending.setdefault(unit.name.lower(), unit)
+        elif unit.kind == "architecture":
+            entity = pending.pop(unit.of.lower(), None)
+            if entity is not None:
+                yield _entity_record(entity, unit)
+    for entity in pending.values():
+        yield _entity_record(entity, None)
+
+
+# port modes of an interface element
+_MODES = frozenset(("in", "out", "inout", "buffer", "linkage"))
+# object classes that may precede the names of an interface element
+_CLASSES = frozenset(("constant", "signal", "variable", "file"))
+# keywords that start a library unit or its context clause
+_UNITS = frozenset(
+    ("entity", "architecture", "package", "configuration", "context")
+)
+
+
+def _is_keyword(token: Token, word: str) -> bool:
+    return token.kind == KEYWORD and token.value.lower() == word
+
+
+def _unit_header(tokens: Sequence[Token], i: int) -> Optional[Tuple[str, int]]:
+    """Checks if a library unit starts at a token index
+
+    Recognized are "entity <name> is", "architecture <name> of",
+    "package <name> is", "package body", "configuration <name> of" and
+    "context <name> is". Library clauses start the context of the next unit.
+
+    Args:
+        tokens (Sequence[Token]): tokens of one input
+        i (int): token index
+
+    Returns:
+        Optional[Tuple[str, int]]: unit keyword and the index of the token
+            ending the header, None if no unit starts at the index
+    """
+    t = tokens[i]
+    if t.kind != KEYWORD:
         return None
-    # :                 double colon
-    # \s*               zero or more whitespace characters
-    # (                 begin of capture group----------------------------TYPES
-    #     .*?           any character zero or more times. lazy evaluation
-    # )                 end of capture group
-    # \s*               zero or more whitespace characters
-    # :=                double colon and equals sign
-    _constant_types = re.findall(
-        r":\s*(.*?)\s*:=", buffer, flags=re.IGNORECASE
-    )
-    # :=                double colon and equals sign
-    # \s*               zero or more whitespace characters
-    # (                 begin of capture group-------------------DEFAULT VALUES
-    #     .*?           any character zero or more times. lazy evaluation
-    # )                 end of capture group
-    # \s*               zero or more whitespace characters
-    # ;                 semicolon
-    _constant_def_vals = re.findall(
-        r":=\s*(.*?)\s*;", buffer, flags=re.IGNORECASE
+    word = t.value.lower()
+    if word == "library":
+        return word, i
+    if word not in _UNITS or i + 2 >= len(tokens):
+        return None
+    name, after = tokens[i + 1], tokens[i + 2]
+    if word == "package" and _is_keyword(name, "body"):
+        return word, i + 1
+    if name.kind != IDENTIFIER:
+        return None
+    if word in ("architecture", "configuration"):
+        if _is_keyword(after, "of"):
+            return word, i + 2
+    elif _is_keyword(after, "is"):
+        return word, i + 2
+    return None
+
+
+def _unit_end(tokens: Sequence[Token], i: int, word: str, name: str) -> int:
+    """Finds the semicolon that ends a library unit
+
+    The unit ends on "end <word> <name>;", "end <word>;" or "end <name>;". If
+    none of these are found before the next library unit starts, the unit
+    ends on the last "end ...;" that was found, e.g. "end;". Ends of nested
+    constructs such as "end process;" are skipped.
+
+    Args:
+        tokens (Sequence[Token]): tokens of one input
+        i (int): index of the first token after the unit header
+        word (str): unit keyword, e.g. "entity"
+        name (str): lower case unit name
+
+    Returns:
+        int: index of the semicolon, -1 if the unit is not terminated
+    """
+    n = len(tokens)
+    last = -1
+    while i < n:
+        t = tokens[i]
+        if t.kind == KEYWORD:
+            if t.value.lower() == "end":
+                j = i + 1
+                explicit = False
+                if j < n and _is_keyword(tokens[j], word):
+                    explicit = True
+                    j += 1
+                    if j < n and _is_keyword(tokens[j], "body"):
+                        j += 1
+                if j < n and tokens[j].kind == IDENTIFIER:
+                    explicit = explicit or tokens[j].value.lower() == name
+                    j += 1
+                if j < n and tokens[j].value == ";":
+                    if explicit:
+                        return j
+                    last = j
+                    i = j
+            elif _unit_header(tokens, i) is not None:
+                break
+        i += 1
+    return last
+
+
+def _split_units(tokens: Iterable[Token]) -> Iterator[List[Token]]:
+    """Splits a token stream in front of every library unit header
+
+    Every chunk but the first starts with a unit header or a library clause.
+    The end of a unit is always found within its chunk, see _unit_end.
+    """
+    chunk = []
+    for t in tokens:
+        chunk.append(t)
+        # a header is recognized by its first three tokens. "end package
+        # body" ends a unit
+        i = len(chunk) - 3
+        if i > 0 and chunk[i].kind == KEYWORD:
+            if _unit_header(chunk, i) and not _is_keyword(chunk[i - 1], "end"):
+                yield chunk[:i]
+                chunk = chunk[i:]
+    yield chunk
+
+
+def _design_unit(chunk: List[Token]) -> Optional[DesignUnit]:
+    """Returns the library unit of a chunk of _split_units"""
+    for i in range(len(chunk) - 2):
+        header = _unit_header(chunk, i)
+        if header is None or header[0] == "library":
+            continue
+        word, last = header
+        kind = word
+        if word == "package" and last == i + 1:
+            kind, last = "package body", i + 3
+        name = chunk[last - 1].value
+        of = None
+        if word in ("architecture", "configuration"):
+            if i + 3 >= len(chunk):
+                # "architecture <name> of" at the end of the input
+                return None
+            of = chunk[i + 3].value
+        end = _unit_end(chunk, last + 1, word, name.lower())
+        if end < 0:
+            return None
+        return DesignUnit(kind, name, of, chunk[i : end + 1])
+    return None
+
+
+def _entity_record(
+    entity: DesignUnit, architecture: Optional[DesignUnit]
+) -> Entity:
+    """Creates the Entity record of iter_entities"""
+    return Entity(
+        entity.name,
+        entity.text,
+        entity.generics,
+        entity.ports,
+        None if architecture is None else architecture.text,
     )
 
-    # account for multiple constant names in the same line, separated by comma
-    count = [_cn.count(",") + 1 for _cn in _constant_names]
-    # correct constant names list. every constant is an entry in a list
-    constant_names = [cn for _cn in _constant_names for cn in _cn.split(",")]
-    # correct constant types and default values. expand lists depending oncount
-    constant_types, constant_def_vals = [], []
-    for c, _ct, _cd in zip(count, _constant_types, _constant_def_vals):
-        constant_types.extend([_ct] * c)
-        constant_def_vals.extend([_cd] * c)
-
-    # constant names, types and default values as a list of tuples
-    constants = [
-        (cn, ct, cd)
-        for cn, ct, cd in zip(
-            constant_names, constant_types, constant_def_vals
-        )
+
+def _find_unit(
+    tokens: Sequence[Token], word: str, i: int = 0
+) -> Optional[Tuple[int, int, str]]:
+    """Finds the next library unit of one kind
+
+    Args:
+        tokens (Sequence[Token]): tokens of one input
+        word (str): unit keyword, e.g. "entity"
+        i (int, optional): token index to start at. Defaults to 0.
+
+    Returns:
+        Optional[Tuple[int, int, str]]: index of the first and last token of
+            the unit and the unit name, None if no unit is found
+    """
+    n = len(tokens)
+    while i < n:
+        t = tokens[i]
+        if t.kind == KEYWORD and t.value.lower() == word:
+            header = _unit_header(tokens, i)
+            if header is not None:
+                name = tokens[i + 1].value
+                end = _unit_end(tokens, header[1] + 1, word, name.lower())
+                if end >= 0:
+                    return i, end, name
+        i += 1
+    return None
+
+
+def _closing(tokens: Sequence[Token], i: int, stop: int) -> int:
+    """Returns the index of the parenthesis closing the one at index i
+
+    Only the tokens before index stop are searched, -1 is returned if the
+    parenthesis is not closed before.
+    """
+    depth = 0
+    for j in range(i, stop):
+        t = tokens[j]
+        if t.kind == DELIMITER:
+            if t.value == "(":
+                depth += 1
+            elif t.value == ")":
+                depth -= 1
+                if depth == 0:
+                    return j
+    return -1
+
+
+def _clause(
+    tokens: Sequence[Token], span: Tuple[int, int], word: str
+) -> Optional[Tuple[int, int]]:
+    """Finds a generic or port clause within a range of tokens
+
+    Args:
+        tokens (Sequence[Token]): tokens of one input
+        span (Tuple[int, int]): index of the first and last token to search
+        word (str): "generic" or "port"
+
+    Returns:
+        Optional[Tuple[int, int]]: indices of the opening and closing
+            parenthesis of the clause, None if there is no such clause
+    """
+    first, last = span
+    for i in range(first, last):
+        if _is_keyword(tokens[i], word) and tokens[i + 1].value == "(":
+            end = _closing(tokens, i + 1, last + 1)
+            # every later candidate is within a clause that is not closed,
+            # searching on would scan the rest of the range again for each
+            return None if end < 0 else (i + 1, end)
+    return None
+
+
+def _interface(
+    tokens: Sequence[Token], first: int, last: int
+) -> List[Tuple[List[str], Optional[str], str, Optional[str]]]:
+    """Parses an interface list between a pair of parentheses
+
+    Every interface element consists of the following properties:
+
+    - name tokens\n
+    - mode (None if not specified)\n
+    - type\n
+    - default value (None if not specified)\n
+
+    Elements without a type, e.g. VHDL-2008 generic types, are skipped.
+
+    Args:
+        tokens (Sequence[Token]): tokens of one input
+        first (int): index of the opening parenthesis
+        last (int): index of the closing parenthesis
+
+    Returns:
+        List[Tuple[List[Token], Optional[str], str, Optional[str]]]: elements
+            with the name tokens of every element
+    """
+    elements = []
+    depth = 0
+    start = first + 1
+    for i in range(first + 1, last + 1):
+        t = tokens[i]
+        if t.kind != DELIMITER:
+            continue
+        if t.value == "(":
+            depth += 1
+        elif t.value == ")" and i != last:
+            depth -= 1
+        elif depth == 0 and (t.value == ";" or i == last):
+            element = _element(tokens, start, i)
+            if element is not None:
+                elements.append(element)
+            start = i + 1
+    return elements
+
+
+def _element(
+    tokens: Sequence[Token], i: int, stop: int
+) -> Optional[Tuple[List[Token], Optional[str], str, Optional[str]]]:
+    """Parses one interface element, see _interface"""
+    if i < stop and tokens[i].kind == KEYWORD:
+        if tokens[i].value.lower() in _CLASSES:
+            i += 1
+    names = []
+    while i < stop and tokens[i].kind == IDENTIFIER:
+        names.append(tokens[i])
+        i += 1
+        if i < stop and tokens[i].value == ",":
+            i += 1
+        else:
+            break
+    if not names or i >= stop or tokens[i].value != ":":
+        return None
+    i += 1
+    mode = None
+    if i < stop and tokens[i].kind == KEYWORD:
+        if tokens[i].value.lower() in _MODES:
+            mode = tokens[i].value
+            i += 1
+    assign = _assignment(tokens, i, stop)
+    end = assign
+    if _is_keyword(tokens[end - 1], "bus"):
+        end -= 1
+    default = None if assign == stop else render(tokens, assign + 1, stop)
+    return names, mode, render(tokens, i, end), default
+
+
+def _assignment(tokens: Sequence[Token], i: int, stop: int) -> int:
+    """Returns the index of the first ":=" in a range, stop if there is none"""
+    for j in range(i, stop):
+        if tokens[j].value == ":=" and tokens[j].kind == DELIMITER:
+            return j
+    return stop
+
+
+def _generic_entries(
+    tokens: Sequence[Token], span: Optional[Tuple[int, int]]
+) -> Optional[List[Tuple[Generic, Token]]]:
+    """Parses the generics out of the entity within a token stream
+
+    Every generic comes with the token of its name.
+    """
+    clause = None if span is None else _clause(tokens, span, "generic")
+    if clause is None:
+        return None
+    return [
+        entry
+        for element in _interface(tokens, *clause)
+        for entry in _generic_items(element)
+    ]
+
+
+def _port_entries(
+    tokens: Sequence[Token], span: Optional[Tuple[int, int]]
+) -> Optional[List[Tuple[Port, Token]]]:
+    """Parses the ports out of the entity within a token stream
+
+    Every port comes with the token of its name.
+    """
+    clause = None if span is None else _clause(tokens, span, "port")
+    if clause is None:
+        return None
+    return [
+        entry
+        for element in _interface(tokens, *clause)
+        for entry in _port_items(element)
     ]
+
+
+def _generics(
+    tokens: Sequence[Token], span: Optional[Tuple[int, int]]
+) -> Optional[List[Generic]]:
+    """Parses the generics out of the entity within a token stream"""
+    return _records(_generic_entries(tokens, span))
+
+
+def _ports(
+    tokens: Sequence[Token], span: Optional[Tuple[int, int]]
+) -> Optional[List[Port]]:
+    """Parses the ports out of the entity within a token stream"""
+    return _records(_port_entries(tokens, span))
+
+
+def _records(entries: Optional[List[Tuple[tuple, Token]]]) -> Optional[list]:
+    return None if entries is None else [record for record, _ in entries]
+
+
+def _generic_items(element: tuple) -> List[Tuple[Generic, Token]]:
+    """Returns one generic per name of an interface element"""
+    names, _, type_, default = element
+    type_ = intern(type_)
+    return [(Generic(name.value, type_, default), name) for name in names]
+
+
+def _port_items(element: tuple) -> List[Tuple[Port, Token]]:
+    """Returns one port per name of an interface element"""
+    names, mode, type_, _ = element
+    # the mode of a port is "in" if it is not specified
+    mode = intern("in" if mode is None else mode)
+    type_ = intern(type_)
+    return [(Port(name.value, mode, type_), name) for name in names]
+
+
+def _constant_entries(
+    tokens: Sequence[Token],
+) -> Optional[List[Tuple[Constant, Token]]]:
+    """Parses all constant declarations out of a token stream
+
+    Every constant comes with the token of its name. The value of a deferred
+    constant (declared without a value) is None.
+    """
+    constants = []
+    n = len(tokens)
+    i = 0
+    while i < n:
+        t = tokens[i]
+        i += 1
+        if t.kind == KEYWORD and t.value.lower() == "constant":
+            i = _constant(tokens, i, constants)
+    if constants == []:
+        return None
     return constants
+
+
+def _constants(tokens: Sequence[Token]) -> Optional[List[Constant]]:
+    """Parses all constant declarations out of a token stream"""
+    return _records(_constant_entries(tokens))
+
+
+def _constant(
+    tokens: Sequence[Token], i: int, constants: List[Tuple[Constant, Token]]
+) -> int:
+    """Parses one constant declaration, starting after "constant"
+
+    The declaration ends on a semicolon or, within an interface list, on the
+    closing parenthesis of that list.
+
+    Args:
+        tokens (Sequence[Token]): tokens of one input
+        i (int): index of the first token after "constant"
+        constants (List[Tuple[Constant, Token]]): parsed constants are
+            appended together with the token of their name
+
+    Returns:
+        int: index of the first token after the declaration
+    """
+    n = len(tokens)
+    names = []
+    while i < n and tokens[i].kind == IDENTIFIER:
+        names.append(tokens[i])
+        i += 1
+        if i < n and tokens[i].value == ",":
+            i += 1
+        else:
+            break
+    if not names or i >= n or tokens[i].value != ":":
+        return i
+    first = i + 1
+    assign = -1
+    depth = 0
+    for j in range(first, n):
+        t = tokens[j]
+        if t.kind != DELIMITER:
+            continue
+        if t.value == "(":
+            depth += 1
+        elif t.value == ")":
+            if depth == 0:
+                break
+            depth -= 1
+        elif depth == 0:
+            if t.value == ";":
+                break
+            if t.value == ":=" and assign < 0:
+                assign = j
+    else:
+        j = n
+    if assign < 0:
+        type_, value = render(tokens, first, j), None
+    else:
+        type_, value = render(tokens, first, assign), render(
+            tokens, assign + 1, j
+        )
+    type_ = intern(type_)
+    constants.extend((Constant(t.value, type_, value), t) for t in names)
+    return j
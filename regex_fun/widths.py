@@ -0,0 +1,298 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from regex_fun import vhdl
+from regex_fun.expressions import (
+    EvaluationError,
+    Expression,
+    FUNCTIONS,
+    Range,
+    compile_expression,
+    compile_range,
+)
+from regex_fun.records import Generic, Port
+
+# bit widths of scalar types without a range constraint
+SCALARS = {
+    "std_logic": 1,
+    "std_ulogic": 1,
+    "bit": 1,
+    "boolean": 1,
+    "integer": 32,
+    "natural": 31,
+    "positive": 31,
+}
+
+# array types with one bit elements, their width is the length of the index
+# range. Arrays of other types, e.g. string or an array of words, have no
+# known width
+VECTORS = frozenset(
+    (
+        "std_logic_vector",
+        "std_ulogic_vector",
+        "bit_vector",
+        "signed",
+        "unsigned",
+    )
+)
+
+
+def range_width(r: Range, integer: bool) -> int:
+    """Returns the number of bits of a range
+
+    Args:
+        r (Range): evaluated range
+        integer (bool): True for a range of an integer type, whose width is
+            the number of bits of its largest value (plus a sign bit for
+            negative values), False for the index range of an array
+
+    Returns:
+        int: number of bits
+    """
+    if not integer:
+        return r.length
+    if r.length == 0:
+        return 0
+    low, high = r.low, r.high
+    if low >= 0:
+        return max(1, high.bit_length())
+    return max((-low - 1).bit_length(), high.bit_length()) + 1
+
+
+class PortWidths:
+    """Bit widths of the ports of one entity for any values of its generics
+
+    The range of every port type is parsed once when the object is created.
+    Evaluating the widths for a set of generic values only runs the compiled
+    bound expressions, and every distinct bound expression is evaluated once
+    per set of values, no matter how many ports share it.
+
+    Generics without an override get their default value. Defaults may
+    refer to other generics declared before them.
+
+    Args:
+        ports (Sequence[Port]): ports of the entity, see
+            :func:`regex_fun.vhdl.get_ports`
+        generics (Optional[Sequence[Generic]], optional): generics of the
+            entity, see :func:`regex_fun.vhdl.get_generics`. Defaults to None.
+        constants (Optional[Dict[str, object]], optional): values of other
+            names the types refer to, e.g. package constants returned by
+            :meth:`regex_fun.expressions.Resolver.resolve_all`. Defaults to
+            None.
+        functions (Optional[Dict[str, Callable]], optional): functions by
+            lower case name. Defaults to None, see
+            :data:`regex_fun.expressions.FUNCTIONS`.
+
+    Attributes:
+        names (List[str]): port names in declaration order
+        errors (Dict[str, str]): ports and generics whose type or default
+            is not a supported expression, with the reason
+    """
+
+    __slots__ = (
+        "names",
+        "errors",
+        "_ports",
+        "_generics",
+        "_bounds",
+        "_constants",
+        "_functions",
+    )
+
+    def __init__(
+        self,
+        ports: Sequence[Port],
+        generics: Optional[Sequence[Generic]] = None,
+        constants: Optional[Dict[str, object]] = None,
+        functions: Optional[Dict[str, Callable]] = None,
+    ):
+        self.names = [port.name for port in ports]
+        self.errors = {}  # type: Dict[str, str]
+        self._functions = FUNCTIONS if functions is None else functions
+        self._constants = _lower(constants)
+        # generic name with its compiled default, None if there is none
+        self._generics = []  # type: List[Tuple[str, Optional[Expression]]]
+        for name, _, default in generics or ():
+            expression = None
+            if default is not None:
+                try:
+                    expression = compile_expression(default)
+                except EvaluationError as e:
+                    self.errors[name] = str(e)
+            self._generics.append((name.lower(), expression))
+        # every port is a fixed width or the index of its range in _bounds
+        self._ports = []  # type: List[tuple]
+        self._bounds = []  # type: List[Expression]
+        index = {}  # type: Dict[str, int]
+        for name, _, type_ in ports:
+            self._ports.append(self._port(name, type_, index))
+
+    def _port(self, name: str, type_: str, index: Dict[str, int]) -> tuple:
+        """Compiles the type of one port, see __init__"""
+        words = type_.split(None, 1)
+        base = words[0].split("(", 1)[0].lower() if words else ""
+        # e.g. ieee.numeric_std.unsigned
+        base = base.rsplit(".", 1)[-1]
+        integer = base in SCALARS and "range" in type_.lower()
+        if not integer and base not in VECTORS:
+            # a scalar, or an unknown type
+            return (SCALARS.get(base),)
+        try:
+            compiled = compile_range(type_)
+        except EvaluationError as e:
+            self.errors[name] = str(e)
+            return (None,)
+        if compiled is None:
+            # an unconstrained vector or "natural range <>"
+            return (SCALARS.get(base),)
+        bounds = []
+        for expression in (compiled.left, compiled.right):
+            # ports with the same bound share one evaluation
+            key = expression.text
+            if key not in index:
+                index[key] = len(self._bounds)
+                self._bounds.append(expression)
+            bounds.append(index[key])
+        return bounds[0], compiled.direction, bounds[1], integer
+
+    @classmethod
+    def from_text(
+        cls,
+        text: str,
+        constants: Optional[Dict[str, object]] = None,
+        functions: Optional[Dict[str, Callable]] = None,
+    ) -> "PortWidths":
+        """Creates the port widths of the entity within vhdl file content
+
+        Args:
+            text (str): input string
+            constants (Optional[Dict[str, object]], optional): see
+                PortWidths. Defaults to None.
+            functions (Optional[Dict[str, Callable]], optional): see
+                PortWidths. Defaults to None.
+
+        Returns:
+            PortWidths: port widths of the first entity
+        """
+        result = vhdl.parse_vhdl(text)
+        return cls(result.ports or [], result.generics, constants, functions)
+
+    def generics(self, overrides: Optional[Dict[str, object]] = None) -> dict:
+        """Returns the values of all generics for a set of overrides
+
+        An override is a value or an expression string, which is evaluated
+        with the constants and the generics declared before. Generics that
+        have neither an override nor a default value that can be evaluated
+        are left out.
+
+        Args:
+            overrides (Optional[Dict[str, object]], optional): generic values
+                by name, names are case insensitive. Defaults to None.
+
+        Returns:
+            dict: values by lower case name, together with the constants
+        """
+        overrides = _lower(overrides)
+        functions = self._functions
+        values = dict(self._constants)
+        for name, default in self._generics:
+            value = overrides.get(name, default)
+            try:
+                if isinstance(value, str):
+                    value = compile_expression(value)
+                if isinstance(value, Expression):
+                    value = value.evaluate(values, functions)
+            except EvaluationError:
+                continue
+            if value is not None:
+                values[name] = value
+        return values
+
+    def widths(
+        self, overrides: Optional[Dict[str, object]] = None
+    ) -> "OrderedDict[str, Optional[int]]":
+        """Computes the bit width of every port
+
+        Args:
+            overrides (Optional[Dict[str, object]], optional): generic values
+                by name, names are case insensitive. Defaults to None.
+
+        Returns:
+            OrderedDict[str, Optional[int]]: width by port name, None if the
+                width can not be computed, e.g. for a record type or an array
+                of other than one bit elements (see VECTORS)
+        """
+        row = self._row(self.generics(overrides))
+        return OrderedDict(zip(self.names, row))
+
+    def batch(
+        self, configurations: Iterable[Optional[Dict[str, object]]]
+    ) -> List[Tuple[Optional[int], ...]]:
+        """Computes the port widths for many sets of generic values
+
+        Configurations that repeat (e.g. the same generic map on many
+        instances) are computed once.
+
+        Args:
+            configurations (Iterable[Optional[Dict[str, object]]]): generic
+                overrides of every configuration
+
+        Returns:
+            List[Tuple[Optional[int], ...]]: widths of every configuration,
+                in the order of names
+        """
+        rows = []
+        seen = {}  # type: Dict[tuple, Tuple[Optional[int], ...]]
+        for overrides in configurations:
+            key = tuple(sorted(_lower(overrides).items()))
+            try:
+                row = seen.get(key)
+            except TypeError:
+                # unhashable values are never shared
+                key, row = None, None
+            if row is None:
+                row = self._row(self.generics(overrides))
+                if key is not None:
+                    seen[key] = row
+            rows.append(row)
+        return rows
+
+    def _row(self, values: dict) -> Tuple[Optional[int], ...]:
+        functions = self._functions
+        bounds = []
+        for expression in self._bounds:
+            try:
+                bounds.append(expression.evaluate(values, functions))
+            except EvaluationError:
+                bounds.append(None)
+        row = []
+        for port in self._ports:
+            if len(port) == 1:
+                row.append(port[0])
+                continue
+            left, direction, right, integer = port
+            left, right = bounds[left], bounds[right]
+            if isinstance(left, int) and isinstance(right, int):
+                row.append(range_width(Range(left, direction, right), integer))
+            else:
+                row.append(None)
+        return tuple(row)
+
+    def __repr__(self) -> str:
+        return "PortWidths({} ports)".format(len(self.names))
+
+
+def _lower(values: Optional[Dict[str, object]]) -> Dict[str, object]:
+    """Returns a dict with lower case names
+
+    Qualified names such as "pkg.width" are also added by their simple name,
+    unless that name is taken.
+    """
+    result = {}  # type: Dict[str, object]
+    if not values:
+        return result
+    for name, value in values.items():
+        result[name.lower()] = value
+    for name, value in list(result.items()):
+        if "." in name:
+            result.setdefault(name.rsplit(".", 1)[1], value)
+    return result
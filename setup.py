@@ -13,7 +13,7 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/m-tosch/regex_fun",
-    packages=setuptools.find_packages(exclude=["tests*"]),
+    packages=setuptools.find_packages(exclude=["tests*", "benchmarks*"]),
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -21,4 +21,5 @@ setuptools.setup(
     ],
     python_requires=">=3.6",
     install_requires=[],
+    entry_points={"console_scripts": ["regex-fun=regex_fun.cli:main"]},
 )
@@ -0,0 +1,128 @@
+import time
+import unittest
+from regex_fun import architecture, vhdl
+from regex_fun.records import Process, Signal, Instantiation
+
+TOP = """
+architecture rtl of top is
+    signal a, b : std_logic := '0';
+    signal v : std_logic_vector(7 downto 0);
+    component fifo is
+        port(d : in std_logic);
+    end component;
+begin
+    u0 : entity work.leaf(rtl)
+        generic map (W => 8)
+        port map (a => s(0), b => open);
+    u1 : fifo port map (a, b);
+    lbl : a <= b;
+    p1 : process(clk, rst) is
+    begin
+    end process p1;
+    process(all) begin end process;
+    postponed process begin wait; end postponed process;
+    g : for i in 0 to 3 generate
+        signal t : bit;
+    begin
+        u2 : component fifo port map (d => t);
+    end generate;
+end rtl;
+"""
+
+
+class TestArchitecture(unittest.TestCase):
+    def setUp(self):
+        with open("tests/vhdl/module.vhd", "r") as f:
+            self.module = f.read()
+
+    def test_module(self):
+        # action
+        index = architecture.get_architecture_index(self.module)
+        # assert
+        self.assertEqual((index.name, index.entity), ("behavioral", "module"))
+        self.assertEqual(
+            index.signals,
+            [
+                ("s1", "std_logic", "'1'"),
+                ("s2", "integer range 0 to N-1", "0"),
+                ("s3", "std_logic_vector(N-1 downto 0)", "(others=>0)"),
+            ],
+        )
+        self.assertEqual(index.processes, [(None, ["clk", "reset"])])
+        self.assertEqual(index.instances, [])
+
+    def test_signals(self):
+        # action
+        index = architecture.get_architecture_index(TOP)
+        # assert
+        self.assertIsInstance(index.signals[0], Signal)
+        self.assertEqual([s.name for s in index.signals], ["a", "b", "v", "t"])
+        self.assertEqual(index.signals[2].default, None)
+
+    def test_processes(self):
+        # action
+        index = architecture.get_architecture_index(TOP)
+        # assert
+        self.assertEqual(
+            index.processes,
+            [
+                Process("p1", ["clk", "rst"]),
+                Process(None, ["all"]),
+                Process(None, None),
+            ],
+        )
+
+    def test_instances(self):
+        # action
+        index = architecture.get_architecture_index(TOP)
+        # assert
+        self.assertEqual(
+            index.instances,
+            [
+                Instantiation(
+                    "u0",
+                    "entity",
+                    "work.leaf(rtl)",
+                    [("W", "8")],
+                    [("a", "s(0)"), ("b", "open")],
+                ),
+                Instantiation(
+                    "u1", "component", "fifo", [], [(None, "a"), (None, "b")]
+                ),
+                Instantiation("u2", "component", "fifo", [], [("d", "t")]),
+            ],
+        )
+
+    def test_iter_architectures(self):
+        # action
+        indexes = list(architecture.iter_architectures(self.module + TOP))
+        # assert
+        self.assertEqual([a.name for a in indexes], ["behavioral", "rtl"])
+        self.assertEqual(len(indexes[1].instances), 3)
+
+    def test_index_unit(self):
+        # arrange
+        units = list(vhdl.iter_design_units(self.module))
+        # action
+        index = architecture.index_unit(units[1])
+        # assert
+        expected = architecture.get_architecture_index(self.module)
+        self.assertEqual(index, expected)
+        with self.assertRaises(ValueError):
+            architecture.index_unit(units[0])
+
+    def test_no_architecture(self):
+        # assert
+        self.assertIsNone(architecture.get_architecture_index("entity"))
+
+    def test_unclosed_parentheses(self):
+        # arrange
+        statements = "p : process ( u : entity work.x ( v : c port map ( "
+        text = "architecture a of e is begin " + statements * 5000 + "end a;"
+        start = time.perf_counter()
+        # action
+        index = architecture.get_architecture_index(text)
+        # assert
+        self.assertEqual(len(index.processes), 5000)
+        self.assertEqual(index.instances[0].unit, "work.x")
+        self.assertLess(time.perf_counter() - start, 5)
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import unittest
+from regex_fun import batch, vhdl
+
+
+class TestScanProject(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, "sub"))
+        os.makedirs(os.path.join(self.root, ".git"))
+        shutil.copy("tests/vhdl/module.vhd", self.root)
+        shutil.copy(
+            "tests/vhdl/constants.vhd",
+            os.path.join(self.root, "sub", "constants.vhdl"),
+        )
+        shutil.copy("tests/vhdl/module.vhd", os.path.join(self.root, ".git"))
+        with open(os.path.join(self.root, "notes.txt"), "w") as f:
+            f.write("entity x is end x;")
+        with open(os.path.join(self.root, "latin1.vhd"), "wb") as f:
+            f.write(b"-- caf\xe9\nentity e is port(x : in \xff); end;")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_find_files(self):
+        # action
+        files = [
+            os.path.relpath(path, self.root)
+            for path in batch.find_files(self.root)
+        ]
+        expected = [
+            "latin1.vhd",
+            "module.vhd",
+            os.path.join("sub", "constants.vhdl"),
+        ]
+        # assert
+        self.assertEqual(files, expected)
+
+    def test_single_worker(self):
+        # action
+        records = list(batch.scan_project(self.root, workers=1))
+        # assert
+        module = records[1]
+        with open("tests/vhdl/module.vhd", "r") as f:
+            self.assertEqual(module.ports, vhdl.get_ports(f.read()))
+        self.assertEqual(module.errors, [])
+        self.assertEqual(len(records[2].constants), 15)
+
+    def test_undecodable_bytes(self):
+        # action
+        records = list(batch.scan_project(self.root, workers=1))
+        # assert
+        self.assertEqual(records[0].errors, [])
+        self.assertEqual(records[0].ports, [("x", "in", "\ufffd")])
+
+    def test_errors(self):
+        # action
+        record = batch.parse_file(os.path.join(self.root, "missing.vhd"))
+        # assert
+        self.assertIsNone(record.entity)
+        self.assertEqual(len(record.errors), 1)
+
+    def test_process_pool(self):
+        # action
+        records = batch.scan_project(self.root, workers=2, chunksize=1)
+        # assert
+        self.assertEqual(
+            sorted(records),
+            list(batch.scan_project(self.root, workers=1)),
+        )
+
+
+class TestParseMany(unittest.TestCase):
+    def setUp(self):
+        with open("tests/vhdl/module.vhd", "r") as f:
+            module = f.read()
+        with open("tests/vhdl/constants.vhd", "r") as f:
+            constants = f.read()
+        self.texts = [module, constants, "", module.replace("N-1", "7")] * 5
+
+    def test_parse_many(self):
+        # action
+        results = batch.parse_many(self.texts)
+        # assert
+        self.assertEqual(
+            results, [vhdl.parse_vhdl(t).as_dict() for t in self.texts]
+        )
+
+    def test_generator(self):
+        # action
+        results = batch.parse_many(t for t in self.texts)
+        # assert
+        self.assertEqual(results, batch.parse_many(self.texts))
+
+    def test_sections(self):
+        # action
+        results = batch.parse_many(self.texts[:2], sections=("ports",))
+        # assert
+        self.assertEqual(
+            results,
+            [{"ports": vhdl.get_ports(self.texts[0])}, {"ports": None}],
+        )
+
+    def test_workers(self):
+        # action
+        results = batch.parse_many(self.texts, workers=2, chunksize=3)
+        # assert
+        self.assertEqual(results, batch.parse_many(self.texts))
+
+    def test_unknown_section(self):
+        # assert
+        with self.assertRaises(ValueError):
+            batch.parse_many(self.texts, sections=("body",))
@@ -0,0 +1,77 @@
+import unittest
+from regex_fun import vhdl
+from regex_fun.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        # arrange
+        cache = LRUCache(2)
+        # action
+        cache.set("a", 1)
+        hit = cache.get("a")
+        miss = cache.get("b")
+        # assert
+        self.assertEqual((hit, miss), (1, None))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_eviction(self):
+        # arrange
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        # action
+        cache.set("c", 3)
+        # assert
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_bytes_and_strings(self):
+        # arrange
+        cache = LRUCache(2)
+        # action
+        cache.set("a", 1)
+        cache.set(b"a", 2)
+        # assert
+        self.assertEqual((cache.get("a"), cache.get(b"a")), (1, 2))
+
+    def test_clear(self):
+        # arrange
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.get("a")
+        # action
+        cache.clear()
+        # assert
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()["hits"], 0)
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        with open("tests/vhdl/module.vhd", "r") as f:
+            self.module = f.read()
+        self.cache = vhdl.enable_cache(4)
+
+    def tearDown(self):
+        vhdl.disable_cache()
+
+    def test_repeated_calls(self):
+        # arrange
+        other = "".join(list(self.module))  # equal, but another object
+        # action
+        ports = vhdl.get_ports(self.module)
+        cached = vhdl.get_ports(other)
+        # assert
+        self.assertEqual(ports, cached)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertIs(vhdl.parse_vhdl(other), vhdl.parse_vhdl(self.module))
+
+    def test_disabled(self):
+        # action
+        vhdl.disable_cache()
+        vhdl.get_ports(self.module)
+        # assert
+        self.assertEqual(self.cache.misses, 0)
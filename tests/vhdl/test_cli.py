@@ -0,0 +1,82 @@
+import io
+import json
+import os
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from regex_fun import cli
+
+
+def run(*argv):
+    out = io.StringIO()
+    with redirect_stdout(out):
+        status = cli.main(list(argv))
+    return status, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+class TestCli(unittest.TestCase):
+    def test_files(self):
+        # action
+        status, units = run("tests/vhdl/module.vhd")
+        # assert
+        self.assertEqual(status, 0)
+        self.assertEqual(
+            [(u["kind"], u["name"], u["line"]) for u in units],
+            [("entity", "module", 4), ("architecture", "behavioral", 12)],
+        )
+        self.assertEqual(
+            units[0]["ports"][0],
+            {"name": "clk", "direction": "in", "type": "std_logic"},
+        )
+        self.assertEqual(units[1]["of"], "module")
+
+    def test_directory(self):
+        # action
+        status, units = run("tests/vhdl")
+        # assert
+        self.assertEqual(status, 0)
+        self.assertEqual(
+            [(os.path.basename(u["path"]), u["kind"]) for u in units],
+            [
+                ("constants.vhd", "package"),
+                ("module.vhd", "entity"),
+                ("module.vhd", "architecture"),
+            ],
+        )
+        self.assertEqual(len(units[0]["constants"]), 15)
+
+    def test_workers(self):
+        # action
+        status, units = run("-j", "2", "--chunksize", "1", "tests/vhdl")
+        # assert
+        self.assertEqual(status, 0)
+        self.assertEqual(
+            sorted((u["path"], u["start"]) for u in units),
+            sorted((u["path"], u["start"]) for u in run("tests/vhdl")[1]),
+        )
+
+    def test_invalid_counts(self):
+        for argv, message in (
+            (["--chunksize", "0", "-j", "2"], "--chunksize: 0 is less than 1"),
+            (["-j", "-1"], "--workers: -1 is less than 0"),
+            (["-j", "two"], "--workers: invalid int value: 'two'"),
+        ):
+            with self.subTest(argv=argv):
+                # action
+                with redirect_stderr(io.StringIO()) as err:
+                    with self.assertRaises(SystemExit) as raised:
+                        run(*argv + ["tests/vhdl"])
+                # assert
+                self.assertEqual(raised.exception.code, 2)
+                self.assertIn(message, err.getvalue())
+
+    def test_errors(self):
+        # action
+        status, units = run("tests/vhdl/missing.vhd")
+        # assert
+        self.assertEqual(status, 1)
+        self.assertEqual(units[0]["path"], "tests/vhdl/missing.vhd")
+        self.assertIn("error", units[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from regex_fun import daemon
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        shutil.copy("tests/vhdl/module.vhd", self.root)
+        self.path = os.path.join(self.root, "module.vhd")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_poll(self):
+        # arrange
+        watcher = daemon.Watcher(self.root)
+        first = watcher.poll()
+        with open(self.path, "a") as f:
+            f.write("-- changed")
+        # action
+        second = watcher.poll()
+        os.remove(self.path)
+        third = watcher.poll()
+        # assert
+        self.assertEqual(first, ({self.path}, set()))
+        self.assertEqual(second, ({self.path}, set()))
+        self.assertEqual(third, (set(), {self.path}))
+
+
+class TestDaemon(unittest.TestCase):
+    backend = "poll"
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        shutil.copy("tests/vhdl/module.vhd", self.root)
+        shutil.copy("tests/vhdl/constants.vhd", self.root)
+        self.socket = os.path.join(self.root, ".daemon.sock")
+        self.thread = threading.Thread(
+            target=daemon.serve,
+            args=(self.root, self.socket, 60.0, self.backend),
+        )
+        self.thread.start()
+        for _ in range(200):
+            if os.path.exists(self.socket):
+                break
+            time.sleep(0.01)
+
+    def tearDown(self):
+        daemon.query(self.socket, "shutdown")
+        self.thread.join(5)
+        shutil.rmtree(self.root)
+
+    def test_queries(self):
+        # action
+        status = daemon.query(self.socket, "status")
+        entities = daemon.query(self.socket, "entities")
+        records = daemon.query(self.socket, "entity", name="MODULE")
+        # assert
+        self.assertEqual(status["files"], 2)
+        self.assertEqual(status["backend"], self.backend)
+        self.assertEqual(entities, ["module"])
+        self.assertEqual(len(records), 1)
+        self.assertEqual(
+            records[0]["ports"][0],
+            {"name": "clk", "direction": "in", "type": "std_logic"},
+        )
+
+    def test_refresh(self):
+        # arrange
+        with open(os.path.join(self.root, "other.vhd"), "w") as f:
+            f.write("entity other is end other;")
+        os.remove(os.path.join(self.root, "constants.vhd"))
+        # action
+        changes = daemon.query(self.socket, "refresh")
+        entities = daemon.query(self.socket, "entities")
+        # assert
+        self.assertEqual(sorted(changes), ["changed", "removed"])
+        self.assertEqual(entities, ["module", "other"])
+
+    def test_errors(self):
+        # assert
+        with self.assertRaises(RuntimeError):
+            daemon.query(self.socket, "nothing")
+        with self.assertRaises(RuntimeError):
+            daemon.query(self.socket, "file", path="missing.vhd")
+
+
+@unittest.skipUnless(hasattr(os, "uname"), "inotify needs linux")
+class TestInotify(TestDaemon):
+    backend = "inotify"
+
+    def setUp(self):
+        try:
+            daemon._Inotify().close()
+        except OSError:
+            self.skipTest("inotify is not available")
+        super().setUp()
+
+    def test_events(self):
+        # arrange
+        os.makedirs(os.path.join(self.root, "sub"))
+        path = os.path.join(self.root, "sub", "other.vhd")
+        with open(path, "w") as f:
+            f.write("entity other is end other;")
+        # action
+        for _ in range(200):
+            entities = daemon.query(self.socket, "entities")
+            if "other" in entities:
+                break
+            time.sleep(0.01)
+        # assert
+        self.assertEqual(entities, ["module", "other"])
@@ -0,0 +1,172 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from regex_fun import deps, vhdl
+
+PACKAGE = """
+package types is
+    constant W : integer := 8;
+end package;
+"""
+LEAF = """
+library ieee;
+use ieee.std_logic_1164.all;
+use work.types.all;
+entity leaf is port(a : in std_logic); end leaf;
+architecture rtl of leaf is begin end rtl;
+"""
+OTHER = """
+entity other is port(a : in bit); end other;
+"""
+TOP = """
+library ieee, mylib;
+use ieee.std_logic_1164.all;
+entity top is end top;
+architecture rtl of top is
+    signal s : std_logic;
+begin
+    u0 : entity work.leaf(rtl) port map (a => s);
+    u1 : other port map (a => '0');
+    u2 : component other port map (a => '1');
+    u3 : configuration mylib.cfg;
+end rtl;
+"""
+
+
+class TestReferences(unittest.TestCase):
+    def test_references(self):
+        # action
+        refs = deps.get_references(TOP)
+        # assert
+        self.assertEqual(
+            refs.units,
+            [("entity", "top", None), ("architecture", "rtl", "top")],
+        )
+        self.assertEqual(refs.libraries, ["ieee", "mylib"])
+        self.assertEqual(refs.uses, [("ieee", "std_logic_1164", "all")])
+        self.assertEqual(
+            refs.instances,
+            [
+                deps.Instance("u0", "entity", "work", "leaf", "rtl"),
+                deps.Instance("u1", "component", None, "other", None),
+                deps.Instance("u2", "component", None, "other", None),
+                deps.Instance("u3", "configuration", "mylib", "cfg", None),
+            ],
+        )
+
+    def test_tokenized_once(self):
+        # arrange
+        text = TOP + "\n-- not memoized by other tests\n"
+        with mock.patch.object(vhdl, "_tokens", wraps=vhdl._tokens) as tokens:
+            # action
+            refs = deps.get_references(text)
+        # assert
+        self.assertEqual(tokens.call_count, 1)
+        self.assertEqual(len(refs.units), 2)
+
+    def test_module(self):
+        # arrange
+        with open("tests/vhdl/module.vhd", "r") as f:
+            module = f.read()
+        # action
+        refs = deps.get_references(module)
+        # assert
+        self.assertEqual(refs.instances, [])
+        self.assertEqual(refs.uses, [("ieee", "std_logic_1164", "all")])
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = deps.DependencyGraph()
+        for path, text in (
+            ("top.vhd", TOP),
+            ("leaf.vhd", LEAF),
+            ("types.vhd", PACKAGE),
+            ("other.vhd", OTHER),
+        ):
+            self.graph.update(path, text)
+
+    def test_dependencies(self):
+        # action
+        dependencies = self.graph.dependencies("top.vhd")
+        # assert
+        self.assertEqual(dependencies, {"leaf.vhd", "other.vhd"})
+        self.assertEqual(self.graph.dependents("types.vhd"), {"leaf.vhd"})
+
+    def test_levels(self):
+        # action
+        levels = self.graph.levels()
+        # assert
+        self.assertEqual(
+            levels, [["other.vhd", "types.vhd"], ["leaf.vhd"], ["top.vhd"]]
+        )
+
+    def test_incremental(self):
+        # arrange
+        self.graph.dirty.clear()
+        # action
+        changed = self.graph.update("other.vhd", OTHER + "-- edit")
+        # assert
+        self.assertEqual(changed, {"other.vhd", "top.vhd"})
+        self.assertEqual(
+            self.graph.levels(changed), [["other.vhd"], ["top.vhd"]]
+        )
+
+    def test_moved_unit(self):
+        # arrange
+        self.graph.dirty.clear()
+        # action
+        changed = self.graph.update("types.vhd", "")
+        # assert
+        self.assertEqual(changed, {"types.vhd", "leaf.vhd", "top.vhd"})
+        self.assertEqual(self.graph.dependencies("leaf.vhd"), set())
+
+    def test_remove(self):
+        # action
+        changed = self.graph.remove("leaf.vhd")
+        # assert
+        self.assertEqual(changed, {"top.vhd"})
+        self.assertNotIn("leaf.vhd", self.graph)
+
+    def test_cycle(self):
+        # arrange
+        self.graph.update(
+            "types.vhd", PACKAGE + "package body types is end package body;"
+            "use work.top.all;"
+        )
+        self.graph.update("top.vhd", TOP + "package top is end package;")
+        # assert
+        with self.assertRaises(ValueError):
+            self.graph.levels()
+
+
+class TestScan(unittest.TestCase):
+    def test_scan(self):
+        # arrange
+        root = tempfile.mkdtemp()
+        for name, text in (("top.vhd", TOP), ("leaf.vhd", LEAF)):
+            with open(os.path.join(root, name), "w") as f:
+                f.write(text)
+        # action
+        graph = deps.DependencyGraph.scan(root, workers=1)
+        shutil.rmtree(root)
+        # assert
+        self.assertEqual(len(graph), 2)
+        self.assertEqual(
+            [os.path.basename(p) for p in graph.compile_order()],
+            ["leaf.vhd", "top.vhd"],
+        )
+
+    def test_undecodable_bytes(self):
+        # arrange
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        with open(os.path.join(root, "latin1.vhd"), "wb") as f:
+            f.write(b"-- caf\xe9\n" + LEAF.encode())
+        # action
+        graph = deps.DependencyGraph.scan(root, workers=1)
+        # assert
+        self.assertEqual(graph.errors, {})
+        self.assertEqual(len(graph), 1)
@@ -0,0 +1,111 @@
+import random
+import unittest
+from regex_fun import vhdl
+from regex_fun.document import Document
+
+
+class TestDocument(unittest.TestCase):
+    def setUp(self):
+        with open("tests/vhdl/module.vhd", "r") as f:
+            self.module = f.read()
+        with open("tests/vhdl/constants.vhd", "r") as f:
+            self.constants = f.read()
+        self.text = self.module + "\n" + self.constants
+
+    def assertSections(self, document):
+        text = document.text
+        self.assertEqual(document.entity, vhdl.get_entity(text))
+        self.assertEqual(document.generics, vhdl.get_generics(text))
+        self.assertEqual(document.ports, vhdl.get_ports(text))
+        self.assertEqual(document.architecture, vhdl.get_architecture(text))
+        self.assertEqual(document.constants, vhdl.get_constants(text))
+        self.assertEqual(
+            [(u.kind, u.start, u.end) for u in document.units],
+            [(u.kind, u.start, u.end) for u in vhdl.iter_design_units(text)],
+        )
+
+    def test_sections(self):
+        # action
+        document = Document(self.text)
+        # assert
+        self.assertSections(document)
+
+    def test_edit(self):
+        # arrange
+        document = Document(self.text)
+        offset = self.text.index("reset")
+        # action
+        units = document.edit(offset, len("reset"), "rst_n")
+        # assert
+        self.assertEqual(
+            document.text, self.text.replace("reset", "rst_n", 1)
+        )
+        self.assertEqual([u.kind for u in units], ["entity"])
+        self.assertEqual(document.ports[3].name, "rst_n")
+        self.assertSections(document)
+
+    def test_edit_keeps_other_units(self):
+        # arrange
+        document = Document(self.text)
+        package = document.units[-1]
+        offset = self.text.index("is", self.text.index("entity"))
+        # action
+        units = document.edit(offset, 0, "  ")
+        # assert
+        self.assertNotIn("package", [u.kind for u in units])
+        self.assertIs(document._regions[-1].unit, package)
+        self.assertEqual(document.units[-1].start, package.start + 2)
+        self.assertSections(document)
+
+    def test_new_unit(self):
+        # arrange
+        document = Document(self.text)
+        # action
+        document.edit(len(self.text), 0, "\nentity e is end e;")
+        document.edit(0, 0, "package p is constant c : bit := '1'; end;\n")
+        # assert
+        self.assertEqual(len(document.units), 5)
+        self.assertEqual(document.constants[0].name, "c")
+        self.assertSections(document)
+
+    def test_block_comment(self):
+        # arrange
+        document = Document(self.text)
+        offset = self.text.index("architecture")
+        # action
+        document.edit(offset, 0, "/*")
+        architecture = document.architecture
+        document.edit(len(document.text), 0, "*/")
+        # assert
+        self.assertIsNone(architecture)
+        self.assertEqual(len(document.units), 1)
+        self.assertSections(document)
+
+    def test_random_edits(self):
+        # arrange
+        document = Document(self.text)
+        pieces = ["end", ";", "entity", " is ", "/*", "*/", "--", "\n", "x"]
+        rnd = random.Random(0)
+        # action
+        for _ in range(200):
+            offset = rnd.randrange(len(document) + 1)
+            removed = rnd.randrange(min(10, len(document) - offset) + 1)
+            document.edit(offset, removed, rnd.choice(pieces))
+            fresh = Document(document.text)
+            # assert
+            self.assertEqual(
+                [(u.kind, u.start, u.text) for u in document.units],
+                [(u.kind, u.start, u.text) for u in fresh.units],
+            )
+            self.assertEqual(document.constants, fresh.constants)
+
+    def test_out_of_range(self):
+        # arrange
+        document = Document("entity e is end e;")
+        # assert
+        with self.assertRaises(ValueError):
+            document.edit(10, 20, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+import time
+import unittest
+from regex_fun import expressions
+from regex_fun.expressions import EvaluationError, Range, Resolver
+
+
+class TestEvaluate(unittest.TestCase):
+    def test_literals(self):
+        # assert
+        self.assertEqual(expressions.evaluate("1_000"), 1000)
+        self.assertEqual(expressions.evaluate("16#FF#"), 255)
+        self.assertEqual(expressions.evaluate("2#1#E4"), 16)
+        self.assertEqual(expressions.evaluate("1E3"), 1000)
+        self.assertEqual(expressions.evaluate("2.5"), 2.5)
+        self.assertEqual(expressions.evaluate('x"00000001"'), 1)
+        self.assertEqual(expressions.evaluate('b"1010_1010"'), 170)
+        self.assertEqual(expressions.evaluate('4sx"F"'), -1)
+        self.assertEqual(expressions.evaluate("true"), True)
+
+    def test_operators(self):
+        # assert
+        self.assertEqual(expressions.evaluate("2**17"), 131072)
+        self.assertEqual(expressions.evaluate("-2**2"), -4)
+        self.assertEqual(expressions.evaluate("-7 / 2"), -3)
+        self.assertEqual(expressions.evaluate("-7 rem 2"), -1)
+        self.assertEqual(expressions.evaluate("7 mod (-2)"), -1)
+        self.assertEqual(expressions.evaluate("abs (1 - 5) * 2"), 8)
+        self.assertEqual(expressions.evaluate("(1 + 2) * 3 = 9"), True)
+        self.assertEqual(expressions.evaluate("1 < 2 and 2 > 3"), False)
+
+    def test_names(self):
+        # action
+        value = expressions.evaluate(
+            "integer(ceil(log2(real(Depth))))", {"DEPTH": 1000}
+        )
+        # assert
+        self.assertEqual(value, 10)
+
+    def test_errors(self):
+        # assert
+        with self.assertRaises(EvaluationError):
+            expressions.evaluate("N + 1")
+        with self.assertRaises(EvaluationError):
+            expressions.evaluate("1 / 0")
+        with self.assertRaises(EvaluationError):
+            expressions.evaluate("(others => '0')")
+        with self.assertRaises(EvaluationError):
+            expressions.evaluate("clk'event")
+
+    def test_compile_once(self):
+        # action
+        expression = expressions.compile_expression("N - 1")
+        # assert
+        self.assertIs(expressions.compile_expression("N - 1"), expression)
+        self.assertEqual(expression.names, ("n",))
+        self.assertEqual(expression.evaluate({"n": 8}), 7)
+        self.assertEqual(expression.evaluate({"n": 16}), 15)
+
+
+class TestRange(unittest.TestCase):
+    def test_range(self):
+        # action
+        r = expressions.get_range(
+            "integer range 1 to Leonardus_MAX", {"Leonardus_MAX": 4}
+        )
+        # assert
+        self.assertEqual(r, Range(1, "to", 4))
+        self.assertEqual(r.length, 4)
+
+    def test_index_constraint(self):
+        # action
+        r = expressions.get_range("std_logic_vector(N-1 downto 0)", {"N": 8})
+        # assert
+        self.assertEqual(r, (7, "downto", 0))
+        self.assertEqual((r.low, r.high, r.length), (0, 7, 8))
+
+    def test_no_range(self):
+        # assert
+        self.assertIsNone(expressions.get_range("integer"))
+        self.assertIsNone(expressions.get_range("std_logic_vector"))
+        self.assertIsNone(expressions.get_range("natural range <>"))
+
+
+class TestResolver(unittest.TestCase):
+    def test_package(self):
+        # arrange
+        with open("tests/vhdl/constants.vhd", "r") as f:
+            constants = f.read()
+        resolver = Resolver()
+        # action
+        resolver.add_text(constants)
+        values = resolver.resolve_all()
+        # assert
+        self.assertEqual(values["constants.constans"], 1)
+        self.assertEqual(values["constants.elias"], 1)
+        self.assertEqual(values["constants.dominicus"], 12500)
+        self.assertEqual(list(resolver.errors), ["constants.state_selected"])
+
+    def test_packages(self):
+        # arrange
+        resolver = Resolver()
+        resolver.add_text(
+            """
+            package sizes is
+                constant WIDTH : natural := 2 * DEPTH;
+                constant DEPTH : natural := 16;
+            end package;
+            use work.sizes.all;
+            package regs is
+                constant TOP : natural := WIDTH - 1;
+                constant MASK : natural := 2**sizes.DEPTH - 1;
+                constant HALF : natural;
+            end package;
+            package body regs is
+                constant HALF : natural := TOP / 2;
+            end package body;
+            """
+        )
+        # action
+        values = resolver.resolve_all()
+        # assert
+        self.assertEqual(values["regs.top"], 31)
+        self.assertEqual(values["regs.mask"], 65535)
+        self.assertEqual(values["regs.half"], 15)
+        self.assertEqual(resolver.resolve("regs.HALF"), 15)
+        self.assertEqual(resolver.errors, {})
+
+    def test_entity(self):
+        # arrange
+        with open("tests/vhdl/module.vhd", "r") as f:
+            module = f.read()
+        resolver = Resolver()
+        # action
+        resolver.add_text(module)
+        # assert
+        self.assertEqual(resolver.resolve("N", "module"), 42)
+
+    def test_cycle(self):
+        # arrange
+        resolver = Resolver()
+        resolver.add("a", "b + 1")
+        resolver.add("b", "c")
+        resolver.add("c", "a")
+        resolver.add("d", "1")
+        # action
+        values = resolver.resolve_all()
+        # assert
+        self.assertEqual(values, {"d": 1})
+        self.assertEqual(sorted(resolver.errors), ["a", "b", "c"])
+        with self.assertRaises(EvaluationError):
+            resolver.resolve("b")
+
+    def test_dependents_of_errors(self):
+        # arrange
+        resolver = Resolver()
+        resolver.add("a", "undefined + 1")
+        resolver.add("b", "a * 2")
+        # action
+        values = resolver.resolve_all()
+        # assert
+        self.assertEqual(values, {})
+        self.assertIn("a", resolver.errors["b"])
+
+    def test_memoized(self):
+        # arrange
+        resolver = Resolver()
+        resolver.add("c0", 0)
+        for i in range(1, 5000):
+            resolver.add("c{}".format(i), "c{} + 1".format(i - 1))
+        # action
+        values = resolver.resolve_all()
+        # assert
+        self.assertEqual(values["c4999"], 4999)
+        resolver.add("c0", 1)
+        self.assertEqual(resolver.resolve("c4999"), 5000)
+
+    def test_replaced_error(self):
+        # arrange
+        resolver = Resolver()
+        resolver.add_records([("z", "bit", "(others => '0')")], "p")
+        resolver.add("y", "p.z")
+        resolver.resolve_all()
+        # action
+        resolver.add("z", "'0'", "p")
+        values = resolver.resolve_all()
+        # assert
+        self.assertEqual(resolver.errors, {})
+        self.assertEqual(values["y"], "0")
+
+    def test_many_errors(self):
+        # arrange
+        package = (
+            "package p{} is\n"
+            "  constant Z : bit_vector(7 downto 0) := (others => '0');\n"
+            "  constant W : natural := 8;\n"
+            "end package;\n"
+        )
+        text = "".join(package.format(i) for i in range(8000))
+        resolver = Resolver()
+        start = time.perf_counter()
+        # action
+        resolver.add_text(text)
+        values = resolver.resolve_all()
+        # assert
+        self.assertEqual(len(values), 8000)
+        self.assertEqual(len(resolver.errors), 8000)
+        # every unit used to rebuild all errors, which took about 20 s here
+        self.assertLess(time.perf_counter() - start, 5)
@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import unittest
+from regex_fun.hierarchy import Design
+
+PACKAGE = """
+package cfg is
+    constant BYTES : natural := 4;
+end package;
+"""
+LEAF = """
+entity leaf is
+    generic(W : natural := 8);
+    port(d : in std_logic_vector(W-1 downto 0); q : out std_logic);
+end leaf;
+architecture rtl of leaf is begin end rtl;
+architecture sim of leaf is begin end sim;
+"""
+TOP = """
+use work.cfg.all;
+entity top is
+    generic(N : natural := 2);
+    port(d : in std_logic_vector(BYTES*8-1 downto 0));
+end top;
+architecture rtl of top is
+begin
+    u0 : entity work.leaf(rtl) generic map (W => N * 4) port map (d, open);
+    u1 : leaf port map (d => open, q => open);
+    u2 : leaf generic map (8) port map (d => open, q => open);
+    u3 : missing port map (a => open);
+end rtl;
+"""
+
+
+class TestDesign(unittest.TestCase):
+    def setUp(self):
+        self.design = Design()
+        for text in (PACKAGE, LEAF, TOP):
+            self.design.add_text(text)
+
+    def test_elaborate(self):
+        # action
+        top = self.design.elaborate("TOP")
+        # assert
+        self.assertEqual(top.entity, "top")
+        self.assertEqual(top.architecture, "rtl")
+        self.assertEqual(dict(top.widths), {"d": 32})
+        self.assertEqual(
+            [label for label, _ in top.children], ["u0", "u1", "u2", "u3"]
+        )
+        u0 = top.children[0][1]
+        self.assertEqual(u0.architecture, "rtl")
+        self.assertEqual(dict(u0.generics), {"w": 8})
+        self.assertEqual(list(u0.widths.values()), [8, 1])
+        self.assertIsNone(top.children[3][1])
+        self.assertEqual(list(self.design.errors), ["top/u3"])
+
+    def test_default_architecture(self):
+        # action
+        top = self.design.elaborate("top")
+        # assert
+        self.assertEqual(top.children[1][1].architecture, "sim")
+
+    def test_shared_nodes(self):
+        # action
+        top = self.design.elaborate("top")
+        # assert
+        self.assertIs(top.children[1][1], top.children[2][1])
+        self.assertIsNot(top.children[0][1], top.children[1][1])
+        self.assertEqual(top.count(), 4)
+
+    def test_generics(self):
+        # action
+        top = self.design.elaborate("top", {"n": 4})
+        # assert
+        self.assertEqual(top.children[0][1].widths["d"], 16)
+
+    def test_walk(self):
+        # action
+        paths = [path for path, _ in self.design.elaborate("top").walk()]
+        # assert
+        self.assertEqual(paths, ["top", "top/u0", "top/u1", "top/u2"])
+
+    def test_recursion(self):
+        # arrange
+        self.design.add_text(
+            """
+            entity again is end again;
+            architecture rtl of again is begin u : entity work.again; end;
+            """
+        )
+        # action
+        node = self.design.elaborate("again")
+        # assert
+        self.assertIsNone(node.children[0][1])
+        self.assertIn("recursive", self.design.errors["again/u"])
+
+    def test_unknown_top(self):
+        # assert
+        with self.assertRaises(KeyError):
+            self.design.elaborate("nothing")
+
+
+class TestScan(unittest.TestCase):
+    def test_scan(self):
+        # arrange
+        root = tempfile.mkdtemp()
+        for name, text in (("cfg.vhd", PACKAGE), ("top.vhd", TOP)):
+            with open(os.path.join(root, name), "w") as f:
+                f.write(text)
+        with open(os.path.join(root, "leaf.vhd"), "w") as f:
+            f.write(LEAF)
+        # action
+        design = Design.scan(root, workers=1)
+        shutil.rmtree(root)
+        # assert
+        self.assertEqual(sorted(design.entities), ["leaf", "top"])
+        self.assertEqual(design.elaborate("top").count(), 4)
+
+    def test_undecodable_bytes(self):
+        # arrange
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        with open(os.path.join(root, "latin1.vhd"), "wb") as f:
+            f.write(b"-- caf\xe9\n" + LEAF.encode())
+        # action
+        design = Design.scan(root, workers=1)
+        # assert
+        self.assertEqual(design.errors, {})
+        self.assertEqual(design.entities, ["leaf"])
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from regex_fun import batch, index
+from regex_fun.index import DesignIndex
+from regex_fun.records import Port
+
+
+class TestDesignIndex(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.module = os.path.join(self.root, "module.vhd")
+        self.constants = os.path.join(self.root, "constants.vhd")
+        shutil.copy("tests/vhdl/module.vhd", self.module)
+        shutil.copy("tests/vhdl/constants.vhd", self.constants)
+        self.index = DesignIndex(os.path.join(self.root, "index.db"))
+        self.stats = self.index.update(self.root)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.root)
+
+    def test_cold_scan(self):
+        # action
+        records = list(self.index.records())
+        # assert
+        self.assertEqual(self.stats["added"], 2)
+        self.assertEqual(records, list(batch.scan_project(self.root, 1)))
+
+    def test_warm_scan(self):
+        # action
+        stats = self.index.update(self.root)
+        # assert
+        self.assertEqual(stats["unchanged"], 2)
+        self.assertEqual(stats["added"] + stats["changed"], 0)
+
+    def test_changed_file(self):
+        # arrange
+        with open(self.module, "a") as f:
+            f.write("\nentity other is port(x : in bit); end other;\n")
+        os.utime(self.module, ns=(1, 1))
+        # action
+        stats = self.index.update(self.root)
+        # assert
+        self.assertEqual(stats["changed"], 1)
+        self.assertEqual(stats["unchanged"], 1)
+
+    def test_touched_file(self):
+        # arrange
+        os.utime(self.module, ns=(1, 1))
+        # action
+        stats = self.index.update(self.root)
+        again = self.index.update(self.root)
+        # assert
+        self.assertEqual((stats["touched"], stats["changed"]), (1, 0))
+        self.assertEqual(again["unchanged"], 2)
+
+    def test_removed_file(self):
+        # arrange
+        os.remove(self.constants)
+        # action
+        stats = self.index.update(self.root)
+        # assert
+        self.assertEqual(stats["removed"], 1)
+        self.assertIsNone(self.index.get(self.constants))
+        self.assertEqual(self.index.paths(), [self.module])
+
+    def test_vanished_file(self):
+        # arrange
+        os.remove(self.constants)
+        found = [self.module, self.constants]
+        # action
+        with mock.patch.object(index, "find_files", return_value=found):
+            stats = self.index.update(self.root)
+        # assert
+        self.assertEqual(stats["removed"], 1)
+        self.assertEqual(self.index.paths(), [self.module])
+
+    def test_records(self):
+        # action
+        record = self.index.get(self.module)
+        # assert
+        self.assertIsInstance(record.ports[0], Port)
+        self.assertEqual(record.ports[0].direction, "in")
+
+    def test_persistent(self):
+        # arrange
+        self.index.close()
+        # action
+        self.index = DesignIndex(os.path.join(self.root, "index.db"))
+        record = self.index.get(self.module)
+        # assert
+        self.assertEqual(len(record.ports), 6)
+        self.assertIsNone(record.constants)
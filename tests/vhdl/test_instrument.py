@@ -0,0 +1,96 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from regex_fun import instrument, vhdl
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        with open("tests/vhdl/module.vhd", "r") as f:
+            # a fresh input, not parsed and memoized by other tests
+            self.module = f.read() + "\n-- profiled\n"
+        self.profiler = instrument.enable_profiling()
+
+    def tearDown(self):
+        instrument.disable_profiling()
+
+    def test_phases(self):
+        # action
+        with self.profiler.file("module.vhd"):
+            result = vhdl.parse_vhdl(self.module)
+            result.ports
+            result.entity
+        phases = self.profiler.phases()
+        # assert
+        self.assertEqual(list(phases), ["tokenize", "entity", "ports"])
+        self.assertEqual(phases["tokenize"].calls, 1)
+        self.assertEqual(phases["ports"].size, len(self.module))
+        self.assertEqual(phases["ports"].matches, 6)
+        self.assertEqual(self.profiler.files, ["module.vhd"])
+
+    def test_disabled(self):
+        # arrange
+        instrument.disable_profiling()
+        # action
+        vhdl.parse_vhdl(self.module + " ").constants
+        # assert
+        self.assertEqual(self.profiler.files, [])
+
+    def test_files(self):
+        # action
+        for name in ("a", "b"):
+            with self.profiler.file(name):
+                vhdl._parse(self.module).generics
+        totals = self.profiler.totals()
+        # assert
+        self.assertEqual(list(totals), ["a", "b"])
+        self.assertEqual(totals["a"].size, len(self.module))
+        self.assertEqual(self.profiler.phases("b")["generics"].calls, 1)
+        self.assertEqual(self.profiler.phases()["generics"].calls, 2)
+
+    def test_outliers(self):
+        # arrange
+        for i in range(5):
+            with self.profiler.file(str(i)):
+                self.profiler.record("tokenize", 0.001, 1000, [])
+        with self.profiler.file("slow"):
+            self.profiler.record("tokenize", 0.1, 1000, [])
+        # action
+        outliers = self.profiler.outliers()
+        # assert
+        self.assertEqual([o.file for o in outliers], ["slow"])
+        self.assertAlmostEqual(outliers[0].ratio, 100)
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_profile_files(self):
+        # arrange
+        paths = ["tests/vhdl/module.vhd", "tests/vhdl/constants.vhd"]
+        path = os.path.join(self.root, "stats")
+        # action
+        profiler = instrument.profile_files(paths)
+        profiler.export(path + ".json")
+        profiler.export(path + ".csv", "csv")
+        # assert
+        self.assertIsNone(vhdl._profiler)
+        with open(path + ".json") as f:
+            stats = json.load(f)
+        self.assertEqual([f["file"] for f in stats["files"]], paths)
+        self.assertEqual(stats["phases"]["constants"]["calls"], 2)
+        with open(path + ".csv") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0][:2], ["file", "phase"])
+        self.assertEqual(rows[1][:2], [paths[0], "tokenize"])
+
+
+if __name__ == "__main__":
+    unittest.main()
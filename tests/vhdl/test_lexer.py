@@ -0,0 +1,197 @@
+import unittest
+from regex_fun import lexer
+
+
+def kinds_and_values(text, comments=True):
+    return [(t.kind, t.value) for t in lexer.tokenize(text, comments)]
+
+
+class TestLexer(unittest.TestCase):
+    def setUp(self):
+        with open("tests/vhdl/module.vhd", "r") as f:
+            self.module = f.read()
+
+    def test_tokens(self):
+        # action
+        tokens = kinds_and_values("constant A : integer := 2**17; -- max")
+        expected = [
+            (lexer.KEYWORD, "constant"),
+            (lexer.IDENTIFIER, "A"),
+            (lexer.DELIMITER, ":"),
+            (lexer.IDENTIFIER, "integer"),
+            (lexer.DELIMITER, ":="),
+            (lexer.NUMBER, "2"),
+            (lexer.DELIMITER, "**"),
+            (lexer.NUMBER, "17"),
+            (lexer.DELIMITER, ";"),
+            (lexer.COMMENT, "-- max"),
+        ]
+        # assert
+        self.assertEqual(tokens, expected)
+
+    def test_literals(self):
+        # action
+        tokens = kinds_and_values("x\"00ff\" \"a--b\" '0' 16#FF# 1.5e3")
+        expected = [
+            (lexer.BIT_STRING, 'x"00ff"'),
+            (lexer.STRING, '"a--b"'),
+            (lexer.CHARACTER, "'0'"),
+            (lexer.NUMBER, "16#FF#"),
+            (lexer.NUMBER, "1.5e3"),
+        ]
+        # assert
+        self.assertEqual(tokens, expected)
+
+    def test_attribute_tick(self):
+        # action
+        tokens = kinds_and_values("std_logic'('1')")
+        expected = [
+            (lexer.IDENTIFIER, "std_logic"),
+            (lexer.DELIMITER, "'"),
+            (lexer.DELIMITER, "("),
+            (lexer.CHARACTER, "'1'"),
+            (lexer.DELIMITER, ")"),
+        ]
+        # assert
+        self.assertEqual(tokens, expected)
+
+    def test_attribute_tick_after_comment(self):
+        # action
+        tokens = kinds_and_values("std_logic -- c\n'('1')")
+        expected = [
+            (lexer.IDENTIFIER, "std_logic"),
+            (lexer.COMMENT, "-- c"),
+            (lexer.DELIMITER, "'"),
+            (lexer.DELIMITER, "("),
+            (lexer.CHARACTER, "'1'"),
+            (lexer.DELIMITER, ")"),
+        ]
+        # assert
+        self.assertEqual(tokens, expected)
+
+    def test_keywords_ignore_case(self):
+        # action
+        tokens = kinds_and_values("ENTITY Entity entity")
+        # assert
+        self.assertEqual({kind for kind, _ in tokens}, {lexer.KEYWORD})
+
+    def test_no_comments(self):
+        # action
+        tokens = kinds_and_values("a -- b\nc", comments=False)
+        # assert
+        self.assertEqual(
+            tokens, [(lexer.IDENTIFIER, "a"), (lexer.IDENTIFIER, "c")]
+        )
+
+    def test_offsets(self):
+        # action
+        tokens = list(lexer.tokenize(self.module))
+        # assert
+        for t in tokens:
+            self.assertEqual(self.module[t.start : t.end], t.value)
+
+    def test_normalize(self):
+        # action
+        normalized = lexer.normalize("end  module; -- comment\n\tfoo")
+        # assert
+        self.assertEqual(normalized, "end module; foo")
+
+    def test_block_comments(self):
+        # action
+        tokens = kinds_and_values("a /* b\n -- c */ d -- /* e")
+        expected = [
+            (lexer.IDENTIFIER, "a"),
+            (lexer.COMMENT, "/* b\n -- c */"),
+            (lexer.IDENTIFIER, "d"),
+            (lexer.COMMENT, "-- /* e"),
+        ]
+        # assert
+        self.assertEqual(tokens, expected)
+
+    def test_unterminated_block_comment(self):
+        # action
+        tokens = kinds_and_values("a /* b * / c", comments=False)
+        # assert
+        self.assertEqual(tokens, [(lexer.IDENTIFIER, "a")])
+
+    def test_normalize_literals(self):
+        # arrange
+        text = "x <= \"a--b\" & '-' & f(a)'length; -- c\ny/*d*/z -- e"
+        # action
+        normalized = lexer.normalize(text)
+        # assert
+        self.assertEqual(
+            normalized, "x <= \"a--b\" & '-' & f(a)'length; y z"
+        )
+        self.assertEqual(
+            normalized, lexer.render(list(lexer.tokenize(text, False)))
+        )
+        self.assertEqual(lexer.normalize(text.encode()), normalized.encode())
+        self.assertEqual(
+            lexer.normalize(memoryview(text.encode())), normalized.encode()
+        )
+
+    def test_strip_comments(self):
+        # arrange
+        text = "a <= \"--\"; -- b\nc/*d*/e /* f\n\n */ g -- h"
+        # action
+        stripped = lexer.strip_comments(text)
+        # assert
+        self.assertEqual(stripped, "a <= \"--\"; \nc e \n\n g ")
+        self.assertEqual(
+            lexer.strip_comments(text.encode()), stripped.encode()
+        )
+
+    def test_start_offset(self):
+        # action
+        tokens = list(lexer.tokenize("a b", pos=1))
+        # assert
+        self.assertEqual(tokens, [lexer.Token(lexer.IDENTIFIER, "b", 2, 3)])
+
+    def test_no_input(self):
+        # action
+        tokens = list(lexer.tokenize(""))
+        # assert
+        self.assertEqual(tokens, [])
+
+    def test_buffer(self):
+        # arrange
+        data = "x <= caf\xe9'length; -- \xe9t\xe9".encode("utf-8")
+        # action
+        tokens = list(lexer.tokenize_buffer(data))
+        in_place = list(lexer.tokenize_buffer(memoryview(data)))
+        # assert
+        self.assertEqual(tokens, in_place)
+        self.assertEqual(
+            [(t.kind, t.value) for t in tokens],
+            [
+                (lexer.IDENTIFIER, "x"),
+                (lexer.DELIMITER, "<="),
+                (lexer.IDENTIFIER, "caf\xe9"),
+                (lexer.DELIMITER, "'"),
+                (lexer.IDENTIFIER, "length"),
+                (lexer.DELIMITER, ";"),
+                (lexer.COMMENT, "-- \xe9t\xe9"),
+            ],
+        )
+        self.assertEqual((tokens[2].start, tokens[2].end), (5, 10))
+
+
+class TestSpans(unittest.TestCase):
+    def test_line_index(self):
+        # arrange
+        lines = lexer.LineIndex("ab\ncd\n")
+        # action
+        positions = [lines.position(offset) for offset in (0, 2, 3, 4)]
+        # assert
+        self.assertEqual(positions, [(1, 1), (1, 3), (2, 1), (2, 2)])
+
+    def test_span_text(self):
+        # arrange
+        span = lexer.LineIndex(b"ab\ncd").span(3, 5)
+        # action
+        view = span.view(b"ab\ncd")
+        # assert
+        self.assertEqual(span.line, 2)
+        self.assertEqual(bytes(view), b"cd")
+        self.assertEqual(span.text("ab\ncd"), "cd")
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+from regex_fun.query import QueryIndex
+
+OTHER = """
+use work.constants.all;
+entity other is
+    generic(W : integer := Natalia);
+    port(io : inout std_logic; s : out state_type);
+end other;
+"""
+
+
+class TestQueryIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = QueryIndex()
+        self.index.add_file("tests/vhdl/module.vhd")
+        self.index.add_file("tests/vhdl/constants.vhd")
+        self.index.add("other.vhd", OTHER)
+
+    def test_entities(self):
+        # assert
+        self.assertEqual(
+            self.index.entities("MODULE"), ["tests/vhdl/module.vhd"]
+        )
+        self.assertEqual(self.index.entities("nothing"), [])
+
+    def test_ports(self):
+        # action
+        matches = self.index.ports(direction="inout")
+        # assert
+        self.assertEqual(
+            [(m.entity, m.record.name) for m in matches],
+            [("module", "reset"), ("other", "io")],
+        )
+
+    def test_combined_keys(self):
+        # action
+        matches = self.index.ports(direction="out", type_="std_logic_vector")
+        # assert
+        self.assertEqual([m.record.name for m in matches], ["p1", "p2"])
+        self.assertEqual(self.index.ports(name="clk", direction="out"), [])
+
+    def test_types(self):
+        # action
+        matches = self.index.types("state_type")
+        # assert
+        self.assertEqual(
+            [(m.kind, m.record.name) for m in matches],
+            [("constant", "state_selected"), ("port", "s")],
+        )
+
+    def test_constants(self):
+        # action
+        matches = self.index.constants(name="natalia")
+        # assert
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].record.value, "32")
+
+    def test_references(self):
+        # action
+        references = self.index.references("Natalia")
+        # assert
+        self.assertEqual(len(references), 1)
+        path, span = references[0]
+        self.assertEqual((path, span.line), ("other.vhd", 4))
+        self.assertEqual(span.text(OTHER), "Natalia")
+
+    def test_remove(self):
+        # action
+        self.index.remove("other.vhd")
+        # assert
+        self.assertNotIn("other.vhd", self.index)
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.references("natalia"), [])
+        self.assertEqual(len(self.index.ports(direction="inout")), 1)
+
+    def test_undecodable_bytes(self):
+        # arrange
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        path = os.path.join(root, "latin1.vhd")
+        data = b"-- caf\xe9\n" + OTHER.encode()
+        with open(path, "wb") as f:
+            f.write(data)
+        # action
+        self.index.add_file(path)
+        # assert
+        self.assertEqual(self.index.entities("other"), ["other.vhd", path])
+        path, span = self.index.references("Natalia")[1]
+        self.assertEqual(span.text(data), b"Natalia")
+
+    def test_replace(self):
+        # action
+        self.index.add("other.vhd", OTHER.replace("inout", "in"))
+        # assert
+        self.assertEqual(len(self.index.ports(direction="inout")), 1)
+        self.assertEqual(len(self.index.ports(name="io")), 1)
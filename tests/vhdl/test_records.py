@@ -0,0 +1,66 @@
+import unittest
+from regex_fun import vhdl
+from regex_fun.records import Port, Constant, Table
+
+
+class TestRecords(unittest.TestCase):
+    def setUp(self):
+        with open("tests/vhdl/module.vhd", "r") as f:
+            self.module = f.read()
+        with open("tests/vhdl/constants.vhd", "r") as f:
+            self.constants = f.read()
+
+    def test_tuple_compatible(self):
+        # action
+        port = vhdl.get_ports(self.module)[0]
+        # assert
+        self.assertIsInstance(port, Port)
+        self.assertEqual(port, ("clk", "in", "std_logic"))
+        self.assertEqual(port.direction, "in")
+        self.assertFalse(hasattr(port, "__dict__"))
+
+    def test_interned_types(self):
+        # action
+        ports = vhdl.get_ports(self.module)
+        # assert
+        self.assertIs(ports[0].type, ports[3].type)
+        self.assertIs(ports[4].type, ports[5].type)
+
+    def test_table(self):
+        # arrange
+        result = vhdl.parse_vhdl(self.constants)
+        # action
+        table = result.table("constants")
+        # assert
+        self.assertEqual(list(table), result.constants)
+        self.assertEqual(table[7], result.constants[7])
+        self.assertEqual(len(table.column("type")), len(table))
+        self.assertLess(len(table.strings), 3 * len(table))
+
+    def test_table_offsets(self):
+        # arrange
+        result = vhdl.parse_vhdl(self.module)
+        # action
+        table = result.table("ports")
+        start, end = table.span(3)
+        # assert
+        self.assertEqual(self.module[start:end], "reset")
+
+    def test_shared_strings(self):
+        # arrange
+        first = Table(Constant)
+        first.append(("A", "integer", "1"))
+        # action
+        second = Table(Constant, first)
+        second.append(("B", "integer", None))
+        # assert
+        self.assertIs(first.strings, second.strings)
+        self.assertEqual(list(second), [("B", "integer", None)])
+        self.assertEqual(len(first.strings), 5)
+
+    def test_unknown_section(self):
+        # arrange
+        result = vhdl.parse_vhdl(self.module)
+        # assert
+        with self.assertRaises(ValueError):
+            result.table("signals")
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import unittest
+from regex_fun import batch, serialize
+from regex_fun.batch import FileRecord
+from regex_fun.records import Generic
+
+
+class TestSerialize(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            batch.parse_file("tests/vhdl/module.vhd"),
+            batch.parse_file("tests/vhdl/constants.vhd"),
+            FileRecord("broken.vhd", None, None, None, None, ["a", "b"]),
+            FileRecord(
+                "ümlaut.vhd", "e", [Generic("g", "natural", None)], [], [], []
+            ),
+        ]
+
+    def test_round_trip(self):
+        # action
+        store = serialize.loads(serialize.dumps(self.records))
+        # assert
+        self.assertEqual(len(store), 4)
+        self.assertEqual(list(store), self.records)
+        self.assertEqual(store[-1], self.records[-1])
+
+    def test_strings_stored_once(self):
+        # arrange
+        twice = self.records + [
+            r._replace(path=r.path + ".copy") for r in self.records
+        ]
+        # action
+        once = serialize.dumps(self.records)
+        data = serialize.dumps(twice)
+        # assert
+        self.assertLess(len(data), 1.5 * len(once))
+
+    def test_get(self):
+        # action
+        store = serialize.loads(serialize.dumps(self.records))
+        # assert
+        self.assertEqual(store.get("broken.vhd"), self.records[2])
+        self.assertIsNone(store.get("missing.vhd"))
+        self.assertEqual(store.paths(), [r.path for r in self.records])
+
+    def test_index_error(self):
+        # arrange
+        store = serialize.loads(serialize.dumps(self.records))
+        # assert
+        with self.assertRaises(IndexError):
+            store[4]
+
+    def test_invalid(self):
+        # arrange
+        data = serialize.dumps(self.records)
+        # assert
+        with self.assertRaises(ValueError):
+            serialize.loads(b"XXXX" + data[4:])
+        with self.assertRaises(ValueError):
+            serialize.loads(data[:4] + b"\x63" + data[5:])
+        with self.assertRaises(ValueError):
+            serialize.loads(data[:-16])
+
+
+class TestMemoryMapped(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "design.rgx")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_load(self):
+        # arrange
+        records = list(batch.scan_project("tests/vhdl", 1))
+        serialize.dump(records, self.path)
+        # action
+        with serialize.load(self.path) as store:
+            loaded = list(store)
+        # assert
+        self.assertEqual(loaded, records)
+
+    def test_empty_file(self):
+        # arrange
+        open(self.path, "wb").close()
+        # assert
+        with self.assertRaises(ValueError):
+            serialize.load(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
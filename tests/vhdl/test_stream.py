@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from regex_fun import stream, vhdl
+
+
+class TestStream(unittest.TestCase):
+    def setUp(self):
+        with open("tests/vhdl/module.vhd", "r") as f:
+            self.module = f.read()
+        with open("tests/vhdl/constants.vhd", "r") as f:
+            self.constants = f.read()
+
+    def test_constants(self):
+        # action
+        constants = list(stream.iter_constants("tests/vhdl/constants.vhd"))
+        # assert
+        self.assertEqual(constants, vhdl.get_constants(self.constants))
+
+    def test_generics(self):
+        # action
+        generics = list(stream.iter_generics("tests/vhdl/module.vhd"))
+        # assert
+        self.assertEqual(generics, vhdl.get_generics(self.module))
+
+    def test_ports(self):
+        # action
+        ports = list(stream.iter_ports("tests/vhdl/module.vhd"))
+        # assert
+        self.assertEqual(ports, vhdl.get_ports(self.module))
+
+    def test_stop_early(self):
+        # action
+        constants = stream.iter_constants("tests/vhdl/constants.vhd")
+        first = next(constants)
+        constants.close()
+        # assert
+        self.assertEqual(first, ("A", "integer range 0 to 2000", "1000"))
+
+    def test_small_chunks(self):
+        # action
+        tokens = list(stream.iter_tokens("tests/vhdl/module.vhd", 1))
+        # assert
+        self.assertEqual(tokens[-1].value, ";")
+
+    def test_empty_file(self):
+        # arrange
+        fd, path = tempfile.mkstemp(suffix=".vhd")
+        os.close(fd)
+        # action
+        ports = list(stream.iter_ports(path))
+        os.remove(path)
+        # assert
+        self.assertEqual(ports, [])
@@ -0,0 +1,123 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from regex_fun import templates, vhdl
+
+ENTITY = """entity counter is
+  generic (WIDTH : natural := 8);
+  port (clk : in std_logic; q : out unsigned(WIDTH-1 downto 0));
+end counter;
+"""
+
+
+class TestTemplates(unittest.TestCase):
+    def setUp(self):
+        self.entity = next(vhdl.iter_entities(ENTITY))
+
+    def test_component(self):
+        # action
+        text = templates.component(self.entity)
+        expected = (
+            "component counter is\n"
+            "  generic (\n"
+            "    WIDTH : natural := 8\n"
+            "  );\n"
+            "  port (\n"
+            "    clk   : in std_logic;\n"
+            "    q     : out unsigned(WIDTH-1 downto 0)\n"
+            "  );\n"
+            "end component counter;\n"
+        )
+        # assert
+        self.assertEqual(text, expected)
+
+    def test_instantiation(self):
+        # action
+        text = templates.instantiation(self.entity, "u0", "lib")
+        expected = (
+            "u0 : entity lib.counter\n"
+            "  generic map (\n"
+            "    WIDTH => WIDTH\n"
+            "  )\n"
+            "  port map (\n"
+            "    clk   => clk,\n"
+            "    q     => q\n"
+            "  );\n"
+        )
+        # assert
+        self.assertEqual(text, expected)
+
+    def test_no_interface(self):
+        # arrange
+        entity = next(vhdl.iter_entities("entity e is end e;"))
+        # action
+        text = templates.instantiation(entity)
+        # assert
+        self.assertEqual(text, "u_e : entity work.e;\n")
+
+    def test_testbench(self):
+        # action
+        text = templates.testbench(self.entity)
+        units = list(vhdl.iter_design_units(text))
+        # assert
+        self.assertEqual([u.name for u in units], ["counter_tb", "sim"])
+        self.assertIn("  constant WIDTH : natural := 8;\n", text)
+        self.assertIn("  signal q   : unsigned(WIDTH-1 downto 0);\n", text)
+        self.assertIn("  dut : entity work.counter\n", text)
+
+    def test_generate(self):
+        # arrange
+        entities = [self.entity, self.entity._replace(name="other")]
+        out = io.StringIO()
+        # action
+        written = templates.write(templates.generate(entities), out)
+        # assert
+        self.assertEqual(written, len(out.getvalue()))
+        self.assertEqual(out.getvalue().count("end component"), 2)
+        self.assertIn("end component other;", out.getvalue())
+
+    def test_unknown_kind(self):
+        # assert
+        with self.assertRaises(ValueError):
+            list(templates.generate([self.entity], ["package"]))
+
+
+class TestGenerateFiles(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "counter.vhd")
+        with open(self.path, "w") as f:
+            f.write(ENTITY + ENTITY.replace("counter", "timer"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_generate_files(self):
+        # arrange
+        missing = os.path.join(self.root, "missing.vhd")
+        output = os.path.join(self.root, "out.vhd")
+        # action
+        chunks = templates.generate_files(
+            [self.path, missing], ["component"], workers=1
+        )
+        templates.write(chunks, output)
+        # assert
+        with open(output) as f:
+            text = f.read()
+        units = [line for line in text.splitlines() if "component" in line]
+        self.assertEqual(
+            units,
+            [
+                "component counter is",
+                "end component counter;",
+                "component timer is",
+                "end component timer;",
+            ],
+        )
+        self.assertIn("-- " + missing, text)
+
+
+if __name__ == "__main__":
+    unittest.main()
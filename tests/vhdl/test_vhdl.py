@@ -1,5 +1,7 @@
+import time
 import unittest
 import re
+from unittest import mock
 from regex_fun import vhdl
 
 
@@ -58,6 +60,100 @@ class TestVHDLmodule(unittest.TestCase):
         smoke = "architecture behavioral of module is" in architecture
         self.assertTrue(smoke)
 
+    def test_parse_vhdl(self):
+        # action
+        result = vhdl.parse_vhdl(self.module)
+        # assert
+        self.assertEqual(result.entity, vhdl.get_entity(self.module))
+        self.assertEqual(result.generics, vhdl.get_generics(self.module))
+        self.assertEqual(result.ports, vhdl.get_ports(self.module))
+        self.assertEqual(
+            result.architecture, vhdl.get_architecture(self.module)
+        )
+        self.assertIsNone(result.constants)
+
+    def test_parse_vhdl_normalizes_once(self):
+        # action
+        first = vhdl.parse_vhdl(self.module)
+        second = vhdl.parse_vhdl(self.module)
+        # assert
+        self.assertIs(first, second)
+
+    def test_get_functions_tokenize_once(self):
+        # arrange
+        text = self.module + "\n-- not memoized by other tests\n"
+        with mock.patch.object(vhdl, "_tokens", wraps=vhdl._tokens) as tokens:
+            # action
+            vhdl.get_entity(text)
+            vhdl.get_generics(text)
+            vhdl.get_ports(text)
+            vhdl.get_architecture(text)
+            vhdl.get_constants(text)
+        # assert
+        self.assertEqual(tokens.call_count, 1)
+
+    def test_results_not_shared(self):
+        # action
+        ports = vhdl.get_ports(self.module)
+        ports.clear()
+        # assert
+        self.assertEqual(len(vhdl.get_ports(self.module)), 6)
+
+    def test_multiple_units(self):
+        # arrange
+        text = self.module + "\nentity other is end entity;\n"
+        # action
+        entity = vhdl.get_entity(text)
+        architecture = vhdl.get_architecture(text)
+        # assert
+        self.assertTrue(entity.startswith("entity module is"))
+        self.assertTrue(architecture.endswith("end behavioral;"))
+
+    def test_spans(self):
+        # arrange
+        result = vhdl.parse_vhdl(self.module)
+        # action
+        entity = result.span("entity")
+        ports = result.spans("ports")
+        # assert
+        self.assertEqual((entity.line, entity.column), (4, 1))
+        self.assertTrue(entity.text(self.module).startswith("entity module"))
+        self.assertTrue(entity.text(self.module).endswith("end  module;"))
+        self.assertEqual(len(ports), 6)
+        self.assertEqual((ports[3].line, ports[3].column), (8, 8))
+        self.assertEqual(ports[3].text(self.module), "reset")
+
+    def test_bytes(self):
+        # arrange
+        data = self.module.encode("utf-8")
+        # action
+        result = vhdl.parse_vhdl(data)
+        # assert
+        self.assertEqual(
+            result.as_dict(), vhdl.parse_vhdl(self.module).as_dict()
+        )
+        self.assertEqual(vhdl.get_ports(data), vhdl.get_ports(self.module))
+        self.assertEqual(result.spans("ports")[3].text(data), b"reset")
+
+    def test_bytes_not_decoded(self):
+        # arrange
+        data = b"-- \xe9t\xe9\nentity e is generic(s : string := \"\xff\");"
+        data += b" end e;"
+        # action
+        generics = vhdl.get_generics(data)
+        # assert
+        self.assertEqual(generics, [("s", "string", '"\ufffd"')])
+
+    def test_bytes_non_ascii_identifiers(self):
+        # arrange
+        text = "entity caf\xe9 is port(d\xe9bit : in std_logic); end;"
+        # action
+        utf8 = vhdl.parse_vhdl(text.encode("utf-8"))
+        latin1 = vhdl.parse_vhdl(text.encode("latin-1"))
+        # assert
+        self.assertEqual(utf8.as_dict(), vhdl.parse_vhdl(text).as_dict())
+        self.assertEqual(latin1.ports, [("d\ufffdbit", "in", "std_logic")])
+
     def test_no_entity(self):
         # arrange
         nothing = ""
@@ -82,6 +178,18 @@ class TestVHDLmodule(unittest.TestCase):
         # assert
         self.assertIsNone(ports)
 
+    def test_unclosed_clauses(self):
+        # arrange
+        text = "entity e is " + "port ( " * 20000 + " end e;"
+        start = time.perf_counter()
+        # action
+        ports = vhdl.get_ports(text)
+        # assert
+        self.assertIsNone(ports)
+        # each clause used to be searched for its closing parenthesis up to
+        # the end of the input, which took minutes here
+        self.assertLess(time.perf_counter() - start, 5)
+
     def test_no_architecture(self):
         # arrange
         nothing = ""
@@ -119,6 +227,14 @@ class TestVHDLpackage(unittest.TestCase):
         # assert
         self.assertEqual(constants, expected)
 
+    def test_literal_with_dashes(self):
+        # arrange
+        text = 'constant S : string := "a--b";'
+        # action
+        constants = vhdl.get_constants(text)
+        # assert
+        self.assertEqual(constants, [("S", "string", '"a--b"')])
+
     def test_no_input(self):
         # arrange
         nothing = ""
@@ -126,3 +242,91 @@ class TestVHDLpackage(unittest.TestCase):
         constants = vhdl.get_constants(nothing)
         # assert
         self.assertIsNone(constants)
+
+
+class TestVHDLdesignUnits(unittest.TestCase):
+    def setUp(self):
+        with open("tests/vhdl/module.vhd", "r") as f:
+            module = f.read()
+        with open("tests/vhdl/constants.vhd", "r") as f:
+            constants = f.read()
+        self.text = (
+            module
+            + constants
+            + """
+            package body constants is end package body constants;
+            entity other is port(x : out bit); end other;
+            entity lonely is end lonely;
+            architecture rtl of OTHER is begin end rtl;
+            """
+        )
+        self.module = module
+
+    def test_design_units(self):
+        # action
+        units = [
+            (u.kind, u.name, u.of) for u in vhdl.iter_design_units(self.text)
+        ]
+        expected = [
+            ("entity", "module", None),
+            ("architecture", "behavioral", "module"),
+            ("package", "constants", None),
+            ("package body", "constants", None),
+            ("entity", "other", None),
+            ("entity", "lonely", None),
+            ("architecture", "rtl", "OTHER"),
+        ]
+        # assert
+        self.assertEqual(units, expected)
+
+    def test_entities(self):
+        # action
+        entities = list(vhdl.iter_entities(self.text))
+        # assert
+        self.assertEqual(
+            [e.name for e in entities], ["module", "other", "lonely"]
+        )
+        self.assertEqual(entities[0].text, vhdl.get_entity(self.module))
+        self.assertEqual(entities[0].ports, vhdl.get_ports(self.module))
+        self.assertEqual(entities[1].ports, [("x", "out", "bit")])
+        architecture = entities[1].architecture
+        self.assertTrue(architecture.startswith("architecture rtl"))
+        self.assertIsNone(entities[2].architecture)
+
+    def test_stop_early(self):
+        # arrange
+        text = self.module + "entity broken is port(" + "a : in bit; " * 1000
+        # action
+        first = next(vhdl.iter_entities(text))
+        # assert
+        self.assertEqual(first.name, "module")
+
+    def test_unit_sections(self):
+        # action
+        units = list(vhdl.iter_design_units(self.text))
+        # assert
+        self.assertEqual(units[0].ports, vhdl.get_ports(self.module))
+        self.assertEqual(units[0].generics, vhdl.get_generics(self.module))
+        self.assertEqual(len(units[2].constants), 15)
+        self.assertIsNone(units[2].ports)
+        self.assertIsNone(units[1].generics)
+
+    def test_split_units(self):
+        # arrange
+        tokens = vhdl.parse_vhdl(self.text).tokens
+        # action
+        units = list(vhdl.split_units(tokens))
+        # assert
+        self.assertEqual(
+            [(u.kind, u.name, u.start, u.end) for u in units],
+            [
+                (u.kind, u.name, u.start, u.end)
+                for u in vhdl.iter_design_units(self.text)
+            ],
+        )
+
+    def test_unfinished_header(self):
+        # action
+        units = list(vhdl.iter_design_units("architecture rtl of"))
+        # assert
+        self.assertEqual(units, [])
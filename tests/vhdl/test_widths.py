@@ -0,0 +1,102 @@
+import unittest
+from regex_fun.records import Generic, Port
+from regex_fun.widths import PortWidths
+
+PORTS = [
+    Port("clk", "in", "std_logic"),
+    Port("data", "in", "std_logic_vector(WIDTH-1 downto 0)"),
+    Port("addr", "out", "unsigned(0 to 2**ADDR_BITS - 1)"),
+    Port("count", "out", "integer range -8 to DEPTH"),
+    Port("mask", "out", "std_logic_vector(WIDTH/8 - 1 downto 0)"),
+    Port("bus_o", "out", "bus_record"),
+]
+GENERICS = [
+    Generic("WIDTH", "natural", "32"),
+    Generic("ADDR_BITS", "natural", None),
+    Generic("DEPTH", "natural", "2 * WIDTH"),
+]
+
+
+class TestPortWidths(unittest.TestCase):
+    def test_defaults(self):
+        # arrange
+        widths = PortWidths(PORTS, GENERICS)
+        # action
+        result = widths.widths()
+        # assert
+        self.assertEqual(
+            list(result.items()),
+            [
+                ("clk", 1),
+                ("data", 32),
+                ("addr", None),
+                ("count", 8),
+                ("mask", 4),
+                ("bus_o", None),
+            ],
+        )
+
+    def test_overrides(self):
+        # arrange
+        widths = PortWidths(PORTS, GENERICS)
+        # action
+        result = widths.widths({"width": 8, "Addr_Bits": "3"})
+        # assert
+        self.assertEqual(list(result.values()), [1, 8, 8, 6, 1, None])
+
+    def test_batch(self):
+        # arrange
+        widths = PortWidths(PORTS, GENERICS)
+        configurations = [{"WIDTH": w, "ADDR_BITS": 4} for w in (8, 16, 8)]
+        # action
+        rows = widths.batch(configurations)
+        # assert
+        self.assertEqual(
+            rows,
+            [
+                (1, 8, 16, 6, 1, None),
+                (1, 16, 16, 7, 2, None),
+                (1, 8, 16, 6, 1, None),
+            ],
+        )
+        self.assertIs(rows[0], rows[2])
+
+    def test_constants(self):
+        # arrange
+        ports = [Port("d", "in", "std_logic_vector(pkg.BYTES*8-1 downto 0)")]
+        # action
+        widths = PortWidths(ports, constants={"PKG.BYTES": 4})
+        # assert
+        self.assertEqual(widths.widths()["d"], 32)
+
+    def test_other_arrays(self):
+        # arrange
+        ports = [
+            Port("words", "in", "word_array(0 to 3)"),
+            Port("name", "in", "string(1 to 8)"),
+            Port("level", "in", "my_int range 0 to 7"),
+            Port("free", "in", "std_logic_vector"),
+        ]
+        # action
+        widths = PortWidths(ports)
+        # assert
+        self.assertEqual(list(widths.widths().values()), [None] * 4)
+        self.assertEqual(widths.errors, {})
+
+    def test_selected_vector(self):
+        # arrange
+        ports = [Port("d", "in", "ieee.numeric_std.signed(7 downto 0)")]
+        # action
+        widths = PortWidths(ports)
+        # assert
+        self.assertEqual(widths.widths()["d"], 8)
+
+    def test_from_text(self):
+        # arrange
+        with open("tests/vhdl/module.vhd", "r") as f:
+            module = f.read()
+        # action
+        widths = PortWidths.from_text(module)
+        # assert
+        self.assertEqual(widths.widths()["p1"], 42)
+        self.assertEqual(widths.widths({"n": 4})["p2"], 4)